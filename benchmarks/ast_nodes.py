@@ -0,0 +1,42 @@
+"""Memory per AST node and the cost of variable access on recursive code.
+
+Run from the repository root: python -m benchmarks.ast_nodes
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import tracemalloc
+
+from benchmarks.cache_startup import FUNCTION
+from benchmarks.programs import PROGRAMS, best_of
+from lox.expr_types import Expr
+from lox.parser import Parser
+from lox.scanner import Scanner
+from lox.stmt_types import Stmt
+
+
+def count_nodes(node: object) -> int:
+    if isinstance(node, list):
+        return sum(count_nodes(item) for item in node)
+    if not isinstance(node, (Expr, Stmt)):
+        return 0
+    return 1 + sum(
+        count_nodes(getattr(node, field.name)) for field in dataclasses.fields(node)
+    )
+
+
+def main():
+    source = "".join(FUNCTION.format(n=n) for n in range(500))
+    tokens = list(Scanner(source).scan_buffer())
+    tracemalloc.start()
+    statements = Parser(tokens).parse()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = count_nodes(statements)
+    print(f"{nodes} nodes, {size / nodes:.0f} bytes per node (lists included)")
+    print(f"fib(22): {best_of(PROGRAMS['fib']):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Throughput of `python -m lox.batch check` with one to all cores.
+
+Run from the repository root: python -m benchmarks.batch_check [files]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.cache_startup import FUNCTION
+from lox.batch import compile_files, lox_files
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(count):
+            script = Path(directory) / f"script{index}.lox"
+            script.write_text("".join(FUNCTION.format(n=n) for n in range(50)))
+        files = lox_files([directory])
+
+        cores = os.cpu_count() or 1
+        jobs = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+        print(f"{count} files of 50 functions, {cores} cores")
+        baseline = None
+        for workers in jobs:
+            start = time.perf_counter()
+            results = compile_files(files, workers)
+            seconds = time.perf_counter() - start
+            assert all(result.ok for result in results)
+            baseline = baseline or seconds
+            print(
+                f"  {workers:>2} workers: {count / seconds:6.1f} files/sec"
+                f" ({baseline / seconds:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Cold vs warm start of `python -m lox.lox` with the program cache.
+
+Run from the repository root: python -m benchmarks.cache_startup [functions]
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+FUNCTION = """
+fun helper{n}(a, b) {{
+  var total = 0;
+  for (var i = 0; i < a; i = i + 1) {{
+    if (i > b and total < 100) total = total + i * 2 - b / 3;
+    else total = total - 1;
+  }}
+  return total;
+}}
+"""
+
+
+def start(script: Path, env: dict[str, str], *flags: str) -> float:
+    begin = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "lox.lox", *flags, str(script)],
+        env=env,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - begin
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as directory:
+        script = Path(directory) / "script.lox"
+        script.write_text(
+            "".join(FUNCTION.format(n=n) for n in range(functions))
+            + 'print "done";\n'
+        )
+        env = {**os.environ, "LOX_CACHE_DIR": str(Path(directory) / "cache")}
+        env.pop("LOX_NO_CACHE", None)
+        size = script.stat().st_size / 1e3
+
+        uncached = min(start(script, env, "--no-cache") for _ in range(3))
+        cold = start(script, env)
+        warm = min(start(script, env) for _ in range(3))
+        print(f"script: {functions} functions, {size:.0f} kB")
+        print(f"  no cache:   {uncached:.3f}s")
+        print(f"  cold cache: {cold:.3f}s (compile + store)")
+        print(f"  warm cache: {warm:.3f}s ({uncached / warm:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""The benchmark programs on each execution engine.
+
+Run from the repository root: python -m benchmarks.engines [engine ...]
+"""
+
+from __future__ import annotations
+
+import sys
+
+from benchmarks.fib import FIB
+from benchmarks.programs import PROGRAMS, best_of
+from lox.lox import Lox
+
+
+def main():
+    engines = ["tree", *(sys.argv[1:] or ["closure", "vm", "python"])]
+    programs = {**PROGRAMS, "fib(25)": FIB}
+    for name, source in programs.items():
+        times = {}
+        for engine in engines:
+            Lox.engine = engine
+            times[engine] = best_of(source)
+        print(
+            f"{name:>8}: "
+            + ", ".join(
+                f"{engine} {seconds:.3f}s ({times['tree'] / seconds:.1f}x)"
+                for engine, seconds in times.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
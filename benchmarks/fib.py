@@ -0,0 +1,28 @@
+"""fib(25) as in test.lox: deep recursion, dominated by variable access and
+calls.
+
+Run from the repository root: python -m benchmarks.fib [repeat]
+"""
+
+from __future__ import annotations
+
+import sys
+
+from benchmarks.programs import best_of
+
+FIB = """
+    fun fib(n) {
+      if (n < 2) return n;
+      return fib(n - 1) + fib(n - 2);
+    }
+    print fib(25);
+"""
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"fib(25): {best_of(FIB, repeat):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
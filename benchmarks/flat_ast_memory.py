@@ -0,0 +1,44 @@
+"""Memory held by the object AST vs the flat, array-backed FlatAst.
+
+Run from the repository root: python -m benchmarks.flat_ast_memory [functions]
+"""
+
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from collections.abc import Callable
+
+from benchmarks.cache_startup import FUNCTION
+from lox.flat_ast import FlatAst
+from lox.parser import Parser
+from lox.scanner import Scanner
+
+
+def retained(build: Callable[[], object]) -> tuple[object, int]:
+    """What `build` returns and the bytes still allocated for it afterwards."""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = "".join(FUNCTION.format(n=n) for n in range(functions))
+    # Scanned up front: both representations start from the same tokens and
+    # keep only the Token objects (or token rows) they reference.
+    buffer = Scanner(source).scan_buffer()
+
+    _, tree = retained(lambda: Parser(buffer).parse())
+    ast, flat = retained(lambda: FlatAst.parse(Parser(buffer)))
+    nodes = len(ast)  # type: ignore
+    print(f"{functions} functions, {nodes} nodes")
+    print(f"  object AST: {tree / 1e6:6.2f} MB, {tree / nodes:5.1f} bytes per node")
+    print(f"  FlatAst:    {flat / 1e6:6.2f} MB, {flat / nodes:5.1f} bytes per node")
+    print(f"  {tree / flat:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Recursive code that reads and writes globals on every call.
+
+Run from the repository root: python -m benchmarks.globals
+"""
+
+from __future__ import annotations
+
+from benchmarks.fib import FIB
+from benchmarks.programs import best_of
+
+PROGRAMS = {
+    "fib(25)": FIB,
+    "counted fib(22)": """
+        var calls = 0;
+        fun fib(n) {
+          calls = calls + 1;
+          if (n < 2) return n;
+          return fib(n - 1) + fib(n - 2);
+        }
+        print fib(22);
+        print calls;
+    """,
+    "even/odd": """
+        fun isEven(n) {
+          if (n == 0) return true;
+          return isOdd(n - 1);
+        }
+        fun isOdd(n) {
+          if (n == 0) return false;
+          return isEven(n - 1);
+        }
+        var evens = 0;
+        for (var i = 0; i < 2000; i = i + 1) {
+          if (isEven(60)) evens = evens + 1;
+        }
+        print evens;
+    """,
+}
+
+
+def main():
+    for name, source in PROGRAMS.items():
+        print(f"{name:>15}: {best_of(source):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
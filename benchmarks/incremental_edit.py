@@ -0,0 +1,56 @@
+"""Recompile an edited buffer from scratch vs with the IncrementalCompiler.
+
+Run from the repository root: python -m benchmarks.incremental_edit [functions]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+from benchmarks.cache_startup import FUNCTION
+from lox.incremental import IncrementalCompiler
+from lox.interpreter import Interpreter
+from lox.lox import Lox
+from lox.scanner import Scanner
+from lox.symbol_table import SymbolTable
+
+
+def edits(functions: int) -> list[str]:
+    """Buffers an editor would submit while retyping one function's body."""
+    source = "".join(FUNCTION.format(n=n) for n in range(functions))
+    body = source.index(f"fun helper{functions // 2}(")
+    at = source.index("return total;", body)
+    rest = source[at + len("return total;") :]
+    return [f"{source[:at]}return total + {k};{rest}" for k in range(10)]
+
+
+def timed(compile, buffers: list[str]) -> float:
+    start = time.perf_counter()
+    for buffer in buffers:
+        if compile(buffer) is None:
+            raise RuntimeError("benchmark buffer failed to compile")
+    return (time.perf_counter() - start) / len(buffers)
+
+
+def main():
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    buffers = edits(functions)
+    symbols = SymbolTable()
+
+    def scratch(source: str):
+        return Lox.compile(Scanner(source, symbols=symbols).scan_buffer())
+
+    incremental = IncrementalCompiler(Interpreter(), symbols)
+    incremental.compile(buffers[0])
+    full = timed(scratch, buffers)
+    edit = timed(incremental.compile, buffers)
+    print(f"buffer of {functions} functions, one body edited per submission")
+    print(f"  from scratch: {full * 1e3:.1f} ms")
+    print(f"  incremental:  {edit * 1e3:.1f} ms ({full / edit:.0f}x faster)")
+    compiled, reused = incremental.compiled, incremental.reused
+    print(f"  declarations compiled {compiled}, reused {reused}")
+
+
+if __name__ == "__main__":
+    main()
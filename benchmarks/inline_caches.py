@@ -0,0 +1,78 @@
+"""Call throughput on the tree walker, with each call site's inline cache and
+with every call checking its callee as before, and the caches' hit rates.
+
+Run from the repository root: python -m benchmarks.inline_caches
+"""
+
+from __future__ import annotations
+
+from unittest import mock
+
+from benchmarks.programs import best_of
+from lox.errors import LoxRuntimeError
+from lox.interpreter import Interpreter
+from lox.lox import Lox
+from lox.lox_callable import LoxCallable
+
+PROGRAMS = {
+    "leaf": """
+        fun id(x) { return x; }
+        var total = 0;
+        for (var i = 0; i < 50000; i = i + 1) total = total + id(i);
+    """,
+    "fib": """
+        fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+        print fib(20);
+    """,
+    "arguments": """
+        fun pick(a, b, c, d) { return c; }
+        var total = 0;
+        for (var i = 0; i < 50000; i = i + 1) total = total + pick(i, 1, i, 2);
+    """,
+    "polymorphic": """
+        fun inc(x) { return x + 1; }
+        fun dec(x) { return x - 1; }
+        fun apply(f, x) { var y = f(x); return y; }
+        var total = 0;
+        for (var i = 0; i < 25000; i = i + 1) {
+          total = apply(inc, total);
+          total = apply(dec, total);
+        }
+    """,
+}
+
+
+def uncached_call(self, expr):
+    callee = self.evaluate(expr.callee)
+    arguments: list[object] = []
+    for argument in expr.arguments:
+        arguments.append(self.evaluate(argument))
+    if not isinstance(callee, LoxCallable):
+        raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
+    if len(arguments) != callee.arity():
+        raise LoxRuntimeError(
+            expr.paren,
+            f"Expected {callee.arity()} arguments but got {len(arguments)}",
+        )
+    return callee.call(self, arguments)
+
+
+def main():
+    # Inlining leaves the call sites being measured with nothing to call.
+    Lox.inline = False
+    for name, source in PROGRAMS.items():
+        with mock.patch.object(Interpreter, "visit_call_expr", uncached_call):
+            before = best_of(source)
+        after = best_of(source)
+        caches = Lox.interpreter.inline_caches
+        hits = sum(cache.hits for cache in caches)
+        calls = hits + sum(cache.misses for cache in caches)
+        rate = hits / calls if calls else 0.0
+        print(
+            f"{name:>12}: uncached {before:.3f}s, cached {after:.3f}s"
+            f" ({before / after:.2f}x), {rate:.1%} of {calls} calls hit"
+        )
+
+
+if __name__ == "__main__":
+    main()
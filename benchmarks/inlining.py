@@ -0,0 +1,60 @@
+"""Call-heavy loops over small helper functions on each engine, with and
+without the helpers inlined into their call sites.
+
+Run from the repository root: python -m benchmarks.inlining [engine ...]
+"""
+
+from __future__ import annotations
+
+import sys
+from unittest import mock
+
+from benchmarks.programs import best_of
+from lox.lox import Lox
+
+PROGRAMS = {
+    "wrappers": """
+        fun square(x) { return x * x; }
+        fun twice(x) { return x + x; }
+        var total = 0;
+        for (var i = 0; i < 30000; i = i + 1) {
+          total = total + square(i) - twice(i);
+        }
+        print total;
+    """,
+    "nested": """
+        fun square(x) { return x * x; }
+        fun norm(x, y) { return square(x) + square(y); }
+        var total = 0;
+        for (var i = 0; i < 30000; i = i + 1) total = total + norm(i, 1);
+        print total;
+    """,
+    "predicates": """
+        fun between(x, low, high) { return x >= low and x <= high; }
+        fun odd(x) { return x / 2 != x / 2 - 0.5 + 0.5; }
+        var hits = 0;
+        for (var i = 0; i < 30000; i = i + 1) {
+          if (between(i, 100, 20000) and !odd(i)) hits = hits + 1;
+        }
+        print hits;
+    """,
+}
+
+
+def main():
+    engines = sys.argv[1:] or ["tree", "closure", "vm", "python"]
+    for engine in engines:
+        print(engine)
+        with mock.patch.object(Lox, "engine", engine):
+            for name, source in PROGRAMS.items():
+                with mock.patch.object(Lox, "inline", False):
+                    before = best_of(source)
+                after = best_of(source)
+                print(
+                    f"{name:>12}: calls {before:.3f}s, inlined {after:.3f}s"
+                    f" ({before / after:.2f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
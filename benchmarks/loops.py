@@ -0,0 +1,57 @@
+"""Numeric `for` loops on the tree walker, with and without the loop pass that
+steps counted loops directly and computes invariant operators once per loop.
+
+Run from the repository root: python -m benchmarks.loops
+"""
+
+from __future__ import annotations
+
+from unittest import mock
+
+from benchmarks.programs import best_of
+from lox.loops import LoopOptimizer
+
+PROGRAMS = {
+    "counted": """
+        var sum = 0;
+        for (var i = 0; i < 200000; i = i + 1) sum = sum + i;
+        print sum;
+    """,
+    "invariant": """
+        fun scale(n, k) {
+          var total = 0;
+          for (var i = 0; i < n; i = i + 1) total = total + (k * k + 1) * i;
+          return total;
+        }
+        print scale(100000, 3);
+    """,
+    "nested": """
+        var count = 0;
+        for (var i = 0; i < 300; i = i + 1) {
+          for (var j = i; j < i * 2 + 300; j = j + 1) count = count + 1;
+        }
+        print count;
+    """,
+    "countdown": """
+        var sum = 0;
+        for (var i = 100000; i > 0; i = i - 0.5) sum = sum + i;
+        print sum;
+    """,
+}
+
+
+def main():
+    for name, source in PROGRAMS.items():
+        with mock.patch.object(
+            LoopOptimizer, "optimize", lambda self, statements: statements
+        ):
+            before = best_of(source)
+        after = best_of(source)
+        print(
+            f"{name:>12}: as written {before:.3f}s, optimized {after:.3f}s"
+            f" ({before / after:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""fib(25) on the tree walker, as written and with pure functions memoized.
+
+Run from the repository root: python -m benchmarks.memoize
+"""
+
+from __future__ import annotations
+
+from unittest import mock
+
+from benchmarks.programs import best_of
+from lox.lox import Lox
+
+FIB = """
+    fun fib(n) {
+      if (n < 2) return n;
+      return fib(n - 1) + fib(n - 2);
+    }
+    print fib(25);
+"""
+
+
+def main():
+    before = best_of(FIB, repeat=1)
+    with mock.patch.object(Lox, "memoize", True):
+        after = best_of(FIB)
+    print(
+        f"fib(25): plain {before:.3f}s, memoized {after:.5f}s"
+        f" ({before / after:.0f}x)"
+    )
+    for memo in Lox.interpreter.memos.values():
+        print(f"  {memo}")
+
+
+if __name__ == "__main__":
+    main()
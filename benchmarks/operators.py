@@ -0,0 +1,52 @@
+"""Arithmetic-heavy loops with a node per operator, and with plain Binary
+nodes dispatching on the operator as before.
+
+Run from the repository root: python -m benchmarks.operators
+"""
+
+from __future__ import annotations
+
+from unittest import mock
+
+from benchmarks.programs import best_of
+from lox import parser
+from lox.expr_types import Binary
+
+LOOPS = {
+    "arithmetic": """
+        var x = 0;
+        for (var i = 0; i < 100000; i = i + 1) {
+          x = x + i * 2 - i / 4;
+        }
+        print x;
+    """,
+    "comparisons": """
+        var hits = 0;
+        for (var i = 0; i < 100000; i = i + 1) {
+          if (i >= 10 and i <= 90000 and i != 500 and !(i == 7)) hits = hits + 1;
+        }
+        print hits;
+    """,
+    "polynomial": """
+        fun poly(x) { return ((3 * x - 2) * x + 7) * x / 5 - 1; }
+        var total = 0;
+        for (var i = 0; i < 50000; i = i + 1) total = total + poly(i);
+        print total;
+    """,
+}
+
+
+def main():
+    generic = dict.fromkeys(parser.BINARY, Binary)
+    for name, source in LOOPS.items():
+        with mock.patch.dict(parser.BINARY, generic):
+            before = best_of(source)
+        after = best_of(source)
+        print(
+            f"{name:>12}: Binary {before:.3f}s, per operator {after:.3f}s"
+            f" ({before / after:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""A loop full of constant expressions and dead branches, at -O0 and -O1.
+
+Run from the repository root: python -m benchmarks.optimizer
+"""
+
+from __future__ import annotations
+
+from benchmarks.programs import PROGRAMS, best_of
+from lox.lox import Lox
+
+CONSTANTS = """
+    var debug = false;
+    var x = 0;
+    for (var i = 0; i < 100000; i = i + 1) {
+      x = x + (2 * 3 + 1) * (10 / 5) - (60 * 60 * 24) / 86400;
+      if (false) print "never";
+      if (!true or nil) { print "still never"; }
+      while (1 > 2) x = -x;
+    }
+    print x;
+"""
+
+
+def main():
+    programs = {"constants": CONSTANTS, **PROGRAMS}
+    for name, source in programs.items():
+        times = []
+        for level in (0, 1):
+            Lox.opt_level = level
+            times.append(best_of(source))
+        print(
+            f"{name:>10}: -O0 {times[0]:.3f}s, -O1 {times[1]:.3f}s"
+            f" ({times[0] / times[1]:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
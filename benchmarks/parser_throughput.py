@@ -0,0 +1,76 @@
+"""Compare the precedence-climbing and recursive-descent expression parsers.
+
+Run from the repository root: python -m benchmarks.parser_throughput
+"""
+
+from __future__ import annotations
+
+import random
+import time
+
+from lox.parser import Parser
+from lox.scanner import Scanner
+
+ATOMS = ["a", "b", "1", "2.5", '"s"', "nil", "f(a, 2)"]
+OPERATORS = ["+", "-", "*", "/", "==", "!=", "<", "<=", "and", "or"]
+
+
+def expression(rng: random.Random, depth: int = 0) -> str:
+    roll = rng.random()
+    if depth > 6 or roll < 0.25:
+        return rng.choice(ATOMS)
+    if roll < 0.35:
+        return "-" + expression(rng, depth + 1)
+    if roll < 0.45:
+        return f"({expression(rng, depth + 1)})"
+    left = expression(rng, depth + 1)
+    right = expression(rng, depth + 1)
+    return f"{left} {rng.choice(OPERATORS)} {right}"
+
+
+def generated_source(statements: int) -> str:
+    rng = random.Random(42)
+    return "\n".join(f"x = {expression(rng)};" for _ in range(statements))
+
+
+def throughput(source: str, engine: str, repeat: int = 3) -> tuple[int, float]:
+    tokens = Scanner(source).scan_tokens()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Parser(tokens, engine).parse()
+        best = min(best, time.perf_counter() - start)
+    return len(tokens), best
+
+
+def max_nesting(engine: str) -> int:
+    """Deepest `((...1...))` the engine parses before hitting RecursionError."""
+    low, high = 1, 5000
+    while low < high:
+        depth = (low + high + 1) // 2
+        tokens = Scanner("(" * depth + "1" + ")" * depth + ";").scan_tokens()
+        try:
+            Parser(tokens, engine).parse()
+            low = depth
+        except RecursionError:
+            high = depth - 1
+    return low
+
+
+def main():
+    workloads = {
+        "random expressions": generated_source(20000),
+        "long chain": "x = " + " + ".join(["a * 2"] * 50000) + ";",
+    }
+    for name, source in workloads.items():
+        print(name)
+        for engine in reversed(Parser.engines):
+            count, seconds = throughput(source, engine)
+            print(f"  {engine:>8}: {count / seconds:,.0f} tokens/sec ({seconds:.3f}s)")
+    print("maximum parenthesis nesting")
+    for engine in reversed(Parser.engines):
+        print(f"  {engine:>8}: {max_nesting(engine)}")
+
+
+if __name__ == "__main__":
+    main()
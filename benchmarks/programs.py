@@ -0,0 +1,76 @@
+"""Time the interpreter on a few small Lox workloads.
+
+Run from the repository root: python -m benchmarks.programs [name ...]
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import sys
+import time
+
+from lox.lox import Lox
+
+PROGRAMS = {
+    "fib": """
+        fun fib(n) {
+          if (n < 2) return n;
+          return fib(n - 1) + fib(n - 2);
+        }
+        print fib(22);
+    """,
+    "loop": """
+        var sum = 0;
+        for (var i = 0; i < 200000; i = i + 1) {
+          sum = sum + i * 2;
+        }
+        print sum;
+    """,
+    "closure": """
+        fun makeCounter() {
+          var count = 0;
+          fun increment() {
+            count = count + 1;
+            return count;
+          }
+          return increment;
+        }
+        var counter = makeCounter();
+        for (var i = 0; i < 50000; i = i + 1) counter();
+        print counter();
+    """,
+    "strings": """
+        var text = "";
+        for (var i = 0; i < 50000; i = i + 1) {
+          text = text + "x";
+        }
+        print text == text;
+    """,
+}
+
+
+def run(source: str) -> float:
+    """Run `source` on a fresh interpreter and return the wall time."""
+    Lox.interpreter = type(Lox.interpreter)()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        Lox.run(source)
+        elapsed = time.perf_counter() - start
+    if Lox.had_error or Lox.had_runtime_error:
+        raise RuntimeError("benchmark program failed")
+    return elapsed
+
+
+def best_of(source: str, repeat: int = 3) -> float:
+    return min(run(source) for _ in range(repeat))
+
+
+def main():
+    names = sys.argv[1:] or list(PROGRAMS)
+    for name in names:
+        print(f"{name:>8}: {best_of(PROGRAMS[name]):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
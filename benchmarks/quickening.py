@@ -0,0 +1,79 @@
+"""test.lox and string concatenation on the tree walker, with every Add
+checking its operands' types as before and with Add nodes rewriting
+themselves into float-only or string-only ones, and how many did.
+
+Run from the repository root: python -m benchmarks.quickening
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.programs import best_of
+from lox.errors import LoxRuntimeError
+from lox.interpreter import Interpreter
+from lox.lox import Lox
+
+PROGRAMS = {
+    "test.lox": Path("test.lox").read_text(),
+    "concat": """
+        var text = "";
+        for (var i = 0; i < 50000; i = i + 1) text = text + "x";
+        print text == text;
+    """,
+    "join": """
+        fun join(a, b) { return a + ", " + b; }
+        var line = "";
+        for (var i = 0; i < 20000; i = i + 1) line = join("a", "b") + line;
+    """,
+    "words": """
+        var first = "ab";
+        var second = "cd";
+        var count = 0;
+        for (var i = 0; i < 50000; i = i + 1) {
+          var word = first + second;
+          if (word == "abcd") count = count + 1;
+          first = "ab";
+        }
+        print count;
+    """,
+    "sum": """
+        var sum = 0;
+        for (var i = 0; i < 100000; i = i + 1) sum = sum + i + 0.5;
+        print sum;
+    """,
+}
+
+
+def generic_add(self, expr):
+    left = expr.left.accept(self)
+    right = expr.right.accept(self)
+    if type(left) is float and type(right) is float:
+        return left + right
+    if isinstance(left, (float, int)) and isinstance(right, (float, int)):
+        return float(left) + float(right)
+    if isinstance(left, str) and isinstance(right, str):
+        return left + right
+    raise LoxRuntimeError(expr.operator, "Operands must be numbers")
+
+
+def main():
+    for name, source in PROGRAMS.items():
+        with mock.patch.object(Interpreter, "visit_add_expr", generic_add):
+            before = best_of(source)
+        after = best_of(source)
+        interpreter = Lox.interpreter
+        counts = ", ".join(
+            f"{count} {variant.__name__}"
+            f" ({interpreter.deoptimizations[variant]} deoptimized)"
+            for variant, count in interpreter.specializations.items()
+        )
+        print(
+            f"{name:>12}: generic {before:.3f}s, quickened {after:.3f}s"
+            f" ({before / after:.2f}x), {counts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
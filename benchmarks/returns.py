@@ -0,0 +1,77 @@
+"""Call-heavy programs on the tree walker, with `return` handed back as a
+completion value and with it raised as an exception as before.
+
+Run from the repository root: python -m benchmarks.returns
+"""
+
+from __future__ import annotations
+
+from unittest import mock
+
+from benchmarks.programs import best_of
+from lox.environment import Environment
+from lox.interpreter import Interpreter
+from lox.lox_function import LoxFunction
+
+PROGRAMS = {
+    "fib": """
+        fun fib(n) {
+          if (n < 2) return n;
+          return fib(n - 1) + fib(n - 2);
+        }
+        print fib(20);
+    """,
+    "nested": """
+        fun find(limit) {
+          for (var i = 0; i < 100; i = i + 1) {
+            if (i == limit) { return i; }
+          }
+        }
+        var total = 0;
+        for (var i = 0; i < 3000; i = i + 1) total = total + find(5);
+        print total;
+    """,
+    "leaf": """
+        fun id(x) { return x; }
+        var total = 0;
+        for (var i = 0; i < 50000; i = i + 1) total = total + id(i);
+        print total;
+    """,
+}
+
+
+class Returned(Exception):
+    def __init__(self, value: object):
+        self.value = value
+
+
+def raise_return(self, stmt):
+    raise Returned(None if stmt.value is None else self.evaluate(stmt.value))
+
+
+def catch_return(self, interpreter, arguments):
+    try:
+        interpreter.execute_block(
+            self.declaration.body, Environment(self.closure, arguments)
+        )
+    except Returned as returned:
+        return returned.value
+    return None
+
+
+def main():
+    for name, source in PROGRAMS.items():
+        with (
+            mock.patch.object(Interpreter, "visit_return_stmt", raise_return),
+            mock.patch.object(LoxFunction, "call", catch_return),
+        ):
+            before = best_of(source)
+        after = best_of(source)
+        print(
+            f"{name:>8}: exception {before:.3f}s, completion {after:.3f}s"
+            f" ({before / after:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
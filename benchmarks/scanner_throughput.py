@@ -0,0 +1,46 @@
+"""Compare Scanner engines in tokens/sec.
+
+Run from the repository root: python -m benchmarks.scanner_throughput [copies]
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+from lox.scanner import Scanner
+
+SOURCE = (Path(__file__).parent.parent / "test.lox").read_text()
+
+
+def measure(source: str, engine: str, repeat: int = 3) -> tuple[int, float]:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            count = len(Scanner(source, engine).scan_tokens())
+            best = min(best, time.perf_counter() - start)
+    return count, best
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    source = SOURCE * copies
+    print(f"source: {len(source) / 1e6:.1f} MB")
+    baseline = None
+    for engine in reversed(Scanner.engines):
+        count, seconds = measure(source, engine)
+        rate = count / seconds
+        baseline = baseline or rate
+        print(
+            f"{engine:>8}: {count} tokens in {seconds:.3f}s"
+            f" = {rate:,.0f} tokens/sec ({rate / baseline:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Environments allocated and loop iterations per second in tight loops.
+
+Run from the repository root: python -m benchmarks.scope_elision
+"""
+
+from __future__ import annotations
+
+from benchmarks.programs import run
+from lox import interpreter, lox_function
+from lox.environment import Environment
+
+ITERATIONS = 100000
+
+LOOPS = {
+    "top-level for": """
+        var sum = 0;
+        for (var i = 0; i < {n}; i = i + 1) {{
+          sum = sum + i * 2;
+        }}
+        print sum;
+    """,
+    "for with locals": """
+        fun loop() {{
+          var sum = 0;
+          for (var i = 0; i < {n}; i = i + 1) {{
+            var twice = i * 2;
+            sum = sum + twice;
+          }}
+          return sum;
+        }}
+        print loop();
+    """,
+    "nested blocks": """
+        fun loop() {{
+          var i = 0;
+          while (i < {n}) {{
+            {{ var a = i; {{ var b = a + 1; i = b; }} }}
+          }}
+          return i;
+        }}
+        print loop();
+    """,
+}
+
+
+class CountingEnvironment(Environment):
+    __slots__ = ()
+    allocated = 0
+
+    def __init__(self, *args):
+        CountingEnvironment.allocated += 1
+        super().__init__(*args)
+
+
+def main():
+    interpreter.Environment = CountingEnvironment  # type: ignore
+    lox_function.Environment = CountingEnvironment  # type: ignore
+    for name, loop in LOOPS.items():
+        source = loop.format(n=ITERATIONS)
+        CountingEnvironment.allocated = 0
+        run(source)
+        allocated = CountingEnvironment.allocated
+        seconds = min(run(source) for _ in range(3))
+        print(
+            f"{name:>16}: {allocated:>6} environments,"
+            f" {ITERATIONS / seconds:8.0f} iterations/sec"
+        )
+
+
+if __name__ == "__main__":
+    main()
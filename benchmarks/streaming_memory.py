@@ -0,0 +1,51 @@
+"""Peak memory of whole-file vs streaming scanning.
+
+Run from the repository root: python -m benchmarks.streaming_memory
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from lox.scanner import Scanner, read_chunks
+
+SOURCE = (Path(__file__).parent.parent / "test.lox").read_text()
+
+
+def peak(action) -> float:
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        action()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def whole(path: str):
+    with open(path) as file:
+        Scanner(file.read()).scan_tokens()
+
+
+def streaming(path: str):
+    for _ in Scanner().scan_chunks(read_chunks(path)):
+        pass
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for copies in (250, 1000, 4000):
+            path = str(Path(directory) / "input.lox")
+            Path(path).write_text(SOURCE * copies)
+            size = Path(path).stat().st_size / 1e6
+            print(
+                f"{size:5.1f} MB source: whole {peak(lambda: whole(path)):7.1f} MB peak,"
+                f" streaming {peak(lambda: streaming(path)):5.2f} MB peak"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Tail-recursive programs on the tree walker, with and without tail calls
+run in their caller's place, and how deep each can recurse.
+
+Run from the repository root: python -m benchmarks.tail_calls
+"""
+
+from __future__ import annotations
+
+import sys
+from unittest import mock
+
+from benchmarks.programs import best_of
+from lox.lox import Lox
+from lox.resolver import Resolver
+
+PROGRAMS = {
+    "countdown": """
+        fun count(n) { if (n == 0) return n; return count(n - 1); }
+        for (var i = 0; i < 1000; i = i + 1) count(50);
+    """,
+    "gcd": """
+        fun gcd(a, b) {
+          if (a == b) return a;
+          if (a > b) return gcd(a - b, b);
+          return gcd(a, b - a);
+        }
+        for (var i = 1; i < 1000; i = i + 1) gcd(i, 41);
+    """,
+    "mutual": """
+        fun even(n) { if (n == 0) return true; return odd(n - 1); }
+        fun odd(n) { if (n == 0) return false; return even(n - 1); }
+        for (var i = 0; i < 1000; i = i + 1) even(50);
+    """,
+}
+
+DEPTH = """
+    fun count(n) { if (n == 0) return n; return count(n - 1); }
+    count(%d);
+"""
+
+resolve_return = Resolver.visit_return_stmt
+
+
+def no_tail_calls(self, stmt):
+    resolve_return(self, stmt)
+    stmt.tail = False
+
+
+def deepest(limit: int = 100000) -> int:
+    """The deepest recursion, in powers of two, that runs; stops past `limit`."""
+    n = 1
+    while n < limit:
+        try:
+            best_of(DEPTH % (n * 2), repeat=1)
+        except RecursionError:
+            break
+        n *= 2
+    return n
+
+
+def main():
+    # Inlining would take some calls out of the comparison.
+    Lox.inline = False
+    disabled = mock.patch.object(Resolver, "visit_return_stmt", no_tail_calls)
+    for name, source in PROGRAMS.items():
+        with disabled:
+            before = best_of(source)
+        after = best_of(source)
+        print(
+            f"{name:>10}: nested {before:.3f}s, tail calls {after:.3f}s"
+            f" ({before / after:.2f}x)"
+        )
+    with disabled:
+        before = deepest()
+    after = deepest()
+    print(
+        f"{'depth':>10}: nested {before}, tail calls {after}"
+        f" (recursion limit {sys.getrecursionlimit()})"
+    )
+
+
+if __name__ == "__main__":
+    main()
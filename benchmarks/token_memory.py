@@ -0,0 +1,62 @@
+"""Front-end memory of Token lists vs the columnar TokenBuffer.
+
+The buffer cuts what the scanned tokens hold severalfold, but not the peak
+of scanning and parsing, which is mostly the AST the parser builds. Only
+REPL input (`Lox.run`) goes through a TokenBuffer: scripts are scanned
+lazily from chunks (`Scanner.scan_chunks`), so all of their tokens are
+never held at once, which the last line shows.
+
+Run from the repository root: python -m benchmarks.token_memory [copies]
+"""
+
+from __future__ import annotations
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+from lox.parser import Parser
+from lox.scanner import Scanner
+
+SOURCE = (Path(__file__).parent.parent / "test.lox").read_text()
+
+
+def measure(source: str, scan) -> tuple[float, float]:
+    """Return (MB held by the scanned tokens, peak MB while scanning+parsing)."""
+    tracemalloc.start()
+    tokens = scan(Scanner(source))
+    held, _ = tracemalloc.get_traced_memory()
+    Parser(tokens).parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return held / 1e6, peak / 1e6
+
+
+def streamed(scanner: Scanner):
+    source = scanner.source
+    size = 1 << 16
+    return scanner.scan_chunks(
+        source[start : start + size] for start in range(0, len(source), size)
+    )
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    source = SOURCE * copies
+    print(f"source: {len(source) / 1e6:.2f} MB")
+    list_held, list_peak = measure(source, Scanner.scan_tokens)
+    buffer_held, buffer_peak = measure(source, Scanner.scan_buffer)
+    print(
+        f"tokens held:  list {list_held:7.2f} MB, buffer {buffer_held:6.2f} MB"
+        f" ({list_held / buffer_held:.1f}x)"
+    )
+    print(
+        f"scan + parse: list {list_peak:7.2f} MB, buffer {buffer_peak:6.2f} MB"
+        f" ({list_peak / buffer_peak:.1f}x)"
+    )
+    _, streamed_peak = measure(source, streamed)
+    print(f"scan + parse, streamed as scripts are: {streamed_peak:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Check or compile many scripts at once: python -m lox.batch check|compile PATH...
+
+Files are scanned, parsed and resolved in worker processes, and each worker
+hands back a FileResult with its diagnostics instead of printing them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from lox.cache import ProgramCache, default_directory
+from lox.errors import Diagnostic
+from lox.interpreter import Interpreter
+from lox.lox import Lox
+
+
+@dataclass
+class FileResult:
+    path: str
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+    failed: bool = False
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+def lox_files(paths: Iterable[str]) -> list[str]:
+    """The given files, plus every `.lox` file below the given directories."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(str(file) for file in Path(path).rglob("*.lox")))
+        else:
+            files.append(path)
+    return files
+
+
+def compile_one(path: str, cache_directory: str | None = None) -> FileResult:
+    """Compile one script in this process, storing it in the cache if given."""
+    result = FileResult(path)
+    Lox.diagnostics = result.diagnostics
+    Lox.had_error = False
+    Lox.cache = ProgramCache(cache_directory) if cache_directory is not None else None
+    # Each file gets the global slots it would get run on its own, so the
+    # cache stores no names from the files compiled before it.
+    Lox.interpreter = Interpreter()
+    try:
+        # Skipped only if the entry is one compile_file would use.
+        program = None
+        if Lox.cache is not None:
+            program = Lox.cache.load(Lox.cache_key(path))
+        if program is not None:
+            names, _ = program  # type: ignore
+            result.cached = Lox.interpreter.globals.bind(names)
+        if not result.cached:
+            Lox.compile_file(path)
+    except (OSError, UnicodeDecodeError) as error:
+        result.diagnostics.append(Diagnostic(0, "", str(error)))
+        Lox.had_error = True
+    finally:
+        Lox.diagnostics = None
+    result.failed = Lox.had_error
+    return result
+
+
+def compile_files(
+    paths: Iterable[str],
+    workers: int | None = None,
+    cache_directory: str | None = None,
+) -> list[FileResult]:
+    """Compile every file over a process pool, results in the order given."""
+    files = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        return [compile_one(path, cache_directory) for path in files]
+    # Several files per task, so small scripts don't pay one round trip each.
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(min(workers, len(files))) as executor:
+        return list(
+            executor.map(
+                compile_one,
+                files,
+                [cache_directory] * len(files),
+                chunksize=chunksize,
+            )
+        )
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="plox-batch")
+    parser.add_argument(
+        "command",
+        choices=("check", "compile"),
+        help="check: report errors only; compile: also fill the program cache",
+    )
+    parser.add_argument("paths", nargs="+", help="scripts or directories of them")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="worker processes (default: one per core)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="program cache location (default: $LOX_CACHE_DIR or ~/.cache/lox)",
+    )
+    args = parser.parse_args(argv)
+
+    cache_directory = None
+    if args.command == "compile":
+        cache_directory = args.cache_dir or str(default_directory())
+    results = compile_files(lox_files(args.paths), args.jobs, cache_directory)
+
+    failed = 0
+    for result in results:
+        for diagnostic in result.diagnostics:
+            print(f"{result.path}: {diagnostic}")
+        failed += result.failed
+    print(f"{len(results)} files, {failed} with errors", file=sys.stderr)
+    if failed:
+        exit(65)
+
+
+if __name__ == "__main__":
+    # See lox/lox.py: report into the importable modules, not __main__ copies.
+    from lox import batch
+
+    batch.main()
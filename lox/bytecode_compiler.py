@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+from typing import override
+
+from lox.chunk import Chunk
+from lox.expr_types import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+from lox.opcodes import OpCode
+from lox.stmt_types import (
+    Block,
+    Break,
+    Continue,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from lox.token_type import Token, TokenType
+
+BINARY = {
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+}
+
+
+class BytecodeCompiler(Expr.Visitor[None], Stmt.Visitor[None]):
+    """Compiles resolved statements to Chunks for the VM.
+
+    Locals use the resolver's frames: a block that is not elided pushes an
+    Environment, and variables are read by depth and slot, so closures
+    capture frames exactly as in Interpreter.
+    """
+
+    def __init__(self):
+        self.chunk = Chunk("script")
+        self.line = 1
+        # Whether the code being compiled runs with no Environment, so its
+        # declarations define globals.
+        self.top_level = True
+        # Scopes pushed so far in the current chunk, and per loop being
+        # compiled in it, the scopes pushed outside the loop and the jumps
+        # of its `break`s and `continue`s, to be patched.
+        self.scopes = 0
+        self.loops: list[tuple[int, list[int], list[int]]] = []
+
+    def compile(self, statements: list[Stmt]) -> Chunk:
+        """The chunk running `statements` as a script."""
+        for statement in statements:
+            statement.accept(self)
+        self.emit(OpCode.CONSTANT, self.chunk.constant(None))
+        self.emit(OpCode.RETURN)
+        return self.chunk
+
+    def emit(self, op: OpCode, *operands: int) -> int:
+        return self.chunk.emit(op, *operands, line=self.line)
+
+    def token(self, token: Token) -> int:
+        """The constant index of `token`, which becomes the current line."""
+        self.line = token.line
+        return self.chunk.constant(token)
+
+    def jump(self, op: OpCode) -> int:
+        """Emit a jump to be patched once its target is known."""
+        return self.emit(op, -1)
+
+    def land(self, jump: int):
+        """Make the jump at offset `jump` land here."""
+        self.chunk.patch(jump, len(self.chunk.code))
+
+    def define(self, slot: int):
+        if self.top_level:
+            self.emit(OpCode.DEFINE_GLOBAL, slot)
+        else:
+            self.emit(OpCode.DEFINE_LOCAL, slot)
+
+    def nested(self, statements: list[Stmt]):
+        top_level, self.top_level = self.top_level, False
+        for statement in statements:
+            statement.accept(self)
+        self.top_level = top_level
+
+    # Statement visitors
+    @override
+    def visit_block_stmt(self, stmt: Block):
+        if stmt.elided:
+            for statement in stmt.statements:
+                statement.accept(self)
+            return
+        self.emit(OpCode.PUSH_SCOPE)
+        self.scopes += 1
+        self.nested(stmt.statements)
+        self.scopes -= 1
+        self.emit(OpCode.POP_SCOPE)
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        _, breaks, _ = self.loops[-1]
+        breaks.append(self.leave_loop(stmt.keyword))
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        _, _, continues = self.loops[-1]
+        continues.append(self.leave_loop(stmt.keyword))
+
+    def leave_loop(self, keyword: Token) -> int:
+        """Pop the scopes pushed inside the innermost loop, then emit a jump
+        to be patched."""
+        self.line = keyword.line
+        scopes, _, _ = self.loops[-1]
+        for _ in range(self.scopes - scopes):
+            self.emit(OpCode.POP_SCOPE)
+        return self.jump(OpCode.JUMP)
+
+    @override
+    def visit_expression_stmt(self, stmt: Expression):
+        stmt.expression.accept(self)
+        self.emit(OpCode.POP)
+
+    @override
+    def visit_function_stmt(self, stmt: Function):
+        self.line = stmt.name.line
+        enclosing = self.chunk, self.scopes, self.loops
+        self.chunk = Chunk(stmt.name.lexeme, len(stmt.params))
+        self.scopes, self.loops = 0, []
+        self.nested(stmt.body)
+        self.emit(OpCode.CONSTANT, self.chunk.constant(None))
+        self.emit(OpCode.RETURN)
+        function = self.chunk
+        self.chunk, self.scopes, self.loops = enclosing
+        self.line = stmt.name.line
+        self.emit(OpCode.CLOSURE, self.chunk.constant(function))
+        self.define(stmt.slot)  # type: ignore
+
+    @override
+    def visit_if_stmt(self, stmt: If):
+        stmt.condition.accept(self)
+        skip_then = self.jump(OpCode.JUMP_IF_FALSE)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is None:
+            self.land(skip_then)
+            return
+        skip_else = self.jump(OpCode.JUMP)
+        self.land(skip_then)
+        stmt.else_branch.accept(self)
+        self.land(skip_else)
+
+    @override
+    def visit_print_stmt(self, stmt: Print):
+        stmt.expression.accept(self)
+        self.emit(OpCode.PRINT)
+
+    @override
+    def visit_return_stmt(self, stmt: Return):
+        self.line = stmt.keyword.line
+        if stmt.value is None:
+            self.emit(OpCode.CONSTANT, self.chunk.constant(None))
+        else:
+            stmt.value.accept(self)
+        self.emit(OpCode.RETURN)
+
+    @override
+    def visit_var_stmt(self, stmt: Var):
+        self.line = stmt.name.line
+        if stmt.initializer is None:
+            self.emit(OpCode.CONSTANT, self.chunk.constant(None))
+        else:
+            stmt.initializer.accept(self)
+        self.define(stmt.slot)  # type: ignore
+
+    @override
+    def visit_while_stmt(self, stmt: While):
+        start = len(self.chunk.code)
+        stmt.condition.accept(self)
+        skip_body = self.jump(OpCode.JUMP_IF_FALSE)
+        self.loops.append((self.scopes, [], []))
+        stmt.body.accept(self)
+        _, breaks, continues = self.loops.pop()
+        for jump in continues:
+            self.land(jump)
+        if stmt.increment is not None:
+            stmt.increment.accept(self)
+            self.emit(OpCode.POP)
+        self.emit(OpCode.JUMP, start)
+        self.land(skip_body)
+        for jump in breaks:
+            self.land(jump)
+
+    # Expression visitors
+    @override
+    def visit_assign_expr(self, expr: Assign):
+        expr.value.accept(self)
+        if expr.depth is None:
+            name = self.token(expr.name)
+            self.emit(OpCode.SET_GLOBAL, expr.slot, name)  # type: ignore
+        elif expr.depth == 0:
+            self.emit(OpCode.SET_LOCAL, expr.slot)  # type: ignore
+        else:
+            self.emit(OpCode.SET_OUTER, expr.depth, expr.slot)  # type: ignore
+
+    @override
+    def visit_binary_expr(self, expr: Binary):
+        expr.left.accept(self)
+        expr.right.accept(self)
+        op = BINARY[expr.operator.type]
+        if op in (OpCode.EQUAL, OpCode.NOT_EQUAL):
+            self.emit(op)
+        else:
+            self.emit(op, self.token(expr.operator))
+
+    @override
+    def visit_call_expr(self, expr: Call):
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+        self.emit(OpCode.CALL, len(expr.arguments), self.token(expr.paren))
+
+    @override
+    def visit_grouping_expr(self, expr: Grouping):
+        expr.expression.accept(self)
+
+    @override
+    def visit_literal_expr(self, expr: Literal):
+        self.emit(OpCode.CONSTANT, self.chunk.constant(expr.value))
+
+    @override
+    def visit_logical_expr(self, expr: Logical):
+        expr.left.accept(self)
+        if expr.operator.type == TokenType.OR:
+            end = self.jump(OpCode.JUMP_IF_TRUE_OR_POP)
+        else:
+            end = self.jump(OpCode.JUMP_IF_FALSE_OR_POP)
+        expr.right.accept(self)
+        self.land(end)
+
+    @override
+    def visit_unary_expr(self, expr: Unary):
+        expr.right.accept(self)
+        self.line = expr.operator.line
+        if expr.operator.type == TokenType.BANG:
+            self.emit(OpCode.NOT)
+        else:
+            self.emit(OpCode.NEGATE)
+
+    @override
+    def visit_variable_expr(self, expr: Variable):
+        self.line = expr.name.line
+        if expr.depth is None:
+            name = self.token(expr.name)
+            self.emit(OpCode.GET_GLOBAL, expr.slot, name)  # type: ignore
+        elif expr.depth == 0:
+            self.emit(OpCode.GET_LOCAL, expr.slot)  # type: ignore
+        else:
+            self.emit(OpCode.GET_OUTER, expr.depth, expr.slot)  # type: ignore
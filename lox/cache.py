@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+from lox import expr_types, stmt_types
+from lox.token_type import Token, TokenType
+
+SUFFIX = ".loxc"
+
+
+def default_directory() -> Path:
+    if directory := os.environ.get("LOX_CACHE_DIR"):
+        return Path(directory)
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "lox"
+
+
+def interpreter_version() -> str:
+    """Tag that changes whenever the interpreter or the Python running it does.
+
+    Cached programs are pickled AST classes, so any edit to the package may
+    change their layout; hashing the package sources is the conservative key.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    major, minor = sys.version_info[:2]
+    return f"py{major}{minor}-{digest.hexdigest()[:16]}"
+
+
+def program_classes() -> dict[tuple[str, str], type]:
+    """The classes a cached program is made of: the AST node classes,
+    variants included, and tokens."""
+    classes: list[type] = [Token, TokenType]
+    for module in (expr_types, stmt_types):
+        classes += [
+            value
+            for value in vars(module).values()
+            if isinstance(value, type) and value.__module__ == module.__name__
+        ]
+    return {(cls.__module__, cls.__qualname__): cls for cls in classes}
+
+
+class ProgramUnpickler(pickle.Unpickler):
+    """Only rebuilds the classes in `PROGRAM_CLASSES` from a cache entry.
+
+    Anything else, such as a function reached through a dotted name like
+    `lox.cache` / `os.system`, fails to load, so a planted entry cannot run
+    code.
+    """
+
+    def find_class(self, module: str, name: str):
+        cls = PROGRAM_CLASSES.get((module, name))
+        if cls is None:
+            raise pickle.UnpicklingError(f"{module}.{name} is not allowed in a cache")
+        return cls
+
+
+PROGRAM_CLASSES = program_classes()
+
+
+class ProgramCache:
+    """Compiled programs stored on disk, keyed by source hash and interpreter.
+
+    Entries live in `<directory>/<interpreter version>/<sha256 of source>.loxc`,
+    so editing a script or upgrading the interpreter simply misses and writes
+    a new entry. Unreadable or corrupt entries are treated as misses.
+    """
+
+    def __init__(self, directory: Path | str | None = None):
+        directory = Path(directory) if directory is not None else default_directory()
+        self.directory = directory / interpreter_version()
+
+    def key(self, path: str) -> str:
+        with open(path, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+
+    def entry(self, key: str) -> Path:
+        return self.directory / f"{key}{SUFFIX}"
+
+    def load(self, key: str) -> object | None:
+        try:
+            with open(self.entry(key), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        # Unpickling allocates the whole tree at once; collector passes in the
+        # middle of that find nothing to free and cost about a third of a load.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return ProgramUnpickler(io.BytesIO(data)).load()
+        except Exception:
+            return None
+        finally:
+            if enabled:
+                gc.enable()
+
+    def store(self, key: str, program: object):
+        try:
+            data = pickle.dumps(program, pickle.HIGHEST_PROTOCOL)
+        except RecursionError:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write then rename, so concurrent runs never see half an entry.
+            fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temporary, self.entry(key))
+        except OSError:
+            Path(temporary).unlink(missing_ok=True)
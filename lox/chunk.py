@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from lox.opcodes import OPERANDS, OpCode
+
+
+class Chunk:
+    """The bytecode of one function, or of a script's top-level code.
+
+    `code` is a flat list of opcodes and operands, with the source line of
+    each entry in `lines`. Literal values, tokens for error reports and the
+    chunks of nested functions are operands by their index in `constants`.
+    """
+
+    __slots__ = ("name", "arity", "code", "lines", "constants", "constant_ids")
+
+    def __init__(self, name: str, arity: int = 0):
+        self.name = name
+        self.arity = arity
+        self.code: list[int] = []
+        self.lines: list[int] = []
+        self.constants: list[object] = []
+        self.constant_ids: dict[tuple[type, object], int] = {}
+
+    def emit(self, op: OpCode, *operands: int, line: int) -> int:
+        """Append an instruction; returns its offset."""
+        assert len(operands) == OPERANDS[op]
+        offset = len(self.code)
+        self.code.append(op.value)
+        self.code.extend(operands)
+        self.lines.extend([line] * (1 + len(operands)))
+        return offset
+
+    def constant(self, value: object) -> int:
+        """The index of `value` in the pool, adding it if it is new. Chunks
+        are never shared; other values are stored once per chunk."""
+        if isinstance(value, Chunk):
+            self.constants.append(value)
+            return len(self.constants) - 1
+        key = (type(value), value)
+        index = self.constant_ids.get(key)
+        if index is None:
+            index = self.constant_ids[key] = len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def patch(self, offset: int, target: int):
+        """Point the jump at `offset` to `target`."""
+        self.code[offset + 1] = target
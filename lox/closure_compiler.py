@@ -0,0 +1,482 @@
+from __future__ import annotations
+
+import operator
+from collections.abc import Callable
+from typing import override
+
+from lox.compiled_function import NEXT, CompiledFunction, TailCall
+from lox.completion import Completion
+from lox.environment import Environment
+from lox.errors import LoxRuntimeError
+from lox.expr_types import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+from lox.globals import UNDEFINED
+from lox.interpreter import Interpreter
+from lox.lox_callable import LoxCallable
+from lox.stmt_types import (
+    Block,
+    Break,
+    Continue,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from lox.token_type import Token, TokenType
+
+# Compiled code: called with the current Environment, None in top-level code.
+# Expressions return their value, statements NEXT, a returned value, a
+# TailCall, or BREAK or CONTINUE.
+Code = Callable[[Environment | None], object]
+
+BREAK = Completion.BREAK
+CONTINUE = Completion.CONTINUE
+
+
+def nil(environment: Environment | None) -> None:
+    return None
+
+
+# Operators that need two numbers, applied to the operands as floats.
+NUMERIC = {
+    TokenType.SLASH: operator.truediv,
+    TokenType.STAR: operator.mul,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+
+class ClosureCompiler(Expr.Visitor[Code], Stmt.Visitor[Code]):
+    """Runs resolved statements by first compiling them to Python closures.
+
+    Each node is visited once and becomes a closure that calls its
+    children's closures directly, with everything Interpreter decides on
+    every visit settled up front: which operator, where a variable lives,
+    whether a block needs an Environment. A returned value comes back as
+    the result of statement closures, and so do BREAK and CONTINUE. Values,
+    Environments, Globals and error messages are Interpreter's, so both
+    engines run programs identically.
+    """
+
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+        # Whether the code being compiled runs with no Environment, so its
+        # declarations define globals.
+        self.top_level = True
+
+    def interpret(self, statements: list[Stmt]):
+        try:
+            for code in [self.compile(statement) for statement in statements]:
+                code(None)
+        except LoxRuntimeError as error:
+            from lox.lox import Lox
+
+            Lox.runtime_error(error)
+
+    def compile(self, node: Expr | Stmt) -> Code:
+        return node.accept(self)
+
+    def sequence(self, statements: list[Stmt]) -> Code:
+        compiled = [self.compile(statement) for statement in statements]
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def run(environment):
+            for statement in compiled:
+                result = statement(environment)
+                if result is not NEXT:
+                    return result
+            return NEXT
+
+        return run
+
+    def nested(self, statements: list[Stmt]) -> Code:
+        """`sequence`, for statements that run in an Environment of their own."""
+        top_level, self.top_level = self.top_level, False
+        try:
+            return self.sequence(statements)
+        finally:
+            self.top_level = top_level
+
+    # Statement visitors
+    @override
+    def visit_block_stmt(self, stmt: Block):
+        if stmt.elided:
+            return self.sequence(stmt.statements)
+        body = self.nested(stmt.statements)
+
+        def block(environment):
+            return body(Environment(environment))
+
+        return block
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        return lambda environment: BREAK
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        return lambda environment: CONTINUE
+
+    @override
+    def visit_expression_stmt(self, stmt: Expression):
+        expression = self.compile(stmt.expression)
+
+        def run(environment):
+            expression(environment)
+            return NEXT
+
+        return run
+
+    @override
+    def visit_function_stmt(self, stmt: Function):
+        declaration = stmt
+        body = self.nested(stmt.body)
+        slot = stmt.slot
+        if self.top_level:
+            values = self.globals.values
+
+            def define_global(environment):
+                values[slot] = CompiledFunction(declaration, body, environment)
+                return NEXT
+
+            return define_global
+
+        def define(environment):
+            environment.define(slot, CompiledFunction(declaration, body, environment))
+            return NEXT
+
+        return define
+
+    @override
+    def visit_if_stmt(self, stmt: If):
+        condition = self.compile(stmt.condition)
+        then_branch = self.compile(stmt.then_branch)
+        if stmt.else_branch is None:
+
+            def run(environment):
+                value = condition(environment)
+                if value is not None and value is not False:
+                    return then_branch(environment)
+                return NEXT
+
+            return run
+
+        else_branch = self.compile(stmt.else_branch)
+
+        def run_else(environment):
+            value = condition(environment)
+            if value is not None and value is not False:
+                return then_branch(environment)
+            return else_branch(environment)
+
+        return run_else
+
+    @override
+    def visit_print_stmt(self, stmt: Print):
+        expression = self.compile(stmt.expression)
+        stringify = self.interpreter.stringify
+
+        def run(environment):
+            print(stringify(expression(environment)))
+            return NEXT
+
+        return run
+
+    @override
+    def visit_return_stmt(self, stmt: Return):
+        if stmt.value is None:
+            return nil
+        if stmt.tail:
+            return self.tail_call(stmt.value)  # type: ignore
+        return self.compile(stmt.value)
+
+    def tail_call(self, expr: Call) -> Code:
+        """A `return` of `expr`, which leaves a call to a function compiled
+        here to the caller, as a TailCall."""
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def tail_call(environment):
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+            if type(function) is CompiledFunction:
+                if len(values) != function.parameters:
+                    raise LoxRuntimeError(
+                        paren,
+                        f"Expected {function.parameters} arguments"
+                        f" but got {len(values)}",
+                    )
+                return TailCall(function, values)
+            return call_callable(interpreter, function, values, paren)
+
+        return tail_call
+
+    @override
+    def visit_var_stmt(self, stmt: Var):
+        initializer = nil
+        if stmt.initializer is not None:
+            initializer = self.compile(stmt.initializer)
+        slot = stmt.slot
+        if self.top_level:
+            values = self.globals.values
+
+            def define_global(environment):
+                values[slot] = initializer(environment)
+                return NEXT
+
+            return define_global
+
+        def define(environment):
+            environment.define(slot, initializer(environment))
+            return NEXT
+
+        return define
+
+    @override
+    def visit_while_stmt(self, stmt: While):
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+        increment = None
+        if stmt.increment is not None:
+            increment = self.compile(stmt.increment)
+
+        def run(environment):
+            while True:
+                value = condition(environment)
+                if value is None or value is False:
+                    return NEXT
+                result = body(environment)
+                if result is not NEXT:
+                    if result is BREAK:
+                        return NEXT
+                    if result is not CONTINUE:
+                        return result
+                if increment is not None:
+                    increment(environment)
+
+        return run
+
+    # Expression visitors
+    @override
+    def visit_assign_expr(self, expr: Assign):
+        value = self.compile(expr.value)
+        name, depth, slot = expr.name, expr.depth, expr.slot
+        if depth is None:
+            table = self.globals
+            values = table.values
+
+            def assign_global(environment):
+                result = value(environment)
+                if values[slot] is UNDEFINED:  # type: ignore
+                    table.assign(name, slot, result)  # type: ignore
+                values[slot] = result  # type: ignore
+                return result
+
+            return assign_global
+        if depth == 0:
+
+            def assign_local(environment):
+                result = environment.values[slot] = value(environment)
+                return result
+
+            return assign_local
+
+        def assign(environment):
+            result = environment.ancestor(depth).values[slot] = value(environment)
+            return result
+
+        return assign
+
+    @override
+    def visit_binary_expr(self, expr: Binary):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        token = expr.operator
+        interpreter = self.interpreter
+
+        match token.type:
+            case TokenType.PLUS:
+
+                def add(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a + b
+                    if isinstance(a, (float, int)) and isinstance(b, (float, int)):
+                        return float(a) + float(b)
+                    if isinstance(a, str) and isinstance(b, str):
+                        return a + b
+                    raise LoxRuntimeError(token, "Operands must be numbers")
+
+                return add
+            case TokenType.MINUS:
+                check_operand = interpreter.check_number_operand
+
+                def subtract(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    if type(a) is float and type(b) is float:
+                        return a - b
+                    check_operand(token, b)
+                    return float(a) - float(b)  # type: ignore
+
+                return subtract
+            case TokenType.EQUAL_EQUAL:
+
+                def equal(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    return a is b or a == b
+
+                return equal
+            case TokenType.BANG_EQUAL:
+
+                def not_equal(environment):
+                    a = left(environment)
+                    b = right(environment)
+                    return not (a is b or a == b)
+
+                return not_equal
+
+        apply = NUMERIC[token.type]
+        check_operands = interpreter.check_number_operands
+
+        def numeric(environment):
+            a = left(environment)
+            b = right(environment)
+            if type(a) is float and type(b) is float:
+                return apply(a, b)
+            check_operands(token, a, b)
+            return apply(float(a), float(b))  # type: ignore
+
+        return numeric
+
+    @override
+    def visit_call_expr(self, expr: Call):
+        callee = self.compile(expr.callee)
+        arguments = [self.compile(argument) for argument in expr.arguments]
+        paren = expr.paren
+        interpreter = self.interpreter
+
+        def call(environment):
+            function = callee(environment)
+            values = [argument(environment) for argument in arguments]
+            # Functions compiled here are called inline; anything else goes
+            # through the LoxCallable protocol, as in Interpreter.
+            if type(function) is CompiledFunction:
+                if len(values) != function.parameters:
+                    raise LoxRuntimeError(
+                        paren,
+                        f"Expected {function.parameters} arguments"
+                        f" but got {len(values)}",
+                    )
+                result = function.body(Environment(function.closure, values))
+                while type(result) is TailCall:
+                    function = result.function
+                    frame = Environment(function.closure, result.arguments)
+                    result = function.body(frame)
+                return None if result is NEXT else result
+            return call_callable(interpreter, function, values, paren)
+
+        return call
+
+    @override
+    def visit_grouping_expr(self, expr: Grouping):
+        return self.compile(expr.expression)
+
+    @override
+    def visit_literal_expr(self, expr: Literal):
+        value = expr.value
+        return lambda environment: value
+
+    @override
+    def visit_logical_expr(self, expr: Logical):
+        left = self.compile(expr.left)
+        right = self.compile(expr.right)
+        if expr.operator.type == TokenType.OR:
+
+            def logical_or(environment):
+                value = left(environment)
+                if value is not None and value is not False:
+                    return value
+                return right(environment)
+
+            return logical_or
+
+        def logical_and(environment):
+            value = left(environment)
+            if value is None or value is False:
+                return value
+            return right(environment)
+
+        return logical_and
+
+    @override
+    def visit_unary_expr(self, expr: Unary):
+        right = self.compile(expr.right)
+        if expr.operator.type == TokenType.BANG:
+
+            def negate(environment):
+                value = right(environment)
+                return value is None or value is False
+
+            return negate
+
+        def minus(environment):
+            return -float(right(environment))  # type: ignore
+
+        return minus
+
+    @override
+    def visit_variable_expr(self, expr: Variable):
+        name, depth, slot = expr.name, expr.depth, expr.slot
+        if depth is None:
+            table = self.globals
+            values = table.values
+
+            def get_global(environment):
+                value = values[slot]  # type: ignore
+                if value is UNDEFINED:
+                    return table.get(name, slot)  # type: ignore
+                return value
+
+            return get_global
+        if depth == 0:
+            return lambda environment: environment.values[slot]
+        if depth == 1:
+            return lambda environment: environment.enclosing.values[slot]
+        return lambda environment: environment.ancestor(depth).values[slot]
+
+
+def call_callable(
+    interpreter: Interpreter, function: object, values: list[object], paren: Token
+) -> object:
+    """Call anything but a CompiledFunction through the LoxCallable protocol,
+    as in Interpreter."""
+    if not isinstance(function, LoxCallable):
+        raise LoxRuntimeError(paren, "Can only call functions and classes.")
+    if len(values) != function.arity():
+        raise LoxRuntimeError(
+            paren,
+            f"Expected {function.arity()} arguments but got {len(values)}",
+        )
+    return function.call(interpreter, values)
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import override
+
+from lox.environment import Environment
+from lox.lox_callable import LoxCallable
+from lox.stmt_types import Function
+
+# What a compiled statement returns when control falls through to the next
+# statement; anything else is the value of a `return` on the way out.
+NEXT = object()
+
+
+class TailCall:
+    """What a function's code returns for a `return` of a call to a Lox
+    function: the call, for its caller to make once this function's Python
+    frames are gone, so tail calls take no Python stack."""
+
+    __slots__ = ("function", "arguments")
+
+    def __init__(self, function: object, arguments: list[object]):
+        self.function = function
+        self.arguments = arguments
+
+
+class CompiledFunction(LoxCallable):
+    """A Lox function whose body ClosureCompiler has turned into a closure."""
+
+    __slots__ = ("declaration", "body", "closure", "parameters")
+
+    def __init__(
+        self,
+        declaration: Function,
+        body: Callable[[Environment], object],
+        closure: Environment | None,
+    ):
+        self.declaration = declaration
+        self.body = body
+        self.closure = closure
+        self.parameters = len(declaration.params)
+
+    @override
+    def call(self, interpreter, arguments: list[object]) -> object:
+        result = self.body(Environment(self.closure, arguments))
+        while type(result) is TailCall:
+            function: CompiledFunction = result.function  # type: ignore
+            result = function.body(Environment(function.closure, result.arguments))
+        return None if result is NEXT else result
+
+    @override
+    def arity(self) -> int:
+        return self.parameters
+
+    def __str__(self):
+        return f"<fn {self.declaration.name.lexeme} >"
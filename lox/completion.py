@@ -0,0 +1,18 @@
+from enum import Enum, auto
+
+
+class Completion(Enum):
+    """How a statement ended, when it did not just run to its end.
+
+    Interpreter's statement visitors return one of these, or None to go on
+    with the next statement, so `return`, `break` and `continue` unwind by
+    returning rather than raising. A `return` leaves its value in
+    `Interpreter.returned`; a tail call leaves the function it calls and
+    the arguments there instead, for `LoxFunction.call` to run in place of
+    the function returning.
+    """
+
+    RETURN = auto()
+    BREAK = auto()
+    CONTINUE = auto()
+    TAIL_CALL = auto()
@@ -0,0 +1,72 @@
+"""Human-readable listings of VM bytecode."""
+
+from __future__ import annotations
+
+from lox.chunk import Chunk
+from lox.opcodes import OPERANDS, OpCode
+from lox.token_type import Token
+
+# Operands that index the constant pool, by opcode.
+CONSTANT_OPERANDS = {
+    OpCode.CONSTANT: (0,),
+    OpCode.CLOSURE: (0,),
+    OpCode.GET_GLOBAL: (1,),
+    OpCode.SET_GLOBAL: (1,),
+    OpCode.CALL: (1,),
+} | {
+    op: (0,)
+    for op in (
+        OpCode.GREATER,
+        OpCode.GREATER_EQUAL,
+        OpCode.LESS,
+        OpCode.LESS_EQUAL,
+        OpCode.ADD,
+        OpCode.SUBTRACT,
+        OpCode.MULTIPLY,
+        OpCode.DIVIDE,
+    )
+}
+
+
+def disassemble(chunk: Chunk) -> str:
+    """A listing of `chunk` followed by those of the functions it defines."""
+    lines = [f"== {chunk.name} =="]
+    offset = 0
+    while offset < len(chunk.code):
+        text, offset = instruction(chunk, offset)
+        lines.append(text)
+    listing = "\n".join(lines)
+    for constant in chunk.constants:
+        if isinstance(constant, Chunk):
+            listing += "\n\n" + disassemble(constant)
+    return listing
+
+
+def instruction(chunk: Chunk, offset: int) -> tuple[str, int]:
+    """The instruction at `offset`, and the offset of the next one."""
+    op = OpCode(chunk.code[offset])
+    operands = chunk.code[offset + 1 : offset + 1 + OPERANDS[op]]
+    if offset > 0 and chunk.lines[offset] == chunk.lines[offset - 1]:
+        line = "   |"
+    else:
+        line = f"{chunk.lines[offset]:4}"
+    shown = []
+    for index, operand in enumerate(operands):
+        if index in CONSTANT_OPERANDS.get(op, ()):
+            shown.append(f"{operand} ({describe(chunk.constants[operand])})")
+        else:
+            shown.append(str(operand))
+    text = f"{offset:04} {line} {op.name:<20} {' '.join(shown)}".rstrip()
+    return text, offset + 1 + len(operands)
+
+
+def describe(constant: object) -> str:
+    if isinstance(constant, Token):
+        return repr(constant.lexeme)
+    if isinstance(constant, Chunk):
+        return f"<fn {constant.name}>"
+    if isinstance(constant, str):
+        return repr(constant)
+    if constant is None:
+        return "nil"
+    return str(constant).lower() if isinstance(constant, bool) else str(constant)
@@ -2,44 +2,49 @@ from __future__ import annotations
 
 from typing import Optional
 
-from lox.errors import LoxRuntimeError
-from lox.token_type import Token
-
 
 class Environment:
-    def __init__(self, enclosing: Optional[Environment] = None):
-        self.values: dict[str, object] = {}
+    """The variables of one local scope, in a list indexed by slot.
+
+    The resolver numbers a frame's variables in declaration order and a
+    variable is read as `values[slot]` in the environment `depth` frames
+    out. Globals live in `Globals`.
+    """
+
+    __slots__ = ("values", "enclosing")
+
+    def __init__(
+        self,
+        enclosing: Optional[Environment] = None,
+        values: Optional[list[object]] = None,
+    ):
+        self.values = [] if values is None else values
         self.enclosing = enclosing
 
-    def define(self, name: str, value: object):
-        self.values[name] = value
+    def define(self, slot: int, value: object):
+        values = self.values
+        # Variables in scope hold the slots below this one, so the list is
+        # never shorter than `slot`; it is longer when an elided block
+        # (e.g. a loop body) runs again or reuses a finished block's slots.
+        if slot == len(values):
+            values.append(value)
+        else:
+            values[slot] = value
 
-    def ancestor(self, distance: int):
+    def ancestor(self, distance: int) -> Environment:
         environment = self
-        for _ in range(distance):
-            environment = environment.enclosing
+        while distance:
+            environment = environment.enclosing  # type: ignore
+            distance -= 1
         return environment
 
-    def get_at(self, distance: int, name: str):
-        return self.ancestor(distance).values.get(name)
-
-    def assign_at(self, distance: int, name: Token, value: object):
-        self.ancestor(distance).values[name.lexeme] = value
+    def get_at(self, distance: int, slot: int) -> object:
+        if distance == 0:
+            return self.values[slot]
+        return self.ancestor(distance).values[slot]
 
-    def get(self, name: Token):
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
+    def assign_at(self, distance: int, slot: int, value: object):
+        if distance == 0:
+            self.values[slot] = value
         else:
-            raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
-
-    def assign(self, name: Token, value: object):
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
-
-        raise LoxRuntimeError(name, f"Undefined variable {name.lexeme}.")
+            self.ancestor(distance).values[slot] = value
@@ -1,3 +1,5 @@
+from dataclasses import dataclass
+
 from lox.token_type import Token
 
 
@@ -7,3 +9,15 @@ class LoxRuntimeError(Exception):
     def __init__(self, token: Token, message: str):
         super().__init__(message)
         self.token = token
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """A compile error, kept instead of printed while `Lox.diagnostics` is set."""
+
+    line: int
+    where: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"[line {self.line}] Error{self.where}: {self.message}"
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Protocol
 
 from lox.token_type import Token
 
 
-@dataclass(frozen=True)
+# Slotted, and compared and hashed by identity: two nodes spelling the same
+# code at the same place are still different nodes with their own slots.
+@dataclass(slots=True, eq=False)
 class Expr(ABC):
     @abstractmethod
     def accept[R](self, visitor: Expr.Visitor[R]) -> R:
@@ -23,17 +25,61 @@ class Expr(ABC):
         def visit_unary_expr(self, expr: Unary) -> R: ...
         def visit_variable_expr(self, expr: Variable) -> R: ...
 
+        def visit_add_expr(self, expr: Add) -> R:
+            return self.visit_binary_expr(expr)
 
-@dataclass(frozen=True)
+        def visit_subtract_expr(self, expr: Subtract) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_multiply_expr(self, expr: Multiply) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_divide_expr(self, expr: Divide) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_greater_expr(self, expr: Greater) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_greater_equal_expr(self, expr: GreaterEqual) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_less_expr(self, expr: Less) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_less_equal_expr(self, expr: LessEqual) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_equal_expr(self, expr: Equal) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_not_equal_expr(self, expr: NotEqual) -> R:
+            return self.visit_binary_expr(expr)
+
+        def visit_float_add_expr(self, expr: FloatAdd) -> R:
+            return self.visit_add_expr(expr)
+
+        def visit_string_add_expr(self, expr: StringAdd) -> R:
+            return self.visit_add_expr(expr)
+
+        def visit_generic_add_expr(self, expr: GenericAdd) -> R:
+            return self.visit_add_expr(expr)
+
+        def visit_invariant_expr(self, expr: Invariant) -> R:
+            return self.visit_grouping_expr(expr)
+
+
+@dataclass(slots=True, eq=False)
 class Assign(Expr):
     name: Token
     value: Expr
+    depth: int | None = field(default=None, init=False, repr=False)
+    slot: int | None = field(default=None, init=False, repr=False)
 
     def accept[R](self, visitor: Expr.Visitor[R]) -> R:
         return visitor.visit_assign_expr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, eq=False)
 class Binary(Expr):
     left: Expr
     operator: Token
@@ -43,17 +89,18 @@ class Binary(Expr):
         return visitor.visit_binary_expr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, eq=False)
 class Call(Expr):
     callee: Expr
     paren: Token
     arguments: list[Expr]
+    site: int | None = field(default=None, init=False, repr=False)
 
     def accept[R](self, visitor: Expr.Visitor[R]) -> R:
         return visitor.visit_call_expr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, eq=False)
 class Grouping(Expr):
     expression: Expr
 
@@ -61,7 +108,7 @@ class Grouping(Expr):
         return visitor.visit_grouping_expr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, eq=False)
 class Literal(Expr):
     value: object
 
@@ -69,7 +116,7 @@ class Literal(Expr):
         return visitor.visit_literal_expr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, eq=False)
 class Logical(Expr):
     left: Expr
     operator: Token
@@ -79,7 +126,7 @@ class Logical(Expr):
         return visitor.visit_logical_expr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, eq=False)
 class Unary(Expr):
     operator: Token
     right: Expr
@@ -88,9 +135,95 @@ class Unary(Expr):
         return visitor.visit_unary_expr(self)
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, eq=False)
 class Variable(Expr):
     name: Token
+    depth: int | None = field(default=None, init=False, repr=False)
+    slot: int | None = field(default=None, init=False, repr=False)
 
     def accept[R](self, visitor: Expr.Visitor[R]) -> R:
         return visitor.visit_variable_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class Add(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_add_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class Subtract(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_subtract_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class Multiply(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_multiply_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class Divide(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_divide_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class Greater(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_greater_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class GreaterEqual(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_greater_equal_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class Less(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_less_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class LessEqual(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_less_equal_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class Equal(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_equal_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class NotEqual(Binary):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_not_equal_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class FloatAdd(Add):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_float_add_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class StringAdd(Add):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_string_add_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class GenericAdd(Add):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_generic_add_expr(self)
+
+
+@dataclass(slots=True, eq=False)
+class Invariant(Grouping):
+    def accept[R](self, visitor: Expr.Visitor[R]) -> R:
+        return visitor.visit_invariant_expr(self)
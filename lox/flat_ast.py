@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import dataclasses
+from array import array
+from collections.abc import Iterator
+
+from lox.expr_types import Expr
+from lox.parser import Parser
+from lox.stmt_types import Stmt
+from lox.symbol_table import SymbolTable
+from lox.token_buffer import TokenBuffer
+from lox.token_type import Token, TokenType
+
+NONE = -1
+COLUMNS = 4
+
+# How a node field is stored in its column, by the field's annotation.
+CHILD, CHILDREN, TOKEN, TOKENS, CONSTANT, SLOT = range(6)
+ENCODINGS = {
+    "Expr": CHILD,
+    "Stmt": CHILD,
+    "list[Expr]": CHILDREN,
+    "list[Stmt]": CHILDREN,
+    "Token": TOKEN,
+    "list[Token]": TOKENS,
+    "object": CONSTANT,
+    "int | None": SLOT,
+    "bool | None": SLOT,
+}
+
+
+def node_classes(base: type) -> list[type]:
+    """`base`'s node classes, including variants of node classes."""
+    classes = []
+    for cls in base.__subclasses__():
+        if not issubclass(cls, NodeView):
+            classes += [cls, *node_classes(cls)]
+    return classes
+
+
+class NodeView:
+    """Mixed into the views `FlatAst.node` hands out.
+
+    A view subclasses the node class it stands for, so visitors and
+    isinstance checks treat it like that node, but its fields are properties
+    reading one row of the arrays. Views are made on demand and compare equal
+    when they show the same row.
+    """
+
+    __slots__ = ()
+    ast: FlatAst
+    index: int
+
+    def __init__(self, ast: FlatAst, index: int):
+        self.ast = ast
+        self.index = index
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, NodeView)
+            and self.ast is other.ast
+            and self.index == other.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.ast), self.index))
+
+    def __reduce__(self):
+        return view, (self.ast, self.index)
+
+    def become(self, cls: type):
+        """Make this row a `cls`, a node class with the same fields, in the
+        views handed out from now on."""
+        self.ast.kinds[self.index] = FlatAst.codes[cls]
+
+
+def view(ast: FlatAst, index: int) -> NodeView:
+    return ast.node(index)
+
+
+def field_property(column: int, encoding: int) -> property:
+    def get(self: NodeView):
+        ast = self.ast
+        value = ast.columns[column][self.index]
+        if encoding == CONSTANT:
+            return ast.constants[value]
+        if value == NONE:
+            return None
+        if encoding == SLOT:
+            return value
+        if encoding == CHILD:
+            return ast.node(value)
+        if encoding == TOKEN:
+            return ast.token(value)
+        members = ast.lists[value + 1 : value + 1 + ast.lists[value]]
+        if encoding == CHILDREN:
+            return [ast.node(member) for member in members]
+        return [ast.token(member) for member in members]
+
+    def set(self: NodeView, value: int | None):
+        self.ast.columns[column][self.index] = NONE if value is None else value
+
+    return property(get, set if encoding == SLOT else None)
+
+
+def view_class(cls: type) -> tuple[type, tuple[tuple[str, int], ...]]:
+    """The view class for node class `cls`, and its fields' encodings."""
+    layout = tuple(
+        (field.name, ENCODINGS[field.type]) for field in dataclasses.fields(cls)
+    )
+    if len(layout) > COLUMNS:
+        raise TypeError(f"{cls.__name__} has more fields than FlatAst has columns")
+    namespace: dict[str, object] = {"__slots__": ("ast", "index")}
+    for column, (name, encoding) in enumerate(layout):
+        namespace[name] = field_property(column, encoding)
+    return type(f"{cls.__name__}View", (NodeView, cls), namespace), layout
+
+
+class FlatAst:
+    """A program's AST stored as rows of parallel typed arrays.
+
+    Row `i` is one node: `kinds[i]` says which class, and up to four
+    columns hold its fields in declaration order. Child nodes are row
+    numbers, tokens are rows of the token arrays, lists are offsets into
+    `lists` (a count followed by the members), literal values index
+    `constants` and resolver slots hold their value, with -1 for None.
+    A node costs 17 bytes instead of a Python object per node, list and token.
+
+    `node(i)` returns a view that Interpreter, Resolver and AstPrinter walk
+    like the object tree.
+    """
+
+    classes = node_classes(Expr) + node_classes(Stmt)
+    codes = {cls: code for code, cls in enumerate(classes)}
+    views, layouts = zip(*(view_class(cls) for cls in classes))
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.a = array("i")
+        self.b = array("i")
+        self.c = array("i")
+        self.d = array("i")
+        self.columns = (self.a, self.b, self.c, self.d)
+        self.lists = array("i")
+        self.constants: list[object] = []
+        self.constant_ids: dict[tuple[type, object], int] = {}
+        self.token_lexemes = array("I")
+        self.token_lines = array("I")
+        # A lexeme always scans to the same token type, so it is kept per
+        # lexeme rather than per token.
+        self.lexemes = SymbolTable()
+        self.lexeme_types = array("B")
+        # Rows of the tokens seen in the declaration being added, so a name
+        # used several times on one line is stored once.
+        self.token_rows: dict[tuple[int, int], int] = {}
+        self.statements = array("i")
+
+    @classmethod
+    def parse(cls, parser: Parser) -> FlatAst:
+        """Parse a whole program, flattening one declaration at a time so the
+        object tree of at most one declaration exists at once."""
+        ast = cls()
+        while not parser.is_at_end():
+            declaration = parser.declaration()
+            if declaration is not None:
+                ast.statements.append(ast.add(declaration))
+                ast.token_rows.clear()
+        return ast
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __iter__(self) -> Iterator[NodeView]:
+        """The top-level statements."""
+        for index in self.statements:
+            yield self.node(index)
+
+    def node(self, index: int) -> NodeView:
+        return self.views[self.kinds[index]](self, index)
+
+    def token(self, index: int) -> Token:
+        symbol = self.token_lexemes[index]
+        token_type = TokenBuffer.token_types[self.lexeme_types[symbol]]
+        lexeme = self.lexemes.name(symbol)
+        literal = None
+        if token_type is TokenType.NUMBER:
+            literal = float(lexeme)
+        elif token_type is TokenType.STRING:
+            literal = lexeme[1:-1]
+        return Token(token_type, lexeme, literal, self.token_lines[index])
+
+    def add(self, node: Expr | Stmt) -> int:
+        """Append `node` and everything below it; returns its row."""
+        code = self.codes[type(node)]
+        values = [
+            self.encode(getattr(node, name), encoding)
+            for name, encoding in self.layouts[code]
+        ]
+        values += [NONE] * (COLUMNS - len(values))
+        index = len(self.kinds)
+        self.kinds.append(code)
+        self.a.append(values[0])
+        self.b.append(values[1])
+        self.c.append(values[2])
+        self.d.append(values[3])
+        return index
+
+    def encode(self, value: object, encoding: int) -> int:
+        if encoding == CONSTANT:
+            key = (type(value), value)
+            constant = self.constant_ids.get(key)
+            if constant is None:
+                constant = self.constant_ids[key] = len(self.constants)
+                self.constants.append(value)
+            return constant
+        if value is None:
+            return NONE
+        if encoding == SLOT:
+            return value  # type: ignore
+        if encoding == CHILD:
+            return self.add(value)  # type: ignore
+        if encoding == TOKEN:
+            return self.add_token(value)  # type: ignore
+        add = self.add if encoding == CHILDREN else self.add_token
+        members = [add(member) for member in value]  # type: ignore
+        offset = len(self.lists)
+        self.lists.append(len(members))
+        self.lists.extend(members)
+        return offset
+
+    def add_token(self, token: Token) -> int:
+        lexemes = self.lexemes
+        if token.lexeme not in lexemes.ids:
+            self.lexeme_types.append(TokenBuffer.codes[token.type])
+        key = (lexemes.id(token.lexeme), token.line)
+        index = self.token_rows.get(key)
+        if index is None:
+            index = self.token_rows[key] = len(self.token_lexemes)
+            self.token_lexemes.append(key[0])
+            self.token_lines.append(token.line)
+        return index
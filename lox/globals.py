@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from lox.errors import LoxRuntimeError
+from lox.symbol_table import SymbolTable
+from lox.token_type import Token
+
+# What a global's slot holds until its declaration runs. Lox's nil is None,
+# so an undefined global needs a value of its own.
+UNDEFINED = object()
+
+
+class Globals:
+    """The global scope, as a list of values indexed by slot.
+
+    The resolver gives each global name a slot the first time it sees the
+    name, whether in its declaration or in a use, so functions may use
+    globals declared after them, and a redeclaration (as in the REPL)
+    reuses the slot. Reading a slot whose declaration has not run yet is
+    the undefined-variable error.
+    """
+
+    def __init__(self):
+        self.names = SymbolTable()
+        self.values: list[object] = []
+
+    def slot(self, name: str) -> int:
+        slot = self.names.id(name)
+        if slot == len(self.values):
+            self.values.append(UNDEFINED)
+        return slot
+
+    def bind(self, names: Sequence[str]) -> bool:
+        """Give `names` the slots a program compiled elsewhere expects: slot
+        `i` for `names[i]`. False if some name already has another slot."""
+        return all(self.slot(name) == slot for slot, name in enumerate(names))
+
+    def define(self, name: str, value: object):
+        self.values[self.slot(name)] = value
+
+    def get(self, name: Token, slot: int) -> object:
+        value = self.values[slot]
+        if value is UNDEFINED:
+            raise LoxRuntimeError(name, f"Undefined variable '{name.lexeme}'.")
+        return value
+
+    def assign(self, name: Token, slot: int, value: object):
+        values = self.values
+        if values[slot] is UNDEFINED:
+            raise LoxRuntimeError(name, f"Undefined variable {name.lexeme}.")
+        values[slot] = value
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from itertools import chain
+
+from lox.interpreter import Interpreter
+from lox.lox import Lox
+from lox.optimizer import Optimizer
+from lox.parser import Parser
+from lox.resolver import Resolver
+from lox.scanner import Scanner
+from lox.stmt_types import Stmt
+from lox.symbol_table import SymbolTable
+from lox.token_buffer import TokenBuffer
+from lox.token_type import Token, TokenType
+
+
+class Declaration:
+    """One compiled top-level declaration and where it sits in the source."""
+
+    __slots__ = ("start", "end", "statements")
+
+    def __init__(self, start: int, end: int, statements: list[Stmt]):
+        self.start = start
+        self.end = end
+        self.statements = statements
+
+
+class DeclarationParser(Parser):
+    """Parses the tokens of one declaration and records syntax errors instead
+    of reporting them; cut off at the declaration's end, error recovery would
+    not report what a whole-file parse does."""
+
+    def __init__(self, buffer: TokenBuffer, begin: int, end: int):
+        super().__init__(
+            chain(
+                (buffer.token(index) for index in range(begin, end)),
+                (Token(TokenType.EOF, "", None, buffer.lines[end - 1]),),
+            )
+        )
+        self.failed = False
+
+    def error(self, token: Token, message: str):
+        self.failed = True
+        return self.ParseError()
+
+
+def common_prefix(a: str, b: str) -> int:
+    """Length of the longest common prefix, found by comparing halves in C."""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix(a: str, b: str, limit: int) -> int:
+    """Length of the longest common suffix that is at most `limit` long."""
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle : len(a) - low] == b[len(b) - middle : len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class IncrementalCompiler:
+    """Compiles successive versions of a source, redoing only what was edited.
+
+    Each call to `compile` gets the whole text (a REPL input, an editor
+    buffer). It is compared with the previous text, and the top-level
+    declarations lying entirely in the unchanged head and tail keep their
+    compiled statements; only the text between them is scanned, split into
+    declarations, parsed, resolved and optimized. The tail is only reused
+    when the edit did not add or remove lines, since tokens carry their line
+    numbers.
+
+    The resolver lives as long as the compiler and writes its results onto
+    the nodes, so reused declarations keep theirs.
+
+    Of the passes `Lox.compile` runs after resolving, only the Optimizer
+    runs here: inlining, the loop optimizer and `--memoize` rewrite code
+    across declarations and are skipped, without a warning.
+    """
+
+    codes = TokenBuffer.codes
+    semicolon = codes[TokenType.SEMICOLON]
+    left_brace = codes[TokenType.LEFT_BRACE]
+    right_brace = codes[TokenType.RIGHT_BRACE]
+    left_paren = codes[TokenType.LEFT_PAREN]
+    right_paren = codes[TokenType.RIGHT_PAREN]
+    else_ = codes[TokenType.ELSE]
+
+    def __init__(self, interpreter: Interpreter, symbols: SymbolTable):
+        self.interpreter = interpreter
+        self.symbols = symbols
+        self.resolver = Resolver(interpreter)
+        self.optimizer = Optimizer()
+        self.source = ""
+        self.declarations: list[Declaration] = []
+        self.compiled = 0
+        self.reused = 0
+
+    def compile(self, source: str) -> list[Stmt] | None:
+        """Statements for `source`, or None if any declaration had an error."""
+        old, previous = self.source, self.declarations
+        prefix = common_prefix(old, source)
+        suffix = common_suffix(old, source, min(len(old), len(source)) - prefix)
+        shift = len(source) - len(old)
+
+        # A declaration's end depends on the token after it (`else` continues
+        # an `if`), so the head keeps only those followed by another one.
+        front = 0
+        while front + 1 < len(previous) and previous[front + 1].end <= prefix:
+            front += 1
+        low = previous[front - 1].end if front else 0
+
+        # Tokens carry their line numbers, so the tail is only reused when the
+        # edit kept the line count.
+        back = len(previous)
+        if source.count("\n") == old.count("\n"):
+            unchanged = len(source) - suffix
+            while back > front and previous[back - 1].start + shift >= unchanged:
+                back -= 1
+        high = previous[back].start + shift if back < len(previous) else len(source)
+
+        had_error = Lox.had_error
+        Lox.had_error = False
+        # An edit that spills into the tail is scanned again below, so its
+        # scanner errors are held back until it is known not to.
+        diagnostics, Lox.diagnostics = Lox.diagnostics, []
+        try:
+            middle = self.compile_range(source, low, high)
+        finally:
+            held, Lox.diagnostics = Lox.diagnostics, diagnostics
+        if middle is None:
+            Lox.had_error = False
+            back = len(previous)
+            middle = self.compile_range(source, low, len(source))
+        else:
+            for diagnostic in held:
+                # Scanner errors are the ones kept without a `where`.
+                if diagnostic.where:
+                    Lox.report(diagnostic.line, diagnostic.where, diagnostic.message)
+                else:
+                    Lox.scan_error(diagnostic.line, diagnostic.message)
+
+        if Lox.had_error:
+            # Keep the last good state, so the broken text is compiled (and
+            # reported) again next time instead of being reused.
+            return None
+        Lox.had_error = had_error
+
+        tail = previous[back:]
+        for declaration in tail:
+            declaration.start += shift
+            declaration.end += shift
+        self.reused += front + len(tail)
+        self.source = source
+        self.declarations = previous[:front] + middle + tail
+        return [stmt for each in self.declarations for stmt in each.statements]
+
+    def compile_range(
+        self, source: str, low: int, high: int
+    ) -> list[Declaration] | None:
+        """Compile the declarations in `source[low:high]`.
+
+        Returns None, having compiled nothing, when the text does not end on a
+        declaration boundary and more of the source is needed.
+        """
+        scanner = Scanner(source, symbols=self.symbols)
+        scanner.line = 1 + source.count("\n", 0, low)
+        buffer = scanner.scan_buffer(low, high)
+        ranges = self.split(buffer)
+        end, count = ranges[-1][1] if ranges else 0, len(buffer) - 1
+        if high < len(source) and (end < count or scanner.current > high):
+            # A bracket, string or comment opened here continues into the tail.
+            return None
+        if end < count:
+            # Left for the parser to report, e.g. a missing `;` at the end.
+            ranges.append((end, count))
+
+        parsed = []
+        for begin, end in ranges:
+            parser = DeclarationParser(buffer, begin, end)
+            statements = parser.parse()
+            if parser.failed:
+                self.report(source, buffer, begin, high)
+                return []
+            parsed.append(statements)
+        self.compiled += len(ranges)
+
+        # Like Lox.compile, resolve only once every declaration has parsed.
+        declarations = []
+        for (begin, end), statements in zip(ranges, parsed):
+            self.resolver.resolve(statements)
+            if Lox.opt_level:
+                statements = self.optimizer.optimize(statements)
+            declarations.append(
+                Declaration(buffer.starts[begin], buffer.ends[end - 1], statements)
+            )
+        return declarations
+
+    def split(self, buffer: TokenBuffer) -> list[tuple[int, int]]:
+        """Token ranges of the top-level declarations, EOF excluded.
+
+        A declaration ends at a `;` or `}` outside any brackets, unless an
+        `else` follows and continues the same `if` statement. Trailing tokens
+        that never reach such an end are not part of any range.
+        """
+        types = buffer.types
+        count = len(types) - 1
+        ranges = []
+        begin = depth = 0
+        for index in range(count):
+            code = types[index]
+            if code == self.left_brace or code == self.left_paren:
+                depth += 1
+            elif code == self.right_brace or code == self.right_paren:
+                depth -= 1
+            if depth > 0 or code != self.semicolon and code != self.right_brace:
+                continue
+            if index + 1 < count and types[index + 1] == self.else_:
+                continue
+            # Unbalanced closers are left for the parser to report.
+            depth = 0
+            ranges.append((begin, index + 1))
+            begin = index + 1
+        return ranges
+
+    def report(self, source: str, buffer: TokenBuffer, begin: int, high: int):
+        """Parse from token `begin` to the end of `source` in one go.
+
+        Error recovery can run across declarations, so this reports syntax
+        errors exactly as parsing the whole source would.
+        """
+        tokens: Iterable[Token] = (
+            buffer.token(index) for index in range(begin, len(buffer) - 1)
+        )
+        scanner = Scanner(source, symbols=self.symbols)
+        scanner.line = buffer.lines[-1]
+        Parser(chain(tokens, scanner.scan_buffer(high))).parse()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+# What a cache holds before its first call: unlike nil, nothing calls it.
+EMPTY = object()
+
+
+class InlineCache:
+    """The callee one call site last called, once checked to be callable
+    with that site's number of arguments.
+
+    A callee is only ever compared by identity, and a function's arity never
+    changes, so while a site keeps calling the same function the checks are
+    skipped; a different callee is checked and replaces it.
+    """
+
+    __slots__ = ("line", "callee", "hits", "misses")
+
+    def __init__(self, line: int):
+        self.line = line
+        self.callee: object = EMPTY
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"line {self.line}: {self.hits + self.misses} calls,"
+            f" {self.hit_rate:.1%} hits"
+        )
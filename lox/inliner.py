@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from typing import override
+
+from lox.expr_types import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+from lox.purity import global_functions, nodes
+from lox.stmt_types import (
+    Block,
+    Break,
+    Continue,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+
+
+class Inliner(Expr.Visitor[Expr], Stmt.Visitor[None]):
+    """Replaces calls to small global functions with their bodies.
+
+    A function is inlined when its body is a single `return` of an
+    expression of at most `size` nodes that neither calls nor assigns
+    anything; it is then not recursive either. Only global functions (see
+    `global_functions`) are inlined, and only in code after their
+    declaration, which cannot run before the declaration has.
+
+    The body's parameters become the arguments. Literal arguments, and
+    locals when every argument is one, are put in as they are, since the
+    body cannot change them. Otherwise the body must read each parameter
+    once, in order, before it does anything else, so that each argument
+    still runs once and in order. Calls with the wrong number of arguments
+    are left to fail. The body keeps its tokens, so its errors report the
+    lines they did. Trees are rewritten in place, like Optimizer's.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        # The functions that may be inlined in the code being rewritten: the
+        # number of parameters of each and the expression it returns, by slot.
+        self.bodies: dict[int, tuple[int, Expr]] = {}
+
+    def inline(self, statements: list[Stmt]) -> list[Stmt]:
+        functions = global_functions(statements)
+        for statement in statements:
+            statement.accept(self)
+            if isinstance(statement, Function) and statement.slot in functions:
+                body = self.inlinable(statement)
+                if body is not None:
+                    arity = len(statement.params)
+                    self.bodies[statement.slot] = (arity, body)  # type: ignore
+        return statements
+
+    def inlinable(self, function: Function) -> Expr | None:
+        """The expression `function` returns, if its calls can be inlined."""
+        match function.body:
+            case [Return(value=Expr() as value)]:
+                body = list(nodes([value]))
+                if len(body) <= self.size and not any(
+                    isinstance(node, (Call, Assign)) for node in body
+                ):
+                    return value
+        return None
+
+    def rewrite(self, expr: Expr) -> Expr:
+        return expr.accept(self)
+
+    # Statement visitors
+    @override
+    def visit_block_stmt(self, stmt: Block):
+        for statement in stmt.statements:
+            statement.accept(self)
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        pass
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        pass
+
+    @override
+    def visit_expression_stmt(self, stmt: Expression):
+        stmt.expression = self.rewrite(stmt.expression)
+
+    @override
+    def visit_function_stmt(self, stmt: Function):
+        for statement in stmt.body:
+            statement.accept(self)
+
+    @override
+    def visit_if_stmt(self, stmt: If):
+        stmt.condition = self.rewrite(stmt.condition)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+
+    @override
+    def visit_print_stmt(self, stmt: Print):
+        stmt.expression = self.rewrite(stmt.expression)
+
+    @override
+    def visit_return_stmt(self, stmt: Return):
+        if stmt.value is not None:
+            stmt.value = self.rewrite(stmt.value)
+            # An inlined call is no longer a tail call. Resolver alone
+            # decides which returns are.
+            if not isinstance(stmt.value, Call):
+                stmt.tail = False
+
+    @override
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.initializer is not None:
+            stmt.initializer = self.rewrite(stmt.initializer)
+
+    @override
+    def visit_while_stmt(self, stmt: While):
+        stmt.condition = self.rewrite(stmt.condition)
+        stmt.body.accept(self)
+        if stmt.increment is not None:
+            stmt.increment = self.rewrite(stmt.increment)
+
+    # Expression visitors
+    @override
+    def visit_assign_expr(self, expr: Assign):
+        expr.value = self.rewrite(expr.value)
+        return expr
+
+    @override
+    def visit_binary_expr(self, expr: Binary):
+        expr.left = self.rewrite(expr.left)
+        expr.right = self.rewrite(expr.right)
+        return expr
+
+    @override
+    def visit_call_expr(self, expr: Call):
+        expr.callee = self.rewrite(expr.callee)
+        expr.arguments = [self.rewrite(argument) for argument in expr.arguments]
+        callee = expr.callee
+        if not isinstance(callee, Variable) or callee.depth is not None:
+            return expr
+        inlined = self.bodies.get(callee.slot)  # type: ignore
+        if inlined is None:
+            return expr
+        arity, body = inlined
+        if len(expr.arguments) != arity or not substitutable(body, expr.arguments):
+            return expr
+        return substitute(body, expr.arguments)
+
+    @override
+    def visit_grouping_expr(self, expr: Grouping):
+        expr.expression = self.rewrite(expr.expression)
+        return expr
+
+    @override
+    def visit_literal_expr(self, expr: Literal):
+        return expr
+
+    @override
+    def visit_logical_expr(self, expr: Logical):
+        expr.left = self.rewrite(expr.left)
+        expr.right = self.rewrite(expr.right)
+        return expr
+
+    @override
+    def visit_unary_expr(self, expr: Unary):
+        expr.right = self.rewrite(expr.right)
+        return expr
+
+    @override
+    def visit_variable_expr(self, expr: Variable):
+        return expr
+
+
+def steps(body: Expr) -> list[int | None]:
+    """What an inlinable body does, in order: the slot of each parameter it
+    reads, and None for each step that may fail or have an effect."""
+    match body:
+        case Literal():
+            return []
+        case Variable(depth=0):
+            return [body.slot]
+        case Variable():
+            return [None]
+        case Grouping():
+            return steps(body.expression)
+        case Binary():
+            return steps(body.left) + steps(body.right) + [None]
+        case Logical():
+            return steps(body.left) + [None] + steps(body.right)
+        case Unary():
+            return steps(body.right) + [None]
+    raise TypeError(f"{type(body).__name__} is not inlined")
+
+
+def substitutable(body: Expr, arguments: list[Expr]) -> bool:
+    """Whether `arguments` can be put in for the parameters `body` reads."""
+    ordered = [
+        slot
+        for slot, argument in enumerate(arguments)
+        if not isinstance(argument, Literal)
+    ]
+    if all(local(arguments[slot]) for slot in ordered):
+        return True
+    done = [step for step in steps(body) if step is None or step in ordered]
+    count = len(ordered)
+    return done[:count] == ordered and all(step is None for step in done[count:])
+
+
+def local(expr: Expr) -> bool:
+    return isinstance(expr, Variable) and expr.depth is not None
+
+
+def substitute(body: Expr, arguments: list[Expr]) -> Expr:
+    """A copy of `body` reading `arguments` in place of its parameters."""
+    match body:
+        case Literal():
+            return body
+        case Variable(depth=0):
+            argument = arguments[body.slot]  # type: ignore
+            if isinstance(argument, Variable):
+                return variable(argument)
+            return argument
+        case Variable():
+            return variable(body)
+        case Grouping():
+            return Grouping(substitute(body.expression, arguments))
+        case Binary():
+            return type(body)(
+                substitute(body.left, arguments),
+                body.operator,
+                substitute(body.right, arguments),
+            )
+        case Logical():
+            return Logical(
+                substitute(body.left, arguments),
+                body.operator,
+                substitute(body.right, arguments),
+            )
+        case Unary():
+            return Unary(body.operator, substitute(body.right, arguments))
+    raise TypeError(f"{type(body).__name__} is not inlined")
+
+
+def variable(expr: Variable) -> Variable:
+    copy = Variable(expr.name)
+    copy.depth = expr.depth
+    copy.slot = expr.slot
+    return copy
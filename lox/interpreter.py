@@ -1,30 +1,53 @@
 from __future__ import annotations
 
+import operator
 import time
 from typing import override
 
+from lox.completion import Completion
 from lox.environment import Environment
 from lox.errors import LoxRuntimeError
 from lox.expr_types import (
+    Add,
     Assign,
     Binary,
     Call,
+    Divide,
+    Equal,
     Expr,
+    FloatAdd,
+    GenericAdd,
+    Greater,
+    GreaterEqual,
     Grouping,
+    Invariant,
+    Less,
+    LessEqual,
     Literal,
     Logical,
+    Multiply,
+    NotEqual,
+    StringAdd,
+    Subtract,
     Unary,
     Variable,
 )
+from lox.globals import UNDEFINED, Globals
+from lox.inline_cache import InlineCache
 from lox.lox_callable import LoxCallable
 from lox.lox_function import LoxFunction
-from lox.lox_return import LoxReturn
+from lox.memo import MISSING, Memo
+from lox.memoized_function import MemoizedFunction
 from lox.stmt_types import (
     Block,
+    Break,
+    Continue,
+    CountedLoop,
     Expression,
     Function,
     If,
     Print,
+    PureFunction,
     Return,
     Stmt,
     Var,
@@ -33,11 +56,28 @@ from lox.stmt_types import (
 from lox.token_type import Token, TokenType
 
 
-class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
+class Interpreter(Expr.Visitor[object], Stmt.Visitor["Completion | None"]):
     def __init__(self):
-        self.globals = Environment()
-        self.environment = self.globals
-        self.locals: dict[Expr, int] = {}
+        self.globals = Globals()
+        # The innermost local scope; None while running top-level code.
+        self.environment: Environment | None = None
+        # The value of the last `return` run.
+        self.returned: object = None
+        # The results of each pure function declaration, and how many each
+        # keeps.
+        self.memos: dict[Function, Memo] = {}
+        self.memo_size = 1024
+        # Each Call node's InlineCache, at the index in its `site`.
+        self.inline_caches: list[InlineCache] = []
+        # The value of each Invariant node computed in the running loop.
+        self.invariants: dict[Invariant, object] = {}
+        # The operand types each Add not yet rewritten has run with, as the
+        # variant they call for, and how many runs in a row they have.
+        self.warmups: dict[Add, tuple[type[Add], int]] = {}
+        # How many Add nodes were rewritten into each specialized variant, and
+        # how many of each were rewritten back.
+        self.specializations: dict[type[Add], int] = {FloatAdd: 0, StringAdd: 0}
+        self.deoptimizations: dict[type[Add], int] = {FloatAdd: 0, StringAdd: 0}
 
         class ClockCallable(LoxCallable):
             def arity(self) -> int:
@@ -71,6 +111,14 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
     def visit_grouping_expr(self, expr: Grouping):
         return self.evaluate(expr.expression)
 
+    @override
+    def visit_invariant_expr(self, expr: Invariant):
+        try:
+            return self.invariants[expr]
+        except KeyError:
+            value = self.invariants[expr] = expr.expression.accept(self)
+            return value
+
     @override
     def visit_unary_expr(self, expr: Unary) -> object:
         right = self.evaluate(expr.right)
@@ -83,14 +131,18 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
 
     @override
     def visit_variable_expr(self, expr: Variable):
-        return self.look_up_variable(expr.name, expr)
-
-    def look_up_variable(self, name: Token, expr: Expr):
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.environment.get_at(distance, name.lexeme)
-        else:
-            return self.environment.get(name)
+        distance = expr.depth
+        if distance is None:
+            value = self.globals.values[expr.slot]  # type: ignore
+            if value is UNDEFINED:
+                return self.globals.get(expr.name, expr.slot)  # type: ignore
+            return value
+        # Inlined Environment.get_at: this is the hottest path in most code.
+        environment = self.environment
+        while distance:
+            environment = environment.enclosing  # type: ignore
+            distance -= 1
+        return environment.values[expr.slot]  # type: ignore
 
     @override
     def visit_binary_expr(self, expr: Binary) -> object:
@@ -130,45 +182,243 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
             case TokenType.EQUAL_EQUAL:
                 return self.is_equal(left, right)
 
+    # The parser makes a variant of Binary per operator. Each evaluates its
+    # operands with `accept` directly and has a fast path for two floats; other
+    # operands get the checks and conversions of `visit_binary_expr`.
+
+    # An Add as parsed watches its operand types. Once it has run
+    # QUICKEN_AFTER times in a row with two floats, or two strings, it
+    # rewrites itself into a FloatAdd or StringAdd, which checks for just
+    # those types. Any other operands, before or after that, rewrite it into
+    # a GenericAdd for good: it is not specialized again.
+    @override
+    def visit_add_expr(self, expr: Add) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float:
+            self.observe(expr, FloatAdd)
+            return left + right
+        if type(left) is str and type(right) is str:
+            self.observe(expr, StringAdd)
+            return left + right
+        self.warmups.pop(expr, None)
+        rewrite(expr, GenericAdd)
+        return self.plus(expr, left, right)
+
+    @override
+    def visit_float_add_expr(self, expr: FloatAdd) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float:
+            return left + right
+        return self.deoptimize(expr, FloatAdd, left, right)
+
+    @override
+    def visit_string_add_expr(self, expr: StringAdd) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is str and type(right) is str:
+            return left + right
+        return self.deoptimize(expr, StringAdd, left, right)
+
+    @override
+    def visit_generic_add_expr(self, expr: GenericAdd) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float:
+            return left + right
+        return self.plus(expr, left, right)
+
+    def observe(self, expr: Add, variant: type[Add]):
+        """Count a run of `expr` whose operands call for `variant`, rewriting
+        it once there have been enough in a row."""
+        warmups = self.warmups
+        seen, runs = warmups.get(expr, (variant, 0))
+        if seen is not variant:
+            del warmups[expr]
+            rewrite(expr, GenericAdd)
+        elif runs + 1 == QUICKEN_AFTER:
+            warmups.pop(expr, None)
+            self.specializations[variant] += 1
+            rewrite(expr, variant)
+        else:
+            warmups[expr] = (variant, runs + 1)
+
+    def deoptimize(
+        self, expr: Add, variant: type[Add], left: object, right: object
+    ) -> object:
+        self.deoptimizations[variant] += 1
+        rewrite(expr, GenericAdd)
+        return self.plus(expr, left, right)
+
+    def plus(self, expr: Add, left: object, right: object) -> object:
+        """`left + right` for operands other than two floats."""
+        if isinstance(left, (float, int)) and isinstance(right, (float, int)):
+            return float(left) + float(right)
+        if isinstance(left, str) and isinstance(right, str):
+            return left + right
+        raise LoxRuntimeError(expr.operator, "Operands must be numbers")
+
+    @override
+    def visit_subtract_expr(self, expr: Subtract) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is float and type(right) is float:
+            return left - right
+        self.check_number_operand(expr.operator, right)
+        return float(left) - float(right)  # type: ignore
+
+    @override
+    def visit_multiply_expr(self, expr: Multiply) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is not float or type(right) is not float:
+            left, right = self.numbers(expr.operator, left, right)
+        return left * right  # type: ignore
+
+    @override
+    def visit_divide_expr(self, expr: Divide) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is not float or type(right) is not float:
+            left, right = self.numbers(expr.operator, left, right)
+        return left / right  # type: ignore
+
+    @override
+    def visit_greater_expr(self, expr: Greater) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is not float or type(right) is not float:
+            left, right = self.numbers(expr.operator, left, right)
+        return left > right  # type: ignore
+
+    @override
+    def visit_greater_equal_expr(self, expr: GreaterEqual) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is not float or type(right) is not float:
+            left, right = self.numbers(expr.operator, left, right)
+        return left >= right  # type: ignore
+
+    @override
+    def visit_less_expr(self, expr: Less) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is not float or type(right) is not float:
+            left, right = self.numbers(expr.operator, left, right)
+        return left < right  # type: ignore
+
+    @override
+    def visit_less_equal_expr(self, expr: LessEqual) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if type(left) is not float or type(right) is not float:
+            left, right = self.numbers(expr.operator, left, right)
+        return left <= right  # type: ignore
+
+    @override
+    def visit_equal_expr(self, expr: Equal) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        return left is right or left == right
+
+    @override
+    def visit_not_equal_expr(self, expr: NotEqual) -> object:
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        return not (left is right or left == right)
+
     @override
     def visit_call_expr(self, expr: Call):
-        callee = self.evaluate(expr.callee)
-        arguments: list[object] = []
-        for argument in expr.arguments:
-            arguments.append(self.evaluate(argument))
+        callee = expr.callee.accept(self)
+        arguments = [argument.accept(self) for argument in expr.arguments]
+        try:
+            cache = self.inline_caches[expr.site]  # type: ignore
+        except (IndexError, TypeError):
+            # First run here, or numbered by another Interpreter.
+            cache = self.inline_cache(expr)
+        if callee is cache.callee:
+            cache.hits += 1
+            return callee.call(self, arguments)  # type: ignore
+        cache.misses += 1
+        function = self.callable(callee, len(arguments), expr.paren)
+        cache.callee = function
+        return function.call(self, arguments)
 
+    def checked(self, expr: Call, callee: object) -> LoxCallable:
+        """`callee`, checked to be callable at `expr` unless its inline cache
+        says it was. `visit_call_expr` does the same inline."""
+        try:
+            cache = self.inline_caches[expr.site]  # type: ignore
+        except (IndexError, TypeError):
+            cache = self.inline_cache(expr)
+        if callee is cache.callee:
+            cache.hits += 1
+            return callee  # type: ignore
+        cache.misses += 1
+        cache.callee = self.callable(callee, len(expr.arguments), expr.paren)
+        return cache.callee  # type: ignore
+
+    def inline_cache(self, expr: Call) -> InlineCache:
+        expr.site = len(self.inline_caches)
+        cache = InlineCache(expr.paren.line)
+        self.inline_caches.append(cache)
+        return cache
+
+    def callable(self, callee: object, count: int, paren: Token) -> LoxCallable:
+        """`callee`, once checked to be callable with `count` arguments."""
         if not isinstance(callee, LoxCallable):
-            raise LoxRuntimeError(expr.paren, "Can only call functions and classes.")
+            raise LoxRuntimeError(paren, "Can only call functions and classes.")
 
         function: LoxCallable = callee
-        if len(arguments) != function.arity():
+        if count != function.arity():
             raise LoxRuntimeError(
-                expr.paren,
-                f"Expected {function.arity()} arguments but got {len(arguments)}",
+                paren,
+                f"Expected {function.arity()} arguments but got {count}",
             )
-        return function.call(self, arguments)
+        return function
 
     def evaluate(self, expr: Expr):
         return expr.accept(self)
 
-    def execute(self, stmt: Stmt):
-        stmt.accept(self)
+    def execute(self, stmt: Stmt) -> Completion | None:
+        return stmt.accept(self)
 
-    def resolve(self, expr: Expr, depth: int):
-        self.locals[expr] = depth
+    def resolve(self, expr: Variable | Assign, depth: int | None, slot: int):
+        expr.depth = depth
+        expr.slot = slot
 
-    def execute_block(self, statements: list[Stmt], environment: Environment):
+    def execute_block(
+        self, statements: list[Stmt], environment: Environment
+    ) -> Completion | None:
         previous = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                completion = statement.accept(self)
+                if completion is not None:
+                    return completion
+            return None
         finally:
             self.environment = previous
 
     @override
     def visit_block_stmt(self, stmt: Block):
-        self.execute_block(stmt.statements, Environment(self.environment))
+        if not stmt.elided:
+            return self.execute_block(stmt.statements, Environment(self.environment))
+        for statement in stmt.statements:
+            completion = statement.accept(self)
+            if completion is not None:
+                return completion
+        return None
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        return Completion.BREAK
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        return Completion.CONTINUE
 
     @override
     def visit_expression_stmt(self, stmt: Expression):
@@ -177,15 +427,25 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
     @override
     def visit_function_stmt(self, stmt: Function):
         function = LoxFunction(stmt, self.environment)
-        self.environment.define(stmt.name.lexeme, function)
+        self.define(stmt.slot, function)  # type: ignore
+        return None
+
+    @override
+    def visit_pure_function_stmt(self, stmt: PureFunction):
+        memo = self.memos.get(stmt)
+        if memo is None:
+            memo = self.memos[stmt] = Memo(stmt.name.lexeme, self.memo_size)
+        function = MemoizedFunction(stmt, self.environment, memo)
+        self.define(stmt.slot, function)  # type: ignore
         return None
 
     @override
     def visit_if_stmt(self, stmt: If):
         if self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.then_branch)
-        elif stmt.else_branch is not None:
-            self.execute(stmt.else_branch)
+            return self.execute(stmt.then_branch)
+        if stmt.else_branch is not None:
+            return self.execute(stmt.else_branch)
+        return None
 
     @override
     def visit_print_stmt(self, stmt: Print):
@@ -194,34 +454,100 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
 
     @override
     def visit_return_stmt(self, stmt: Return):
+        if stmt.tail:
+            call: Call = stmt.value  # type: ignore
+            callee = self.evaluate(call.callee)
+            arguments = [self.evaluate(argument) for argument in call.arguments]
+            function = self.checked(call, callee)
+            # A Lox function is run by the caller's LoxFunction.call once this
+            # one's frames are gone, so tail calls take no Python stack.
+            if type(function) is LoxFunction:
+                self.returned = (function, arguments)
+                return Completion.TAIL_CALL
+            if type(function) is MemoizedFunction:
+                value = function.memo.recall(Memo.key(arguments))
+                if value is MISSING:
+                    self.returned = (function, arguments)
+                    return Completion.TAIL_CALL
+                self.returned = value
+                return Completion.RETURN
+            self.returned = function.call(self, arguments)
+            return Completion.RETURN
         value = None
         if stmt.value is not None:
             value = self.evaluate(stmt.value)
-        raise LoxReturn(value)
+        self.returned = value
+        return Completion.RETURN
 
     @override
     def visit_var_stmt(self, stmt: Var):
         value: object | None = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
-        self.environment.define(stmt.name.lexeme, value)
+        self.define(stmt.slot, value)  # type: ignore
         return None
 
     @override
     def visit_while_stmt(self, stmt: While):
+        self.invariants.clear()
         while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+            completion = self.execute(stmt.body)
+            if completion is Completion.BREAK:
+                break
+            if completion is not None and completion is not Completion.CONTINUE:
+                return completion
+            if stmt.increment is not None:
+                self.evaluate(stmt.increment)
+        return None
+
+    @override
+    def visit_counted_loop_stmt(self, stmt: CountedLoop):
+        self.invariants.clear()
+        condition: Binary = stmt.condition  # type: ignore
+        counter: Variable = condition.left  # type: ignore
+        limit = condition.right
+        compare = COMPARISONS[type(condition)]
+        step: Binary = stmt.increment.value  # type: ignore
+        by: float = step.right.value  # type: ignore
+        if type(step) is Subtract:
+            by = -by
+        values = self.environment.ancestor(counter.depth).values  # type: ignore
+        slot: int = counter.slot  # type: ignore
+        while True:
+            i = values[slot]
+            bound = limit.accept(self)
+            if type(i) is not float or type(bound) is not float:
+                i, bound = self.numbers(condition.operator, i, bound)
+            if not compare(i, bound):
+                break
+            completion = self.execute(stmt.body)
+            if completion is Completion.BREAK:
+                break
+            if completion is not None and completion is not Completion.CONTINUE:
+                return completion
+            i = values[slot]
+            if type(i) is float:
+                values[slot] = i + by
+            else:
+                self.evaluate(stmt.increment)
+        return None
 
     @override
     def visit_assign_expr(self, expr: Assign):
         value = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
+        distance = expr.depth
         if distance is not None:
-            self.environment.assign_at(distance, expr.name, value)
+            self.environment.assign_at(distance, expr.slot, value)  # type: ignore
         else:
-            self.environment.assign(expr.name, value)
+            self.globals.assign(expr.name, expr.slot, value)  # type: ignore
         return value
 
+    def define(self, slot: int, value: object):
+        if self.environment is None:
+            self.globals.values[slot] = value
+        else:
+            self.environment.define(slot, value)
+
     def is_truthy(self, object: object):
         if object is None or object is False:
             return False
@@ -240,6 +566,13 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
             return
         raise LoxRuntimeError(operator, "Operands must be a number")
 
+    def numbers(
+        self, operator: Token, left: object, right: object
+    ) -> tuple[float, float]:
+        """Both operands as floats, once checked to be numbers."""
+        self.check_number_operands(operator, left, right)
+        return float(left), float(right)  # type: ignore
+
     def stringify(self, object: object) -> str:
         if object is None:
             return "nil"
@@ -255,3 +588,26 @@ class Interpreter(Expr.Visitor[object], Stmt.Visitor[None]):
             from lox.lox import Lox
 
             Lox.runtime_error(error)
+
+
+# How a CountedLoop compares its counter with its limit.
+COMPARISONS = {
+    Less: operator.lt,
+    LessEqual: operator.le,
+    Greater: operator.gt,
+    GreaterEqual: operator.ge,
+}
+
+
+# How many runs in a row with the same operand types an Add waits for before
+# it specializes.
+QUICKEN_AFTER = 8
+
+
+def rewrite(expr: Add, variant: type[Add]):
+    """Make `expr` a `variant`, in place: the two classes share their fields."""
+    if hasattr(expr, "become"):
+        # A FlatAst row, which has a view class per node class.
+        expr.become(variant)  # type: ignore
+    else:
+        expr.__class__ = variant
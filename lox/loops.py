@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+from typing import override
+
+from lox.expr_types import (
+    Add,
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Greater,
+    GreaterEqual,
+    Grouping,
+    Invariant,
+    Less,
+    LessEqual,
+    Literal,
+    Logical,
+    Subtract,
+    Unary,
+    Variable,
+)
+from lox.purity import nodes
+from lox.stmt_types import (
+    Block,
+    Break,
+    Continue,
+    CountedLoop,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+
+# A variable, by the frame it lives in, counted from a loop's own frame with
+# negative numbers for frames outside it, or None for a global, and its slot.
+Key = tuple[int | None, int]
+
+# What an invariant expression may be made of: none of these has effects.
+PURE = (Literal, Variable, Binary, Unary, Logical, Grouping)
+
+
+class LoopOptimizer(Expr.Visitor[Expr], Stmt.Visitor[Stmt]):
+    """Rewrites loops to do less work on each iteration.
+
+    In a loop that calls nothing, so that only its own code runs until it
+    ends, operators on variables the loop never writes are wrapped in
+    Invariant nodes. Interpreter computes those once per run of the loop,
+    the first time it gets to them, which is also when the loop would
+    have computed them for the first time; a failing one fails there.
+
+    A `for` loop whose condition compares a local with `<`, `<=`, `>` or
+    `>=` and whose increment adds or subtracts a number literal to that
+    local becomes a CountedLoop, which Interpreter steps without visiting
+    the condition and increment nodes.
+
+    Like Optimizer, it rewrites trees in place and keeps Variable and
+    Assign nodes, so the resolver's slots stay valid.
+    """
+
+    def __init__(self):
+        # The variables the innermost loop writes, or None when nothing in
+        # the code being rewritten is invariant.
+        self.written: set[Key] | None = None
+        # Frames entered since the innermost loop.
+        self.frames = 0
+
+    def optimize(self, statements: list[Stmt]) -> list[Stmt]:
+        return [statement.accept(self) for statement in statements]
+
+    def hoist(self, expr: Expr) -> Expr:
+        """`expr`, with its loop-invariant operators marked."""
+        if (
+            self.written is not None
+            and not isinstance(expr, (Literal, Variable, Grouping))
+            and self.invariant(expr)
+        ):
+            return Invariant(expr)
+        return expr.accept(self)
+
+    def invariant(self, expr: Expr) -> bool:
+        written: set[Key] = self.written  # type: ignore
+        for node in nodes([expr]):
+            if not isinstance(node, PURE):
+                return False
+            if isinstance(node, Variable) and self.key(node) in written:
+                return False
+        return True
+
+    def key(self, expr: Variable | Assign) -> Key:
+        if expr.depth is None:
+            return None, expr.slot  # type: ignore
+        return self.frames - expr.depth, expr.slot  # type: ignore
+
+    # Statement visitors
+    @override
+    def visit_block_stmt(self, stmt: Block):
+        frames = self.frames
+        if not stmt.elided:
+            self.frames += 1
+        stmt.statements = self.optimize(stmt.statements)
+        self.frames = frames
+        return stmt
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        return stmt
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        return stmt
+
+    @override
+    def visit_expression_stmt(self, stmt: Expression):
+        stmt.expression = self.hoist(stmt.expression)
+        return stmt
+
+    @override
+    def visit_function_stmt(self, stmt: Function):
+        # The body runs when called, not as part of the loop around it.
+        outer = self.written, self.frames
+        self.written, self.frames = None, 0
+        stmt.body = self.optimize(stmt.body)
+        self.written, self.frames = outer
+        return stmt
+
+    @override
+    def visit_if_stmt(self, stmt: If):
+        stmt.condition = self.hoist(stmt.condition)
+        stmt.then_branch = stmt.then_branch.accept(self)
+        if stmt.else_branch is not None:
+            stmt.else_branch = stmt.else_branch.accept(self)
+        return stmt
+
+    @override
+    def visit_print_stmt(self, stmt: Print):
+        stmt.expression = self.hoist(stmt.expression)
+        return stmt
+
+    @override
+    def visit_return_stmt(self, stmt: Return):
+        if stmt.value is not None:
+            stmt.value = self.hoist(stmt.value)
+        return stmt
+
+    @override
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.initializer is not None:
+            stmt.initializer = self.hoist(stmt.initializer)
+        return stmt
+
+    @override
+    def visit_while_stmt(self, stmt: While):
+        outer = self.written, self.frames
+        self.written, self.frames = writes(stmt), 0
+        stmt.condition = self.hoist(stmt.condition)
+        stmt.body = stmt.body.accept(self)
+        if stmt.increment is not None:
+            stmt.increment = self.hoist(stmt.increment)
+        self.written, self.frames = outer
+        if counted(stmt):
+            return CountedLoop(stmt.condition, stmt.body, stmt.increment)
+        return stmt
+
+    # Expression visitors
+    @override
+    def visit_assign_expr(self, expr: Assign):
+        expr.value = self.hoist(expr.value)
+        return expr
+
+    @override
+    def visit_binary_expr(self, expr: Binary):
+        expr.left = self.hoist(expr.left)
+        expr.right = self.hoist(expr.right)
+        return expr
+
+    @override
+    def visit_call_expr(self, expr: Call):
+        expr.callee = self.hoist(expr.callee)
+        expr.arguments = [self.hoist(argument) for argument in expr.arguments]
+        return expr
+
+    @override
+    def visit_grouping_expr(self, expr: Grouping):
+        expr.expression = self.hoist(expr.expression)
+        return expr
+
+    @override
+    def visit_literal_expr(self, expr: Literal):
+        return expr
+
+    @override
+    def visit_logical_expr(self, expr: Logical):
+        expr.left = self.hoist(expr.left)
+        expr.right = self.hoist(expr.right)
+        return expr
+
+    @override
+    def visit_unary_expr(self, expr: Unary):
+        expr.right = self.hoist(expr.right)
+        return expr
+
+    @override
+    def visit_variable_expr(self, expr: Variable):
+        return expr
+
+
+def writes(loop: While) -> set[Key] | None:
+    """The variables `loop` assigns or declares, or None if it calls
+    anything, since then any code may run while it does."""
+    written: set[Key] = set()
+    pending: list[tuple[object, int]] = [(loop.condition, 0), (loop.body, 0)]
+    if loop.increment is not None:
+        pending.append((loop.increment, 0))
+    while pending:
+        node, frames = pending.pop()
+        match node:
+            case Call():
+                return None
+            case Assign(depth=None):
+                written.add((None, node.slot))  # type: ignore
+            case Assign():
+                written.add((frames - node.depth, node.slot))  # type: ignore
+            case Var() | Function():
+                written.add((frames, node.slot))  # type: ignore
+            case Block(elided=False):
+                frames += 1
+        if isinstance(node, Function):
+            # Never called while the loop runs, as it calls nothing.
+            continue
+        if isinstance(node, list):
+            pending.extend((each, frames) for each in node)
+        elif isinstance(node, (Expr, Stmt)):
+            pending.extend(
+                (getattr(node, name), frames) for name in node.__dataclass_fields__
+            )
+    return written
+
+
+def counted(loop: While) -> bool:
+    """Whether `loop` steps a local by a constant, as in
+    `for (var i = 0; i < n; i = i + 1)`."""
+    match loop:
+        case While(
+            condition=Less() | LessEqual() | Greater() | GreaterEqual() as condition,
+            increment=Assign(value=Add() | Subtract() as step) as increment,
+        ):
+            counter = condition.left
+            return (
+                isinstance(counter, Variable)
+                and counter.depth is not None
+                and same(counter, increment)
+                and isinstance(step.left, Variable)
+                and same(step.left, increment)
+                and isinstance(step.right, Literal)
+                and type(step.right.value) is float
+            )
+    return False
+
+
+def same(a: Variable | Assign, b: Variable | Assign) -> bool:
+    return a.depth == b.depth and a.slot == b.slot
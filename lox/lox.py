@@ -1,30 +1,104 @@
 from __future__ import annotations
 
+import argparse
+import atexit
+import os
 import sys
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
-from lox.errors import LoxRuntimeError
+from lox.cache import ProgramCache
+from lox.errors import Diagnostic, LoxRuntimeError
 from lox.interpreter import Interpreter
+from lox.optimizer import Optimizer
 from lox.resolver import Resolver
-from lox.scanner import Scanner
+from lox.scanner import Scanner, read_chunks
+from lox.stmt_types import Stmt
+from lox.symbol_table import SymbolTable
 from lox.token_type import Token, TokenType
 
+if TYPE_CHECKING:
+    from lox.incremental import IncrementalCompiler
+
 
 class Lox:
     interpreter = Interpreter()
+    symbols = SymbolTable()
+    cache: ProgramCache | None = None
+    incremental: IncrementalCompiler | None = None
+    diagnostics: list[Diagnostic] | None = None
+    flat_ast = False
+    opt_level = 1
+    memoize = False
+    # Inlining, at -O1, of functions whose body has at most this many nodes.
+    inline = True
+    inline_size = 12
+    engine = "tree"
     had_error = False
+    # Whether the scanner reported anything; those errors do not stop a run.
+    had_scan_error = False
     had_runtime_error = False
 
     @staticmethod
     def run_file(path: str):
-        with open(path, "r") as file:
-            Lox.run(file.read())
+        statements = Lox.compile_file(path)
+        if statements is not None:
+            Lox.execute(statements)
         if Lox.had_error:
             exit(65)
         if Lox.had_runtime_error:
             exit(70)
 
+    @staticmethod
+    def disassemble_file(path: str):
+        from .bytecode_compiler import BytecodeCompiler
+        from .disassembler import disassemble
+
+        statements = Lox.compile_file(path)
+        if statements is None:
+            exit(65)
+        print(disassemble(BytecodeCompiler().compile(statements)))
+
+    @staticmethod
+    def dump_python_file(path: str):
+        from .python_compiler import PythonCompiler
+
+        statements = Lox.compile_file(path)
+        if statements is None:
+            exit(65)
+        print(PythonCompiler(Lox.interpreter).source(statements))
+
+    @staticmethod
+    def print_memo_stats():
+        for memo in Lox.interpreter.memos.values():
+            print(memo, file=sys.stderr)
+
+    @staticmethod
+    def print_call_stats():
+        caches = Lox.interpreter.inline_caches
+        hits = sum(cache.hits for cache in caches)
+        calls = hits + sum(cache.misses for cache in caches)
+        rate = hits / calls if calls else 0.0
+        summary = f"{len(caches)} call sites, {calls} calls, {rate:.1%} hits"
+        print(summary, file=sys.stderr)
+        for cache in caches:
+            print(f"  {cache}", file=sys.stderr)
+
+    @staticmethod
+    def print_quicken_stats():
+        interpreter = Lox.interpreter
+        for variant, count in interpreter.specializations.items():
+            deopts = interpreter.deoptimizations[variant]
+            print(
+                f"{variant.__name__}: {count} specialized, {deopts} deoptimized",
+                file=sys.stderr,
+            )
+
     @staticmethod
     def run_prompt():
+        from .incremental import IncrementalCompiler
+
+        Lox.incremental = IncrementalCompiler(Lox.interpreter, Lox.symbols)
         while True:
             line = input("> ")
             if line == "":
@@ -34,28 +108,121 @@ class Lox:
 
     @staticmethod
     def run(source: str):
-        from .parser import Parser
+        if Lox.incremental is not None:
+            statements = Lox.incremental.compile(source)
+        else:
+            scanner = Scanner(source, symbols=Lox.symbols)
+            statements = Lox.compile(scanner.scan_buffer())
+        if statements is not None:
+            Lox.execute(statements)
+
+    @staticmethod
+    def execute(statements: list[Stmt]):
+        """Run compiled statements on the engine chosen by `Lox.engine`."""
+        match Lox.engine:
+            case "closure":
+                from .closure_compiler import ClosureCompiler
 
-        scanner = Scanner(source)
-        tokens = scanner.scan_tokens()
+                ClosureCompiler(Lox.interpreter).interpret(statements)
+            case "vm":
+                from .vm import VM
+
+                VM(Lox.interpreter).interpret(statements)
+            case "python":
+                from .python_compiler import PythonCompiler
+
+                PythonCompiler(Lox.interpreter).interpret(statements)
+            case _:
+                Lox.interpreter.interpret(statements)
+
+    @staticmethod
+    def cache_key(path: str) -> str:
+        """The key `compile_file` stores a script under in `Lox.cache`: its
+        source's, plus the options that change what it compiles to."""
+        key = Lox.cache.key(path)  # type: ignore
+        if Lox.flat_ast:
+            key += "-flat"
+        key += f"-O{Lox.opt_level}"
+        if Lox.memoize:
+            key += "-memo"
+        if Lox.inline:
+            key += f"-inline{Lox.inline_size}"
+        return key
+
+    @staticmethod
+    def compile_file(path: str) -> list[Stmt] | None:
+        """Scan, parse and resolve a script, or take it from `Lox.cache`."""
+        cache = Lox.cache
+        if cache is not None:
+            key = Lox.cache_key(path)
+            # Stored with the global names, in slot order, that it was
+            # resolved against.
+            program = cache.load(key)
+            if program is not None:
+                names, statements = program  # type: ignore
+                if Lox.interpreter.globals.bind(names):
+                    return statements
+
+        Lox.had_scan_error = False
+        scanner = Scanner(symbols=Lox.symbols)
+        statements = Lox.compile(scanner.scan_chunks(read_chunks(path)))
+        # A cached program skips the scanner, and so would its errors.
+        if statements is not None and cache is not None and not Lox.had_scan_error:
+            names = Lox.interpreter.globals.names.names
+            cache.store(key, (names, statements))
+        return statements
+
+    @staticmethod
+    def compile(tokens: Iterable[Token]) -> list[Stmt] | None:
+        from .parser import Parser
 
         parser = Parser(tokens)
-        statements = parser.parse()
+        if Lox.flat_ast:
+            from .flat_ast import FlatAst
+
+            statements = list(FlatAst.parse(parser))
+        else:
+            statements = parser.parse()
 
         if Lox.had_error:
-            return
+            return None
         resolver = Resolver(Lox.interpreter)
         resolver.resolve(statements)
         if Lox.had_error:
-            return
+            return None
+        # The flat AST's rows cannot be rewritten, so it runs as parsed.
+        if Lox.opt_level and not Lox.flat_ast:
+            statements = Optimizer().optimize(statements)
+            if Lox.inline:
+                from .inliner import Inliner
+
+                statements = Inliner(Lox.inline_size).inline(statements)
+            from .loops import LoopOptimizer
 
-        Lox.interpreter.interpret(statements)
+            statements = LoopOptimizer().optimize(statements)
+        if Lox.memoize and not Lox.flat_ast:
+            from .purity import Purity
+
+            statements = Purity().memoize(statements)
+        return statements
 
     @staticmethod
     def report(line: int, where: str, message: str):
-        print(f"[line {line}] Error {where}: {message}")
+        if Lox.diagnostics is not None:
+            Lox.diagnostics.append(Diagnostic(line, where, message))
+        else:
+            print(f"[line {line}] Error {where}: {message}")
         Lox.had_error = True
 
+    @staticmethod
+    def scan_error(line: int, message: str):
+        # Reported, but unlike parse errors these do not stop the run.
+        Lox.had_scan_error = True
+        if Lox.diagnostics is not None:
+            Lox.diagnostics.append(Diagnostic(line, "", message))
+        else:
+            print(line, message)
+
     @staticmethod
     def error(token: Token, message: str):
         if token.type is TokenType.EOF:
@@ -70,15 +237,119 @@ class Lox:
 
 
 def main():
-    lox = Lox()
-    if len(sys.argv) < 1:
-        print("Usage: plox [script]")
-        exit()
-    elif len(sys.argv) == 2:
-        lox.run_file(sys.argv[1])
-    else:
-        lox.run_prompt()
+    parser = argparse.ArgumentParser(prog="plox")
+    parser.add_argument("script", nargs="?")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=bool(os.environ.get("LOX_NO_CACHE")),
+        help="always compile the script instead of using the program cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="program cache location (default: $LOX_CACHE_DIR or ~/.cache/lox)",
+    )
+    parser.add_argument(
+        "--flat-ast",
+        action="store_true",
+        help="keep the AST in flat arrays, for very large programs",
+    )
+    parser.add_argument(
+        "-O",
+        "--opt-level",
+        type=int,
+        choices=(0, 1),
+        default=1,
+        help="0 runs the program as parsed; 1 (default) folds constants and "
+        "prunes dead code first",
+    )
+    parser.add_argument(
+        "--no-inline",
+        action="store_true",
+        help="do not inline calls to small functions at -O1",
+    )
+    parser.add_argument(
+        "--inline-size",
+        type=int,
+        default=12,
+        help="largest function body, in AST nodes, that is inlined (default: 12)",
+    )
+    parser.add_argument(
+        "--memoize",
+        action="store_true",
+        help="cache the results of pure functions (tree engine only)",
+    )
+    parser.add_argument(
+        "--memo-size",
+        type=int,
+        default=1024,
+        help="results each pure function keeps with --memoize (default: 1024)",
+    )
+    parser.add_argument(
+        "--memo-stats",
+        action="store_true",
+        help="print each pure function's cache hits and evictions to stderr",
+    )
+    parser.add_argument(
+        "--call-stats",
+        action="store_true",
+        help="print how often each call site's inline cache hit to stderr",
+    )
+    parser.add_argument(
+        "--quicken-stats",
+        action="store_true",
+        help="print how many Add nodes were specialized and deoptimized to stderr",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=("tree", "closure", "vm", "python"),
+        default="tree",
+        help="tree walks the AST (default); closure compiles it to Python "
+        "closures first; vm compiles it to bytecode for a stack machine; "
+        "python translates it to Python code for CPython to run",
+    )
+    parser.add_argument(
+        "--disassemble",
+        action="store_true",
+        help="print the script's bytecode instead of running it",
+    )
+    parser.add_argument(
+        "--dump-python",
+        action="store_true",
+        help="print the Python code the python engine runs instead of running it",
+    )
+    args = parser.parse_args()
+
+    Lox.flat_ast = args.flat_ast
+    Lox.opt_level = args.opt_level
+    Lox.engine = args.engine
+    Lox.inline = not args.no_inline
+    Lox.inline_size = args.inline_size
+    Lox.memoize = args.memoize
+    Lox.interpreter.memo_size = args.memo_size
+    if args.memo_stats:
+        atexit.register(Lox.print_memo_stats)
+    if args.call_stats:
+        atexit.register(Lox.print_call_stats)
+    if args.quicken_stats:
+        atexit.register(Lox.print_quicken_stats)
+    if args.script is None:
+        Lox.run_prompt()
+        return
+    if not args.no_cache:
+        Lox.cache = ProgramCache(args.cache_dir)
+    if args.disassemble:
+        Lox.disassemble_file(args.script)
+        return
+    if args.dump_python:
+        Lox.dump_python_file(args.script)
+        return
+    Lox.run_file(args.script)
 
 
 if __name__ == "__main__":
-    main()
+    # Go through the importable module: the parser, resolver and interpreter
+    # report into `lox.lox.Lox`, not into a second copy living in __main__.
+    from lox import lox
+
+    lox.main()
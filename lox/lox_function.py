@@ -2,28 +2,31 @@ from __future__ import annotations
 
 from typing import override
 
+from lox.completion import Completion
 from lox.environment import Environment
 from lox.lox_callable import LoxCallable
-from lox.lox_return import LoxReturn
 from lox.stmt_types import Function
 
 
 class LoxFunction(LoxCallable):
-    def __init__(self, declaration: Function, closure: Environment) -> None:
+    def __init__(self, declaration: Function, closure: Environment | None) -> None:
         self.declaration = declaration
         self.closure = closure
 
     @override
     def call(self, interpreter, arguments: list[object]) -> object:
-        environment = Environment(self.closure)
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].lexeme, arguments[i])
-
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except LoxReturn as returnValue:
-            return returnValue.value
-        return None
+        function = self
+        while True:
+            # The parameters are the first slots of the function's scope.
+            environment = Environment(function.closure, arguments)
+            body = function.declaration.body
+            completion = interpreter.execute_block(body, environment)
+            if completion is Completion.TAIL_CALL:
+                function, arguments = interpreter.returned
+                continue
+            if completion is Completion.RETURN:
+                return interpreter.returned
+            return None
 
     @override
     def arity(self) -> int:
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+# What Memo.recall returns for arguments it holds no result for: unlike nil,
+# no call returns it.
+MISSING = object()
+
+
+class Memo:
+    """The results of one pure function, by arguments, least recently used
+    first. Holds at most `size` results, evicting the oldest beyond that.
+
+    Keys carry the arguments' types as well, since Python takes `true` and
+    `1` for the same key but Lox prints them differently.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+        self.results: OrderedDict[tuple[object, ...], object] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(arguments: list[object]) -> tuple[object, ...]:
+        """The key for `arguments`, taken before the call runs: the callee's
+        scope holds the list itself, so assigning a parameter or declaring a
+        local changes it."""
+        return (*arguments, *map(type, arguments))
+
+    def recall(self, key: tuple[object, ...]) -> object:
+        """The result stored under `key`, or MISSING, counted as a hit or a
+        miss."""
+        results = self.results
+        if key in results:
+            self.hits += 1
+            results.move_to_end(key)
+            return results[key]
+        self.misses += 1
+        return MISSING
+
+    def store(self, key: tuple[object, ...], value: object):
+        results = self.results
+        results[key] = value
+        if len(results) > self.size:
+            results.popitem(last=False)
+            self.evictions += 1
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.hits} hits, {self.misses} misses,"
+            f" {self.evictions} evictions, {len(self.results)}/{self.size} cached"
+        )
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import override
+
+from lox.environment import Environment
+from lox.lox_function import LoxFunction
+from lox.memo import MISSING, Memo
+from lox.stmt_types import Function
+
+
+class MemoizedFunction(LoxFunction):
+    """A LoxFunction the purity analysis found pure, so that a call returns
+    what an earlier call with the same arguments did without running.
+
+    The result of a pure function depends on nothing its closure holds, so
+    all the functions one declaration makes share its Memo.
+
+    A tail call to one is looked up by Interpreter and, on a miss, run by
+    the calling function's trampoline; its result is then stored only by
+    the call that started the trampoline.
+    """
+
+    def __init__(
+        self, declaration: Function, closure: Environment | None, memo: Memo
+    ) -> None:
+        super().__init__(declaration, closure)
+        self.memo = memo
+
+    @override
+    def call(self, interpreter, arguments: list[object]) -> object:
+        key = Memo.key(arguments)
+        value = self.memo.recall(key)
+        if value is MISSING:
+            value = super().call(interpreter, arguments)
+            self.memo.store(key, value)
+        return value
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from enum import IntEnum
+
+
+class OpCode(IntEnum):
+    """Instructions of the bytecode VM.
+
+    An instruction is its opcode followed by `OPERANDS[op]` integer
+    operands. Operands name a constant, a slot, a frame depth, an argument
+    count or a jump target (an absolute offset). Instructions that can fail
+    end with the constant index of the token their error is reported at.
+    """
+
+    CONSTANT = 0  # constant
+    POP = 1
+    GET_LOCAL = 2  # slot
+    SET_LOCAL = 3  # slot
+    DEFINE_LOCAL = 4  # slot
+    GET_OUTER = 5  # depth, slot
+    SET_OUTER = 6  # depth, slot
+    GET_GLOBAL = 7  # slot, token
+    SET_GLOBAL = 8  # slot, token
+    DEFINE_GLOBAL = 9  # slot
+    EQUAL = 10
+    NOT_EQUAL = 11
+    GREATER = 12  # token
+    GREATER_EQUAL = 13  # token
+    LESS = 14  # token
+    LESS_EQUAL = 15  # token
+    ADD = 16  # token
+    SUBTRACT = 17  # token
+    MULTIPLY = 18  # token
+    DIVIDE = 19  # token
+    NOT = 20
+    NEGATE = 21
+    PRINT = 22
+    JUMP = 23  # target
+    JUMP_IF_FALSE = 24  # target
+    JUMP_IF_FALSE_OR_POP = 25  # target
+    JUMP_IF_TRUE_OR_POP = 26  # target
+    CALL = 27  # argument count, token
+    CLOSURE = 28  # constant
+    RETURN = 29
+    PUSH_SCOPE = 30
+    POP_SCOPE = 31
+
+
+OPERANDS = {op: 0 for op in OpCode} | {
+    OpCode.CONSTANT: 1,
+    OpCode.GET_LOCAL: 1,
+    OpCode.SET_LOCAL: 1,
+    OpCode.DEFINE_LOCAL: 1,
+    OpCode.GET_OUTER: 2,
+    OpCode.SET_OUTER: 2,
+    OpCode.GET_GLOBAL: 2,
+    OpCode.SET_GLOBAL: 2,
+    OpCode.DEFINE_GLOBAL: 1,
+    OpCode.GREATER: 1,
+    OpCode.GREATER_EQUAL: 1,
+    OpCode.LESS: 1,
+    OpCode.LESS_EQUAL: 1,
+    OpCode.ADD: 1,
+    OpCode.SUBTRACT: 1,
+    OpCode.MULTIPLY: 1,
+    OpCode.DIVIDE: 1,
+    OpCode.JUMP: 1,
+    OpCode.JUMP_IF_FALSE: 1,
+    OpCode.JUMP_IF_FALSE_OR_POP: 1,
+    OpCode.JUMP_IF_TRUE_OR_POP: 1,
+    OpCode.CALL: 2,
+    OpCode.CLOSURE: 1,
+}
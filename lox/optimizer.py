@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from typing import override
+
+from lox.expr_types import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+from lox.interpreter import Interpreter
+from lox.stmt_types import (
+    Block,
+    Break,
+    Continue,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from lox.token_type import TokenType
+
+
+class Optimizer(Expr.Visitor[Expr], Stmt.Visitor["Stmt | None"]):
+    """Simplifies resolved statements before they run.
+
+    Groupings are dropped, operators on literals are folded, `if`/`while`
+    on a constant condition are pruned and statements after a `return`,
+    `break` or `continue` are removed. Trees are rewritten in place, and
+    Variable and Assign nodes are kept, so the resolver's slots stay valid.
+
+    Folding evaluates the operator with a scratch Interpreter, so constants
+    get exactly the runtime semantics; an operation that fails is left in
+    place to fail when (and if) it runs.
+    """
+
+    def __init__(self):
+        self.evaluator = Interpreter()
+
+    def optimize(self, statements: list[Stmt]) -> list[Stmt]:
+        optimized = []
+        for statement in statements:
+            statement = statement.accept(self)
+            if statement is None:
+                continue
+            optimized.append(statement)
+            if isinstance(statement, (Return, Break, Continue)):
+                break
+        return optimized
+
+    def fold(self, expr: Expr) -> Expr:
+        return expr.accept(self)
+
+    def constant(self, expr: Expr) -> Expr:
+        try:
+            value = self.evaluator.evaluate(expr)
+        except Exception:
+            return expr
+        return Literal(value)
+
+    def branch(self, stmt: Stmt) -> Stmt:
+        """`stmt` optimized, as a statement even if nothing is left of it."""
+        return stmt.accept(self) or Block([])
+
+    # Statement visitors
+    @override
+    def visit_block_stmt(self, stmt: Block):
+        stmt.statements = self.optimize(stmt.statements)
+        return stmt if stmt.statements else None
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        return stmt
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        return stmt
+
+    @override
+    def visit_expression_stmt(self, stmt: Expression):
+        stmt.expression = self.fold(stmt.expression)
+        if isinstance(stmt.expression, Literal):
+            return None
+        return stmt
+
+    @override
+    def visit_function_stmt(self, stmt: Function):
+        stmt.body = self.optimize(stmt.body)
+        return stmt
+
+    @override
+    def visit_if_stmt(self, stmt: If):
+        stmt.condition = self.fold(stmt.condition)
+        if isinstance(stmt.condition, Literal):
+            if self.evaluator.is_truthy(stmt.condition.value):
+                return stmt.then_branch.accept(self)
+            if stmt.else_branch is not None:
+                return stmt.else_branch.accept(self)
+            return None
+        stmt.then_branch = self.branch(stmt.then_branch)
+        if stmt.else_branch is not None:
+            stmt.else_branch = stmt.else_branch.accept(self)
+        return stmt
+
+    @override
+    def visit_print_stmt(self, stmt: Print):
+        stmt.expression = self.fold(stmt.expression)
+        return stmt
+
+    @override
+    def visit_return_stmt(self, stmt: Return):
+        if stmt.value is not None:
+            stmt.value = self.fold(stmt.value)
+        return stmt
+
+    @override
+    def visit_var_stmt(self, stmt: Var):
+        if stmt.initializer is not None:
+            stmt.initializer = self.fold(stmt.initializer)
+        return stmt
+
+    @override
+    def visit_while_stmt(self, stmt: While):
+        stmt.condition = self.fold(stmt.condition)
+        if isinstance(stmt.condition, Literal) and not self.evaluator.is_truthy(
+            stmt.condition.value
+        ):
+            return None
+        stmt.body = self.branch(stmt.body)
+        if stmt.increment is not None:
+            stmt.increment = self.fold(stmt.increment)
+        return stmt
+
+    # Expression visitors
+    @override
+    def visit_assign_expr(self, expr: Assign):
+        expr.value = self.fold(expr.value)
+        return expr
+
+    @override
+    def visit_binary_expr(self, expr: Binary):
+        expr.left = self.fold(expr.left)
+        expr.right = self.fold(expr.right)
+        if isinstance(expr.left, Literal) and isinstance(expr.right, Literal):
+            return self.constant(expr)
+        return expr
+
+    @override
+    def visit_call_expr(self, expr: Call):
+        expr.callee = self.fold(expr.callee)
+        expr.arguments = [self.fold(argument) for argument in expr.arguments]
+        return expr
+
+    @override
+    def visit_grouping_expr(self, expr: Grouping):
+        return self.fold(expr.expression)
+
+    @override
+    def visit_literal_expr(self, expr: Literal):
+        return expr
+
+    @override
+    def visit_logical_expr(self, expr: Logical):
+        expr.left = self.fold(expr.left)
+        expr.right = self.fold(expr.right)
+        if not isinstance(expr.left, Literal):
+            return expr
+        # `or` yields a truthy left operand, `and` a falsey one, and otherwise
+        # the right operand, whatever it is.
+        truthy = self.evaluator.is_truthy(expr.left.value)
+        if truthy == (expr.operator.type is TokenType.OR):
+            return expr.left
+        return expr.right
+
+    @override
+    def visit_unary_expr(self, expr: Unary):
+        expr.right = self.fold(expr.right)
+        if isinstance(expr.right, Literal):
+            return self.constant(expr)
+        return expr
+
+    @override
+    def visit_variable_expr(self, expr: Variable):
+        return expr
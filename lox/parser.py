@@ -1,19 +1,34 @@
 from __future__ import annotations
 
+from collections.abc import Iterable
+from enum import IntEnum
+
 from lox.expr_types import (
+    Add,
     Assign,
     Binary,
     Call,
+    Divide,
+    Equal,
     Expr,
+    Greater,
+    GreaterEqual,
     Grouping,
+    Less,
+    LessEqual,
     Literal,
     Logical,
+    Multiply,
+    NotEqual,
+    Subtract,
     Unary,
     Variable,
 )
 from lox.lox import Lox
 from lox.stmt_types import (
     Block,
+    Break,
+    Continue,
     Expression,
     Function,
     If,
@@ -25,46 +40,149 @@ from lox.stmt_types import (
 )
 from lox.token_type import Token, TokenType
 
+# The Binary node for each operator, so its evaluation is chosen once, here.
+BINARY: dict[TokenType, type[Binary]] = {
+    TokenType.PLUS: Add,
+    TokenType.MINUS: Subtract,
+    TokenType.STAR: Multiply,
+    TokenType.SLASH: Divide,
+    TokenType.GREATER: Greater,
+    TokenType.GREATER_EQUAL: GreaterEqual,
+    TokenType.LESS: Less,
+    TokenType.LESS_EQUAL: LessEqual,
+    TokenType.EQUAL_EQUAL: Equal,
+    TokenType.BANG_EQUAL: NotEqual,
+}
+
+
+class Precedence(IntEnum):
+    NONE = 0
+    ASSIGNMENT = 1
+    OR = 2
+    AND = 3
+    EQUALITY = 4
+    COMPARISON = 5
+    TERM = 6
+    FACTOR = 7
+    UNARY = 8
+
 
 class Parser:
     class ParseError(RuntimeError):
         pass
 
-    def __init__(self, tokens: list[Token]):
-        self.tokens = tokens
-        self.current = 0
+    # Binding power of every infix operator, used by `parse_precedence`.
+    infix_precedence = {
+        TokenType.EQUAL: Precedence.ASSIGNMENT,
+        TokenType.OR: Precedence.OR,
+        TokenType.AND: Precedence.AND,
+        TokenType.BANG_EQUAL: Precedence.EQUALITY,
+        TokenType.EQUAL_EQUAL: Precedence.EQUALITY,
+        TokenType.GREATER: Precedence.COMPARISON,
+        TokenType.GREATER_EQUAL: Precedence.COMPARISON,
+        TokenType.LESS: Precedence.COMPARISON,
+        TokenType.LESS_EQUAL: Precedence.COMPARISON,
+        TokenType.MINUS: Precedence.TERM,
+        TokenType.PLUS: Precedence.TERM,
+        TokenType.SLASH: Precedence.FACTOR,
+        TokenType.STAR: Precedence.FACTOR,
+    }
+
+    prefix_operators = frozenset((TokenType.BANG, TokenType.MINUS))
+
+    engines = ("pratt", "descent")
+
+    def __init__(self, tokens: Iterable[Token], engine: str = "pratt"):
+        if engine not in self.engines:
+            raise ValueError(f"Unknown parser engine '{engine}'.")
+        self.engine = engine
+        # Tokens are pulled lazily; the grammar never needs more than the
+        # next token and the one just consumed.
+        self.tokens = iter(tokens)
+        self.current: Token = next(self.tokens)
+        self.last: Token | None = None
 
     def match(self, *types: TokenType) -> bool:
         """Check if the next token is one of the provided ones
         if yes, consumes the token with call to advance()
         """
-        for type in types:
-            if self.check(type):
-                self.advance()
-                return True
-
+        if self.current.type in types and not self.is_at_end():
+            self.advance()
+            return True
         return False
 
     def check(self, type):
         """Check if next token is the provided one"""
         if self.is_at_end():
             return False
-        return self.peek().type is type
+        return self.current.type is type
 
     def advance(self):
         if not self.is_at_end():
-            self.current += 1
+            self.last = self.current
+            self.current = next(self.tokens)
         return self.previous()
 
-    def peek(self):
-        return self.tokens[self.current]
+    def peek(self) -> Token:
+        return self.current
 
-    def previous(self):
-        return self.tokens[self.current - 1]
+    def previous(self) -> Token:
+        return self.last  # type: ignore
 
     def expression(self) -> Expr:
+        if self.engine == "pratt":
+            return self.parse_precedence(Precedence.ASSIGNMENT)
         return self.assignment()
 
+    def parse_precedence(self, precedence: Precedence) -> Expr:
+        """Parse an expression whose operators bind at least as tight as
+        `precedence`, climbing the `infix_precedence` table in a loop rather
+        than recursing once per grammar level.
+        """
+        # Identifiers and literals, the common operands, skip prefix/call/primary.
+        token = self.current
+        if token.type is TokenType.IDENTIFIER:
+            self.advance()
+            expr = Variable(token)
+        elif token.type is TokenType.NUMBER or token.type is TokenType.STRING:
+            self.advance()
+            expr = Literal(token.literal)
+        else:
+            expr = self.prefix()
+        if self.current.type is TokenType.LEFT_PAREN:
+            expr = self.calls(expr)
+        infix_precedence = self.infix_precedence
+
+        while True:
+            operator = self.current
+            operator_precedence = infix_precedence.get(operator.type, Precedence.NONE)
+            if operator_precedence < precedence:
+                return expr
+            self.advance()
+
+            if operator_precedence is Precedence.ASSIGNMENT:
+                # Right-associative, and only valid on a plain variable.
+                value = self.parse_precedence(Precedence.ASSIGNMENT)
+                if type(expr) is Variable:
+                    expr = Assign(expr.name, value)
+                else:
+                    self.error(operator, "Invalid assignment target")
+            elif operator_precedence <= Precedence.AND:
+                right = self.parse_precedence(operator_precedence + 1)
+                expr = Logical(expr, operator, right)
+            else:
+                right = self.parse_precedence(operator_precedence + 1)
+                expr = BINARY[operator.type](expr, operator, right)
+
+    def prefix(self) -> Expr:
+        operators: list[Token] = []
+        while self.current.type in self.prefix_operators:
+            operators.append(self.advance())
+        expr = self.call()
+        for operator in reversed(operators):
+            expr = Unary(operator, expr)
+        return expr
+
     def declaration(self):
         try:
             if self.match(TokenType.FUN):
@@ -77,6 +195,8 @@ class Parser:
             return None
 
     def statement(self):
+        if self.match(TokenType.BREAK, TokenType.CONTINUE):
+            return self.jump_statement()
         if self.match(TokenType.FOR):
             return self.for_statement()
         if self.match(TokenType.IF):
@@ -114,13 +234,11 @@ class Parser:
 
         body = self.statement()
 
-        if increment is not None:
-            body = Block([body, Expression(increment)])
-
         if condition is None:
             condition = Literal(True)
 
-        body = While(condition, body)
+        # The increment stays apart from the body, so `continue` runs it.
+        body = While(condition, body, increment)  # type: ignore
 
         if initializer is not None:
             body = Block([initializer, body])
@@ -143,6 +261,13 @@ class Parser:
         self.consume(TokenType.SEMICOLON, "Expect ';' after value")
         return Print(value)
 
+    def jump_statement(self):
+        keyword = self.previous()
+        self.consume(TokenType.SEMICOLON, f"Expect ';' after '{keyword.lexeme}'.")
+        if keyword.type is TokenType.BREAK:
+            return Break(keyword)
+        return Continue(keyword)
+
     def return_statement(self):
         keyword = self.previous()
         value = None
@@ -166,7 +291,7 @@ class Parser:
         self.consume(TokenType.RIGHT_PAREN, "Expected ') after 'while'.")
         body = self.statement()
 
-        return While(condition, body)
+        return While(condition, body, None)  # type: ignore
 
     def expression_statement(self):
         expr = self.expression()
@@ -234,7 +359,7 @@ class Parser:
         return expr
 
     def is_at_end(self):
-        return self.peek().type == TokenType.EOF
+        return self.current.type is TokenType.EOF
 
     def consume(self, type: TokenType, message: str):
         if self.check(type):
@@ -271,7 +396,7 @@ class Parser:
         while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
             operator: Token = self.previous()
             right: Expr = self.comparison()
-            expr = Binary(expr, operator, right)
+            expr = BINARY[operator.type](expr, operator, right)
         return expr
 
     def comparison(self):
@@ -284,7 +409,7 @@ class Parser:
         ):
             operator = self.previous()
             right = self.term()
-            expr = Binary(expr, operator, right)
+            expr = BINARY[operator.type](expr, operator, right)
         return expr
 
     def term(self):
@@ -293,7 +418,7 @@ class Parser:
         while self.match(TokenType.MINUS, TokenType.PLUS):
             operator = self.previous()
             right = self.factor()
-            expr = Binary(expr, operator, right)
+            expr = BINARY[operator.type](expr, operator, right)
 
         return expr
 
@@ -304,7 +429,7 @@ class Parser:
         while self.match(TokenType.SLASH, TokenType.STAR):
             operator = self.previous()
             right = self.unary()
-            expr = Binary(expr, operator, right)
+            expr = BINARY[operator.type](expr, operator, right)
         return expr
 
     def unary(self):
@@ -326,8 +451,9 @@ class Parser:
         return Call(callee, paren, arguments)
 
     def call(self):
-        expr = self.primary()
+        return self.calls(self.primary())
 
+    def calls(self, expr: Expr):
         while True:
             if self.match(TokenType.LEFT_PAREN):
                 expr = self.finish_call(expr)
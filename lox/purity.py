@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import override
+
+from lox.expr_types import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+from lox.stmt_types import (
+    Block,
+    Break,
+    Continue,
+    Expression,
+    Function,
+    If,
+    Print,
+    PureFunction,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+
+
+class Purity(Expr.Visitor[bool], Stmt.Visitor[bool]):
+    """Finds the functions whose calls can be memoized.
+
+    A function is pure when what it returns depends only on its arguments:
+    it prints nothing, declares no functions, reads and assigns no variables
+    but its own locals, and calls only pure global functions. A global
+    counts as a function as `global_functions` says, so this needs the
+    whole program at once.
+    Natives are not pure, `clock` being the only one.
+
+    Pure declarations are replaced with PureFunction nodes, which the
+    Interpreter runs as MemoizedFunctions. Expression and statement
+    visitors return whether the node is pure.
+    """
+
+    def __init__(self):
+        # Slots of the global functions taken to be pure.
+        self.pure: set[int] = set()
+        # Frames of the function being checked that the code is nested in.
+        self.frames = 0
+
+    def memoize(self, statements: list[Stmt]) -> list[Stmt]:
+        functions = global_functions(statements)
+        # Assume all of them pure, then drop those that are not until none
+        # is left to drop: mutually recursive functions stay pure together.
+        self.pure = set(functions)
+        changed = True
+        while changed:
+            changed = False
+            for slot in list(self.pure):
+                if not self.is_pure(functions[slot]):
+                    self.pure.discard(slot)
+                    changed = True
+        return [self.mark(statement) for statement in statements]
+
+    def is_pure(self, function: Function) -> bool:
+        self.frames = 0
+        return self.check(function.body)
+
+    def check(self, nodes: list[Stmt] | list[Expr]) -> bool:
+        return all(node.accept(self) for node in nodes)
+
+    def mark(self, stmt: Stmt) -> Stmt:
+        """`stmt`, with the pure functions in it made PureFunctions."""
+        match stmt:
+            case Function():
+                stmt.body = [self.mark(statement) for statement in stmt.body]
+                if self.is_pure(stmt):
+                    pure = PureFunction(stmt.name, stmt.params, stmt.body)
+                    pure.slot = stmt.slot
+                    return pure
+            case Block():
+                stmt.statements = [self.mark(each) for each in stmt.statements]
+            case If():
+                stmt.then_branch = self.mark(stmt.then_branch)
+                if stmt.else_branch is not None:
+                    stmt.else_branch = self.mark(stmt.else_branch)
+            case While():
+                stmt.body = self.mark(stmt.body)
+        return stmt
+
+    def local(self, depth: int | None) -> bool:
+        return depth is not None and depth <= self.frames
+
+    # Statement visitors
+    @override
+    def visit_block_stmt(self, stmt: Block):
+        if stmt.elided:
+            return self.check(stmt.statements)
+        self.frames += 1
+        try:
+            return self.check(stmt.statements)
+        finally:
+            self.frames -= 1
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        return True
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        return True
+
+    @override
+    def visit_expression_stmt(self, stmt: Expression):
+        return stmt.expression.accept(self)
+
+    @override
+    def visit_function_stmt(self, stmt: Function):
+        # A closure could read the function's locals after they change.
+        return False
+
+    @override
+    def visit_if_stmt(self, stmt: If):
+        branches = [stmt.then_branch]
+        if stmt.else_branch is not None:
+            branches.append(stmt.else_branch)
+        return stmt.condition.accept(self) and self.check(branches)
+
+    @override
+    def visit_print_stmt(self, stmt: Print):
+        return False
+
+    @override
+    def visit_return_stmt(self, stmt: Return):
+        return stmt.value is None or stmt.value.accept(self)
+
+    @override
+    def visit_var_stmt(self, stmt: Var):
+        return stmt.initializer is None or stmt.initializer.accept(self)
+
+    @override
+    def visit_while_stmt(self, stmt: While):
+        parts: list[Expr] = [stmt.condition]
+        if stmt.increment is not None:
+            parts.append(stmt.increment)
+        return self.check(parts) and stmt.body.accept(self)
+
+    # Expression visitors
+    @override
+    def visit_assign_expr(self, expr: Assign):
+        return self.local(expr.depth) and expr.value.accept(self)
+
+    @override
+    def visit_binary_expr(self, expr: Binary):
+        return expr.left.accept(self) and expr.right.accept(self)
+
+    @override
+    def visit_call_expr(self, expr: Call):
+        callee = expr.callee
+        return (
+            isinstance(callee, Variable)
+            and callee.depth is None
+            and callee.slot in self.pure
+            and self.check(expr.arguments)
+        )
+
+    @override
+    def visit_grouping_expr(self, expr: Grouping):
+        return expr.expression.accept(self)
+
+    @override
+    def visit_literal_expr(self, expr: Literal):
+        return True
+
+    @override
+    def visit_logical_expr(self, expr: Logical):
+        return expr.left.accept(self) and expr.right.accept(self)
+
+    @override
+    def visit_unary_expr(self, expr: Unary):
+        return expr.right.accept(self)
+
+    @override
+    def visit_variable_expr(self, expr: Variable):
+        return self.local(expr.depth) or (
+            expr.depth is None and expr.slot in self.pure
+        )
+
+
+def global_functions(statements: list[Stmt]) -> dict[int, Function]:
+    """The program's global functions by slot: globals that one `fun`
+    declares and nothing else declares or assigns, so they always hold that
+    function once it is declared."""
+    declared = Counter(
+        stmt.slot for stmt in statements if isinstance(stmt, (Var, Function))
+    )
+    assigned = {
+        expr.slot
+        for expr in nodes(statements)
+        if isinstance(expr, Assign) and expr.depth is None
+    }
+    return {
+        stmt.slot: stmt  # type: ignore
+        for stmt in statements
+        if isinstance(stmt, Function)
+        and declared[stmt.slot] == 1
+        and stmt.slot not in assigned
+    }
+
+
+def nodes(statements: list[Stmt] | list[Expr]):
+    """Every statement and expression in `statements`, at any depth."""
+    pending: list[object] = list(statements)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif isinstance(node, (Expr, Stmt)):
+            yield node
+            pending.extend(getattr(node, name) for name in node.__dataclass_fields__)
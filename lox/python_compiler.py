@@ -0,0 +1,705 @@
+from __future__ import annotations
+
+import ast
+import operator
+from types import FunctionType
+from typing import override
+
+from lox import python_runtime
+from lox.compiled_function import NEXT, TailCall
+from lox.completion import Completion
+from lox.errors import LoxRuntimeError
+from lox.expr_types import (
+    Assign,
+    Binary,
+    Call,
+    Expr,
+    Grouping,
+    Literal,
+    Logical,
+    Unary,
+    Variable,
+)
+from lox.globals import UNDEFINED
+from lox.interpreter import Interpreter
+from lox.stmt_types import (
+    Block,
+    Break,
+    Continue,
+    Expression,
+    Function,
+    If,
+    Print,
+    Return,
+    Stmt,
+    Var,
+    While,
+)
+from lox.token_type import Token, TokenType
+
+# Operators that need two numbers: the Python operator for the fast path,
+# and the function `numeric` applies when the operands are not both floats.
+NUMERIC = {
+    TokenType.SLASH: (ast.Div, "truediv"),
+    TokenType.STAR: (ast.Mult, "mul"),
+    TokenType.GREATER: (ast.Gt, "gt"),
+    TokenType.GREATER_EQUAL: (ast.GtE, "ge"),
+    TokenType.LESS: (ast.Lt, "lt"),
+    TokenType.LESS_EQUAL: (ast.LtE, "le"),
+}
+
+# Operators whose result is always a bool.
+COMPARISONS = {
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+}
+
+
+def load(name: str) -> ast.Name:
+    return ast.Name(name, ast.Load())
+
+
+def store(name: str) -> ast.Name:
+    return ast.Name(name, ast.Store())
+
+
+def call(function: str, *arguments: ast.expr) -> ast.Call:
+    return ast.Call(load(function), list(arguments), [])
+
+
+def compare(left: ast.expr, op: ast.cmpop, right: ast.expr) -> ast.Compare:
+    return ast.Compare(left, [op], [right])
+
+
+def is_float(value: ast.expr) -> ast.expr:
+    return compare(call("type", value), ast.Is(), load("float"))
+
+
+def is_constant(value: ast.expr, *types: type) -> bool:
+    return isinstance(value, ast.Constant) and type(value.value) in types
+
+
+def may_be_float(value: ast.expr) -> bool:
+    return not isinstance(value, ast.Constant) or is_constant(value, float)
+
+
+def not_nan(value: ast.expr) -> bool:
+    """Whether `value` is a constant that equals itself."""
+    return isinstance(value, ast.Constant) and value.value == value.value
+
+
+def simple(value: ast.expr) -> bool:
+    """Whether `value` can be evaluated twice: no side effects, same result."""
+    return isinstance(value, (ast.Name, ast.Constant))
+
+
+def boolean(expr: Expr) -> bool:
+    """Whether `expr` always evaluates to a bool, so Python truth tests work."""
+    match expr:
+        case Binary():
+            return expr.operator.type in COMPARISONS
+        case Unary():
+            return expr.operator.type is TokenType.BANG
+        case Logical():
+            return boolean(expr.left) and boolean(expr.right)
+        case Grouping():
+            return boolean(expr.expression)
+        case Literal():
+            return isinstance(expr.value, bool)
+    return False
+
+
+def escapes(statements: list[Stmt]) -> set[type[Stmt]]:
+    """Which of Return, Break and Continue in `statements` leave them: those
+    outside nested functions, and for Break and Continue, outside loops."""
+    found: set[type[Stmt]] = set()
+    for statement in statements:
+        match statement:
+            case Return() | Break() | Continue():
+                found.add(type(statement))
+            case Block():
+                found |= escapes(statement.statements)
+            case While():
+                found |= escapes([statement.body]) & {Return}
+            case If():
+                found |= escapes([statement.then_branch])
+                if statement.else_branch is not None:
+                    found |= escapes([statement.else_branch])
+    return found
+
+
+class PythonCompiler(Expr.Visitor[ast.expr], Stmt.Visitor[list[ast.stmt]]):
+    """Runs resolved statements by translating them into a Python module.
+
+    The module is built with `ast` and compiled by CPython, so Lox code runs
+    as Python bytecode. Lox locals become Python locals, each declaration
+    with a name of its own, and captured ones become cell variables; a Lox
+    function is a Python function whose arity is its parameter count. A
+    block that needs an Environment (one declaring a function) becomes a
+    nested function called in place, so closures made in a loop still see
+    the iteration they were made in. Globals stay in Interpreter's Globals.
+
+    Operators get an inline fast path for floats and fall back to
+    `python_runtime`, which has Interpreter's semantics and raises its
+    LoxRuntimeErrors with the original tokens.
+    """
+
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+        # The tokens runtime errors are reported at, as `tokens[i]`.
+        self.tokens: list[Token] = []
+        # A map of slots to Python names per Lox frame, each with the index
+        # in `nonlocals` of the Python function its variables belong to.
+        self.scopes: list[tuple[dict[int, str], int]] = []
+        # Per Python function being built, the outer variables it assigns.
+        self.nonlocals: list[set[str]] = [set()]
+        # Per loop being translated, its increment and the index in
+        # `nonlocals` of the Python function it is in.
+        self.loops: list[tuple[Expr | None, int]] = []
+        # Per Lox function being translated, whether it makes tail calls.
+        self.tail_calls: list[bool] = []
+        self.count = 0
+        self.line = 1
+
+    def interpret(self, statements: list[Stmt]):
+        code = compile(self.translate(statements), "<lox>", "exec")
+        try:
+            exec(code, self.namespace())
+        except LoxRuntimeError as error:
+            from lox.lox import Lox
+
+            Lox.runtime_error(error)
+
+    def source(self, statements: list[Stmt]) -> str:
+        """The Python code that `statements` are translated to."""
+        return ast.unparse(self.translate(statements))
+
+    def translate(self, statements: list[Stmt]) -> ast.Module:
+        body = self.sequence(statements) or [ast.Pass()]
+        return ast.fix_missing_locations(ast.Module(body, []))
+
+    def namespace(self) -> dict[str, object]:
+        """The globals the translated module runs with."""
+        namespace: dict[str, object] = {
+            "values": self.globals.values,
+            "table": self.globals,
+            "UNDEFINED": UNDEFINED,
+            "NEXT": NEXT,
+            "TailCall": TailCall,
+            "BREAK": Completion.BREAK,
+            "CONTINUE": Completion.CONTINUE,
+            "tokens": self.tokens,
+            "interpreter": self.interpreter,
+            "function": FunctionType,
+        }
+        for name in (
+            "add",
+            "subtract",
+            "numeric",
+            "call",
+            "finish",
+            "undefined",
+            "assign_global",
+            "stringify",
+        ):
+            namespace[name] = getattr(python_runtime, name)
+        for _, name in NUMERIC.values():
+            namespace[name] = getattr(operator, name)
+        return namespace
+
+    def sequence(self, statements: list[Stmt]) -> list[ast.stmt]:
+        translated = []
+        for statement in statements:
+            for node in statement.accept(self):
+                node.lineno = node.end_lineno = self.line
+                translated.append(node)
+        return translated
+
+    def expression(self, expr: Expr) -> ast.expr:
+        return expr.accept(self)
+
+    def fresh(self, name: str) -> str:
+        """A Python name for the Lox `name`, unique in the module. Lox names
+        have no underscores, so none can clash with the namespace."""
+        self.count += 1
+        return f"{name}_{self.count}"
+
+    def token(self, token: Token) -> ast.expr:
+        self.line = token.line
+        self.tokens.append(token)
+        return ast.Subscript(load("tokens"), ast.Constant(len(self.tokens) - 1))
+
+    def bind(self, value: ast.expr) -> tuple[ast.expr, ast.expr]:
+        """`value` for its first use, where it is evaluated, and its later
+        uses, which read a temporary."""
+        if simple(value):
+            return value, value
+        name = self.fresh("t")
+        return ast.NamedExpr(store(name), value), load(name)
+
+    def operands(
+        self, left: ast.expr, right: ast.expr
+    ) -> tuple[ast.expr, ast.expr, ast.expr, ast.expr]:
+        """Both operands for their first and later uses, evaluated once and
+        left first."""
+        if simple(left) and simple(right):
+            return left, right, left, right
+        # A variable on the left is read before the right is evaluated.
+        if isinstance(left, ast.Name):
+            name = self.fresh("t")
+            left_first, left = ast.NamedExpr(store(name), left), load(name)
+        else:
+            left_first, left = self.bind(left)
+        right_first, right = self.bind(right)
+        return left_first, right_first, left, right
+
+    def numbers(self, left: ast.expr, right: ast.expr) -> ast.expr | None:
+        """A test that both operands, at their first use, are floats."""
+        checks = [
+            is_float(value)
+            for value in (left, right)
+            if not is_constant(value, float)
+        ]
+        if not checks:
+            return None
+        if len(checks) == 1:
+            return checks[0]
+        if simple(left) and simple(right):
+            return ast.BoolOp(ast.And(), checks)
+        # `&` rather than `and`, so both operands are always evaluated.
+        return ast.BinOp(checks[0], ast.BitAnd(), checks[1])
+
+    def test(self, value: ast.expr) -> tuple[ast.expr, ast.expr]:
+        """A Python test of whether `value` is truthy in Lox, and `value` for
+        its later uses."""
+        if isinstance(value, ast.Constant):
+            truthy = value.value is not None and value.value is not False
+            return ast.Constant(truthy), value
+        first, later = self.bind(value)
+        test = ast.BoolOp(
+            ast.And(),
+            [
+                compare(first, ast.IsNot(), ast.Constant(None)),
+                compare(later, ast.IsNot(), ast.Constant(False)),
+            ],
+        )
+        return test, later
+
+    def condition(self, expr: Expr) -> ast.expr:
+        value = self.expression(expr)
+        if boolean(expr):
+            return value
+        return self.test(value)[0]
+
+    def branch(self, stmt: Stmt) -> list[ast.stmt]:
+        return self.sequence([stmt]) or [ast.Pass()]
+
+    def function(
+        self, name: str, parameters: list[str], statements: list[Stmt], block: bool
+    ) -> ast.FunctionDef:
+        """A Python function running `statements` in a new Lox frame. A
+        block's function returns NEXT unless it returns a value, BREAK or
+        CONTINUE."""
+        self.scopes.append((dict(enumerate(parameters)), len(self.nonlocals)))
+        self.nonlocals.append(set())
+        try:
+            body = self.sequence(statements)
+        finally:
+            self.scopes.pop()
+            assigned = self.nonlocals.pop()
+        if block:
+            body.append(ast.Return(load("NEXT")))
+        if assigned:
+            body.insert(0, ast.Nonlocal(sorted(assigned)))
+        arguments = ast.arguments([], [ast.arg(name) for name in parameters])
+        return ast.FunctionDef(name, arguments, body or [ast.Pass()], [])
+
+    def in_loop(self) -> bool:
+        """Whether the innermost loop is in the Python function being built,
+        rather than around the block it is for."""
+        return bool(self.loops) and self.loops[-1][1] == len(self.nonlocals) - 1
+
+    def next_iteration(self) -> list[ast.stmt]:
+        """Statements going on to the next iteration of the innermost loop.
+        Python's `continue` skips the rest of the loop body, so the increment
+        of a `for` comes first."""
+        increment, _ = self.loops[-1]
+        if increment is None:
+            return [ast.Continue()]
+        return [*self.sequence([Expression(increment)]), ast.Continue()]
+
+    def local(self, depth: int, slot: int) -> tuple[str, bool]:
+        """The Python name of a local, and whether it is an outer variable of
+        the function being built."""
+        names, owner = self.scopes[-1 - depth]
+        return names[slot], owner != len(self.nonlocals) - 1
+
+    def read_global(self, expr: Variable) -> tuple[str, ast.expr]:
+        """A read of the global `expr` into a temporary, which is named."""
+        name = self.fresh("t")
+        value = ast.Subscript(load("values"), ast.Constant(expr.slot))
+        return name, ast.NamedExpr(store(name), value)
+
+    def undefined(self, expr: Variable) -> ast.expr:
+        """A call raising the error for reading `expr` while it is undefined."""
+        token = self.token(expr.name)
+        return call("undefined", load("table"), token, ast.Constant(expr.slot))
+
+    # Statement visitors
+    @override
+    def visit_block_stmt(self, stmt: Block):
+        if stmt.elided:
+            return self.sequence(stmt.statements)
+        name = self.fresh("block")
+        escaping = escapes(stmt.statements)
+        if not escaping:
+            definition = self.function(name, [], stmt.statements, False)
+            return [definition, ast.Expr(call(name))]
+        definition = self.function(name, [], stmt.statements, True)
+        result = load(self.fresh("result"))
+        # Jumps to a loop out here are made here; anything else goes on up.
+        handlers: list[ast.stmt] = [ast.Return(result)]
+        if self.in_loop():
+            handlers = []
+            if Break in escaping:
+                handlers.append(
+                    ast.If(compare(result, ast.Is(), load("BREAK")), [ast.Break()], [])
+                )
+            if Continue in escaping:
+                handlers.append(
+                    ast.If(
+                        compare(result, ast.Is(), load("CONTINUE")),
+                        self.next_iteration(),
+                        [],
+                    )
+                )
+            if Return in escaping:
+                handlers.append(ast.Return(result))
+        return [
+            definition,
+            ast.Assign([store(result.id)], call(name)),
+            ast.If(compare(result, ast.IsNot(), load("NEXT")), handlers, []),
+        ]
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        self.line = stmt.keyword.line
+        if self.in_loop():
+            return [ast.Break()]
+        return [ast.Return(load("BREAK"))]
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        self.line = stmt.keyword.line
+        if self.in_loop():
+            return self.next_iteration()
+        return [ast.Return(load("CONTINUE"))]
+
+    @override
+    def visit_expression_stmt(self, stmt: Expression):
+        expression = stmt.expression
+        if isinstance(expression, Assign):
+            value = self.expression(expression.value)
+            if expression.depth is None:
+                slot = ast.Constant(expression.slot)
+                result = self.fresh("t")
+                undefined = ast.Call(
+                    ast.Attribute(load("table"), "assign", ast.Load()),
+                    [self.token(expression.name), slot, load(result)],
+                    [],
+                )
+                return [
+                    ast.Assign([store(result)], value),
+                    ast.If(
+                        compare(
+                            ast.Subscript(load("values"), slot),
+                            ast.Is(),
+                            load("UNDEFINED"),
+                        ),
+                        [ast.Expr(undefined)],
+                        [],
+                    ),
+                    ast.Assign(
+                        [ast.Subscript(load("values"), slot, ast.Store())],
+                        load(result),
+                    ),
+                ]
+            name, outer = self.local(expression.depth, expression.slot)  # type: ignore
+            if outer:
+                self.nonlocals[-1].add(name)
+            return [ast.Assign([store(name)], value)]
+        return [ast.Expr(self.expression(expression))]
+
+    @override
+    def visit_function_stmt(self, stmt: Function):
+        self.line = stmt.name.line
+        name = self.fresh(stmt.name.lexeme)
+        top_level = not self.scopes
+        if not top_level:
+            self.scopes[-1][0][stmt.slot] = name  # type: ignore
+        parameters = [self.fresh(parameter.lexeme) for parameter in stmt.params]
+        self.tail_calls.append(False)
+        try:
+            definition = self.function(name, parameters, stmt.body, False)
+        finally:
+            tail_calls = self.tail_calls.pop()
+        definitions: list[ast.stmt] = [definition]
+        body = name
+        if tail_calls:
+            # The body returns TailCalls, which a wrapper makes in a loop, so
+            # tail calls take no Python stack. The wrapper is the function.
+            body = definition.name = self.fresh(stmt.name.lexeme)
+            made = call("finish", call(body, *map(load, parameters)))
+            arguments = ast.arguments([], [ast.arg(name) for name in parameters])
+            definitions.append(
+                ast.FunctionDef(name, arguments, [ast.Return(made)], [])
+            )
+        # Named after the Lox function, for printing, with its arity at hand
+        # for calls to check, and its body for tail calls to make.
+        attributes = [
+            ast.Assign(
+                [ast.Attribute(load(name), attribute, ast.Store())],
+                ast.Constant(value),
+            )
+            for attribute, value in (
+                ("__name__", stmt.name.lexeme),
+                ("arity", len(parameters)),
+            )
+        ]
+        attributes.append(
+            ast.Assign(
+                [ast.Attribute(load(name), "body", ast.Store())], load(body)
+            )
+        )
+        if not top_level:
+            return [*definitions, *attributes]
+        define = ast.Assign(
+            [ast.Subscript(load("values"), ast.Constant(stmt.slot), ast.Store())],
+            load(name),
+        )
+        return [*definitions, *attributes, define]
+
+    @override
+    def visit_if_stmt(self, stmt: If):
+        test = self.condition(stmt.condition)
+        then_branch = self.branch(stmt.then_branch)
+        else_branch = []
+        if stmt.else_branch is not None:
+            else_branch = self.branch(stmt.else_branch)
+        return [ast.If(test, then_branch, else_branch)]
+
+    @override
+    def visit_print_stmt(self, stmt: Print):
+        value = self.expression(stmt.expression)
+        return [ast.Expr(call("print", call("stringify", load("interpreter"), value)))]
+
+    @override
+    def visit_return_stmt(self, stmt: Return):
+        self.line = stmt.keyword.line
+        if stmt.value is None:
+            return [ast.Return(ast.Constant(None))]
+        if stmt.tail:
+            # A call to a Lox function is left to the function's wrapper, as
+            # a TailCall of the callee's body.
+            self.tail_calls[-1] = True
+            value: Call = stmt.value  # type: ignore
+            test, function, arguments, slow = self.invocation(value)
+            body = ast.Attribute(function, "body", ast.Load())
+            fast = call("TailCall", body, ast.List(arguments, ast.Load()))
+            return [ast.Return(ast.IfExp(test, fast, slow))]
+        return [ast.Return(self.expression(stmt.value))]
+
+    @override
+    def visit_var_stmt(self, stmt: Var):
+        self.line = stmt.name.line
+        value: ast.expr = ast.Constant(None)
+        if stmt.initializer is not None:
+            value = self.expression(stmt.initializer)
+        if not self.scopes:
+            slot = ast.Constant(stmt.slot)
+            target = ast.Subscript(load("values"), slot, ast.Store())
+            return [ast.Assign([target], value)]
+        name = self.fresh(stmt.name.lexeme)
+        self.scopes[-1][0][stmt.slot] = name  # type: ignore
+        return [ast.Assign([store(name)], value)]
+
+    @override
+    def visit_while_stmt(self, stmt: While):
+        test = self.condition(stmt.condition)
+        self.loops.append((stmt.increment, len(self.nonlocals) - 1))
+        try:
+            body = self.sequence([stmt.body])
+        finally:
+            self.loops.pop()
+        if stmt.increment is not None:
+            body += self.sequence([Expression(stmt.increment)])
+        return [ast.While(test, body or [ast.Pass()], [])]
+
+    # Expression visitors
+    @override
+    def visit_assign_expr(self, expr: Assign):
+        value = self.expression(expr.value)
+        if expr.depth is None:
+            return call(
+                "assign_global",
+                load("table"),
+                self.token(expr.name),
+                ast.Constant(expr.slot),
+                value,
+            )
+        name, outer = self.local(expr.depth, expr.slot)  # type: ignore
+        if outer:
+            self.nonlocals[-1].add(name)
+        return ast.NamedExpr(store(name), value)
+
+    @override
+    def visit_binary_expr(self, expr: Binary):
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        token = self.token(expr.operator)
+        left_first, right_first, left, right = self.operands(left, right)
+
+        match expr.operator.type:
+            case TokenType.EQUAL_EQUAL | TokenType.BANG_EQUAL:
+                # Identity only matters for a NaN, the one value not equal
+                # to itself.
+                if not_nan(left) or not_nan(right):
+                    equal: ast.expr = compare(left_first, ast.Eq(), right_first)
+                else:
+                    equal = ast.BoolOp(
+                        ast.Or(),
+                        [
+                            compare(left_first, ast.Is(), right_first),
+                            compare(left, ast.Eq(), right),
+                        ],
+                    )
+                if expr.operator.type is TokenType.EQUAL_EQUAL:
+                    return equal
+                return ast.UnaryOp(ast.Not(), equal)
+            case TokenType.PLUS:
+                fast: ast.expr = ast.BinOp(left, ast.Add(), right)
+                helper = [load("add")]
+            case TokenType.MINUS:
+                fast = ast.BinOp(left, ast.Sub(), right)
+                helper = [load("subtract")]
+            case _:
+                op, apply = NUMERIC[expr.operator.type]
+                if issubclass(op, ast.cmpop):
+                    fast = compare(left, op(), right)
+                else:
+                    fast = ast.BinOp(left, op(), right)
+                helper = [load("numeric"), load(apply)]
+
+        test = self.numbers(left_first, right_first)
+        if test is None:
+            return fast
+        function, *arguments = helper
+        if not (may_be_float(left) and may_be_float(right)):
+            # The fast path could never be taken.
+            return ast.Call(function, [*arguments, left_first, right_first, token], [])
+        slow = ast.Call(function, [*arguments, left, right, token], [])
+        return ast.IfExp(test, fast, slow)
+
+    @override
+    def visit_call_expr(self, expr: Call):
+        test, function, arguments, slow = self.invocation(expr)
+        return ast.IfExp(test, ast.Call(function, arguments, []), slow)
+
+    def invocation(
+        self, expr: Call
+    ) -> tuple[ast.expr, ast.expr, list[ast.expr], ast.expr]:
+        """A test of whether `expr` calls a Lox function with the right number
+        of arguments, the function and arguments for that case, and a call
+        through `call` for any other."""
+        callee = expr.callee
+        if isinstance(callee, Variable) and callee.depth is None:
+            # UNDEFINED is no function, so it is only looked for on the slow
+            # path.
+            name, first = self.read_global(callee)
+            function = load(name)
+            checked: ast.expr = ast.IfExp(
+                compare(function, ast.IsNot(), load("UNDEFINED")),
+                function,
+                self.undefined(callee),
+            )
+            arguments = [self.expression(argument) for argument in expr.arguments]
+        else:
+            value = self.expression(callee)
+            arguments = [self.expression(argument) for argument in expr.arguments]
+            # The callee is read before any argument is evaluated.
+            if simple(value) and all(simple(argument) for argument in arguments):
+                first = function = value
+            else:
+                name = self.fresh("t")
+                first, function = ast.NamedExpr(store(name), value), load(name)
+            checked = function
+        token = self.token(expr.paren)
+        # Lox functions are called directly, and anything else through
+        # `call`, which also reports arity and type errors.
+        test = ast.BoolOp(
+            ast.And(),
+            [
+                compare(call("type", first), ast.Is(), load("function")),
+                compare(
+                    ast.Attribute(function, "arity", ast.Load()),
+                    ast.Eq(),
+                    ast.Constant(len(arguments)),
+                ),
+            ],
+        )
+        slow = call("call", load("interpreter"), checked, token, *arguments)
+        return test, function, arguments, slow
+
+    @override
+    def visit_grouping_expr(self, expr: Grouping):
+        return self.expression(expr.expression)
+
+    @override
+    def visit_literal_expr(self, expr: Literal):
+        return ast.Constant(expr.value)
+
+    @override
+    def visit_logical_expr(self, expr: Logical):
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        self.line = expr.operator.line
+        is_or = expr.operator.type is TokenType.OR
+        if boolean(expr.left):
+            return ast.BoolOp(ast.Or() if is_or else ast.And(), [left, right])
+        truthy, left = self.test(left)
+        if is_or:
+            return ast.IfExp(truthy, left, right)
+        return ast.IfExp(truthy, right, left)
+
+    @override
+    def visit_unary_expr(self, expr: Unary):
+        right = self.expression(expr.right)
+        self.line = expr.operator.line
+        if expr.operator.type is TokenType.BANG:
+            if boolean(expr.right):
+                return ast.UnaryOp(ast.Not(), right)
+            return ast.UnaryOp(ast.Not(), self.test(right)[0])
+        first, later = self.bind(right)
+        return ast.IfExp(
+            is_float(first),
+            ast.UnaryOp(ast.USub(), later),
+            ast.UnaryOp(ast.USub(), call("float", later)),
+        )
+
+    @override
+    def visit_variable_expr(self, expr: Variable):
+        if expr.depth is None:
+            name, read = self.read_global(expr)
+            return ast.IfExp(
+                compare(read, ast.IsNot(), load("UNDEFINED")),
+                load(name),
+                self.undefined(expr),
+            )
+        self.line = expr.name.line
+        name, _ = self.local(expr.depth, expr.slot)
+        return load(name)
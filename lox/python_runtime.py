@@ -0,0 +1,81 @@
+"""Operations that code generated by PythonCompiler calls when its inline
+fast paths do not apply. Each mirrors the matching Interpreter code, with
+the same results and errors."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from types import FunctionType
+
+from lox.compiled_function import TailCall
+from lox.errors import LoxRuntimeError
+from lox.globals import Globals
+from lox.interpreter import Interpreter
+from lox.lox_callable import LoxCallable
+from lox.token_type import Token
+
+
+def add(a: object, b: object, token: Token) -> object:
+    if isinstance(a, (float, int)) and isinstance(b, (float, int)):
+        return float(a) + float(b)
+    if isinstance(a, str) and isinstance(b, str):
+        return a + b
+    raise LoxRuntimeError(token, "Operands must be numbers")
+
+
+def subtract(a: object, b: object, token: Token) -> float:
+    if not isinstance(b, (float, int)):
+        raise LoxRuntimeError(token, "Operand must be a number")
+    return float(a) - float(b)  # type: ignore
+
+
+def numeric(
+    apply: Callable[[float, float], object], a: object, b: object, token: Token
+) -> object:
+    if not (isinstance(a, (float, int)) and isinstance(b, (float, int))):
+        raise LoxRuntimeError(token, "Operands must be a number")
+    return apply(float(a), float(b))
+
+
+def call(
+    interpreter: Interpreter, function: object, token: Token, *arguments: object
+) -> object:
+    if type(function) is FunctionType:
+        arity = function.arity  # type: ignore
+        if len(arguments) != arity:
+            raise LoxRuntimeError(
+                token, f"Expected {arity} arguments but got {len(arguments)}"
+            )
+        return function(*arguments)
+    if not isinstance(function, LoxCallable):
+        raise LoxRuntimeError(token, "Can only call functions and classes.")
+    if len(arguments) != function.arity():
+        raise LoxRuntimeError(
+            token,
+            f"Expected {function.arity()} arguments but got {len(arguments)}",
+        )
+    return function.call(interpreter, list(arguments))
+
+
+def finish(result: object) -> object:
+    """What a Lox function's body returned: `result`, or if that is a
+    TailCall, what the calls it leads to return."""
+    while type(result) is TailCall:
+        result = result.function(*result.arguments)  # type: ignore
+    return result
+
+
+def undefined(table: Globals, token: Token, slot: int) -> object:
+    return table.get(token, slot)
+
+
+def assign_global(table: Globals, token: Token, slot: int, value: object) -> object:
+    table.assign(token, slot, value)
+    return value
+
+
+def stringify(interpreter: Interpreter, value: object) -> str:
+    # Lox functions are Python functions named after the Lox ones.
+    if type(value) is FunctionType:
+        return f"<fn {value.__name__} >"
+    return interpreter.stringify(value)
@@ -17,6 +17,8 @@ from lox.expr_types import (
 from lox.interpreter import Interpreter
 from lox.stmt_types import (
     Block,
+    Break,
+    Continue,
     Expression,
     Function,
     If,
@@ -34,48 +36,108 @@ class FunctionType(Enum):
     FUNCTION = "FUNCTION"
 
 
+def declares_function(statements: list[Stmt]) -> bool:
+    """Whether a function is declared anywhere in `statements`."""
+    for statement in statements:
+        match statement:
+            case Function():
+                return True
+            case Block(statements=inner) if declares_function(inner):
+                return True
+            case If(then_branch=then_branch, else_branch=else_branch):
+                branches = [then_branch, else_branch or Block([])]
+                if declares_function(branches):
+                    return True
+            case While(body=body) if declares_function([body]):
+                return True
+    return False
+
+
 class Resolver(Expr.Visitor, Stmt.Visitor):
+    """Binds every local variable use to a (depth, slot) pair.
+
+    Locals live in frames, the Environments of functions and blocks, and
+    each frame numbers its variables in declaration order, which is also
+    the order the interpreter defines them in. Uses not found in any scope
+    are globals: they get a depth of None and their slot in `Globals`.
+
+    Blocks that declare nothing get no frame. Inside another local scope,
+    neither does a block that declares no functions, since then no closure
+    can capture its variables: its scope is merged into the enclosing
+    frame, and its slots are reused once it ends. Both are marked `elided`.
+    """
+
     def __init__(self, interpreter: Interpreter):
         self.interpreter = interpreter
-        self.scopes = []
+        self.scopes: list[dict[str, int]] = []
+        # For each scope, the number of the frame its variables live in, and
+        # for each frame, how many slots it uses so far.
+        self.frames: list[int] = []
+        self.frame_sizes: list[int] = []
+        # The local whose initializer is being resolved. Lox has no
+        # expressions that open a scope, so there is at most one.
+        self.initializing: str | None = None
         self.current_function = FunctionType.NONE
+        # How many loops, in the current function, the code is inside.
+        self.loops = 0
 
     def resolve(self, input):
-        match type(input):
+        match input:
             case list():
                 for statement in input:
                     self.resolve(statement)
-            case Stmt():
-                input.accept(self)
-            case Expr():
+            case Stmt() | Expr():
                 input.accept(self)
 
-    def begin_scope(self):
+    def begin_scope(self, frame: bool = True):
+        if frame:
+            self.frames.append(len(self.frame_sizes))
+            self.frame_sizes.append(0)
+        else:
+            self.frames.append(self.frames[-1])
         self.scopes.append({})
 
     def end_scope(self):
-        self.scopes.pop()
+        scope = self.scopes.pop()
+        frame = self.frames.pop()
+        if not self.frames or self.frames[-1] != frame:
+            self.frame_sizes.pop()
+        else:
+            # A merged scope: its variables are dead, so its slots are free.
+            self.frame_sizes[-1] -= len(scope)
+
+    def declare(self, name: Token) -> int:
+        """Add `name` to the innermost scope and return its slot."""
+        from lox.lox import Lox
 
-    def declare(self, name: Token):
         if not self.scopes:
-            return
+            return self.interpreter.globals.slot(name.lexeme)
         scope = self.scopes[-1]
-        scope[name.lexeme] = False
+        if name.lexeme in scope:
+            Lox.error(name, "Already a variable with this name in this scope.")
+            return scope[name.lexeme]
+        slot = scope[name.lexeme] = self.frame_sizes[-1]
+        self.frame_sizes[-1] += 1
+        self.initializing = name.lexeme
+        return slot
 
     def define(self, name: Token):
-        if not self.scopes:
-            return
-        self.scopes[-1][name.lexeme] = True
+        if self.initializing == name.lexeme:
+            self.initializing = None
 
     def resolve_local(self, expr, name):
         for i in range(len(self.scopes) - 1, -1, -1):
-            if name.lexeme in self.scopes[i]:
-                self.interpreter.resolve(expr, len(self.scopes) - 1 - i)
+            slot = self.scopes[i].get(name.lexeme)
+            if slot is not None:
+                depth = self.frames[-1] - self.frames[i]
+                self.interpreter.resolve(expr, depth, slot)
                 return
+        self.interpreter.resolve(expr, None, self.interpreter.globals.slot(name.lexeme))
 
     def resolve_function(self, function: Function, function_type: FunctionType):
         enclosing_function = self.current_function
         self.current_function = function_type
+        enclosing_loops, self.loops = self.loops, 0
 
         self.begin_scope()
         for param in function.params:
@@ -85,24 +147,36 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         self.end_scope()
 
         self.current_function = enclosing_function
+        self.loops = enclosing_loops
+
+    def jump(self, keyword: Token):
+        from lox.lox import Lox
+
+        if not self.loops:
+            Lox.error(keyword, f"Can't use '{keyword.lexeme}' outside of a loop.")
 
     # Statement visitors
     @override
     def visit_block_stmt(self, stmt: Block):
-        self.begin_scope()
+        if not any(isinstance(each, (Var, Function)) for each in stmt.statements):
+            stmt.elided = True
+            self.resolve(stmt.statements)
+            return
+        stmt.elided = bool(self.scopes) and not declares_function(stmt.statements)
+        self.begin_scope(frame=not stmt.elided)
         self.resolve(stmt.statements)
         self.end_scope()
 
     @override
     def visit_var_stmt(self, stmt: Var):
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name)
         if stmt.initializer is not None:
             self.resolve(stmt.initializer)
         self.define(stmt.name)
 
     @override
     def visit_function_stmt(self, stmt: Function):
-        self.declare(stmt.name)
+        stmt.slot = self.declare(stmt.name)
         self.define(stmt.name)
         self.resolve_function(stmt, FunctionType.FUNCTION)
 
@@ -128,20 +202,34 @@ class Resolver(Expr.Visitor, Stmt.Visitor):
         if self.current_function == FunctionType.NONE:
             Lox.error(stmt.keyword, "Can't return from top-level code.")
 
+        # A call returned as is can run in its caller's place.
+        stmt.tail = isinstance(stmt.value, Call)
         if stmt.value is not None:
             self.resolve(stmt.value)
 
     @override
     def visit_while_stmt(self, stmt: While):
         self.resolve(stmt.condition)
+        self.loops += 1
         self.resolve(stmt.body)
+        self.loops -= 1
+        if stmt.increment is not None:
+            self.resolve(stmt.increment)
+
+    @override
+    def visit_break_stmt(self, stmt: Break):
+        self.jump(stmt.keyword)
+
+    @override
+    def visit_continue_stmt(self, stmt: Continue):
+        self.jump(stmt.keyword)
 
     # Expression visitors
     @override
     def visit_variable_expr(self, expr: Variable):
         from lox.lox import Lox
 
-        if self.scopes and self.scopes[-1].get(expr.name.lexeme) is False:
+        if self.scopes and self.initializing == expr.name.lexeme:
             Lox.error(expr.name, "Can't read local variable in its own initializer")
         self.resolve_local(expr, expr.name)
 
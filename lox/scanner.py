@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import re
+from collections.abc import Iterable, Iterator
 from typing import Final
 
+from lox.symbol_table import SymbolTable
+from lox.token_buffer import TokenBuffer
 from lox.token_type import Token, TokenType
 
 
 class Scanner:
     keywords = {
         "and": TokenType.AND,
+        "break": TokenType.BREAK,
         "class": TokenType.CLASS,
+        "continue": TokenType.CONTINUE,
         "else": TokenType.ELSE,
         "false": TokenType.FALSE,
         "for": TokenType.FOR,
@@ -25,24 +31,215 @@ class Scanner:
         "while": TokenType.WHILE,
     }
 
-    def __init__(self, source: str):
+    operators = {
+        "(": TokenType.LEFT_PAREN,
+        ")": TokenType.RIGHT_PAREN,
+        "{": TokenType.LEFT_BRACE,
+        "}": TokenType.RIGHT_BRACE,
+        ",": TokenType.COMMA,
+        ".": TokenType.DOT,
+        "-": TokenType.MINUS,
+        "+": TokenType.PLUS,
+        ";": TokenType.SEMICOLON,
+        "/": TokenType.SLASH,
+        "*": TokenType.STAR,
+        "!": TokenType.BANG,
+        "!=": TokenType.BANG_EQUAL,
+        "=": TokenType.EQUAL,
+        "==": TokenType.EQUAL_EQUAL,
+        ">": TokenType.GREATER,
+        ">=": TokenType.GREATER_EQUAL,
+        "<": TokenType.LESS,
+        "<=": TokenType.LESS_EQUAL,
+    }
+
+    # Leading blanks are folded into every match; the alternatives are then
+    # tried in order. `[^\W\d_]` / `[^\W_]` spell str.isalpha / str.isalnum.
+    token_pattern = re.compile(
+        r"""
+        [ \t\r]*
+        (?:
+          (?P<newline>\n)
+        | (?P<comment>//[^\n]*)
+        | (?P<number>\d+(?:\.\d+)?)
+        | (?P<identifier>[^\W\d_][^\W_]*)
+        | (?P<string>"[^"]*")
+        | (?P<unterminated>"[^"]*)
+        | (?P<operator>[!=<>]=?|[(){},.\-+;/*])
+        | (?P<unexpected>.)
+        | \Z
+        )
+        """,
+        re.VERBOSE | re.DOTALL,
+    )
+
+    engines = ("regex", "legacy")
+
+    def __init__(
+        self,
+        source: str = "",
+        engine: str = "regex",
+        symbols: SymbolTable | None = None,
+    ):
+        if engine not in self.engines:
+            raise ValueError(f"Unknown scanner engine '{engine}'.")
         self.source = source
+        self.engine = engine
+        self.symbols = symbols if symbols is not None else SymbolTable()
         self.tokens: Final[list] = []
         self.start: int = 0
         self.current: int = 0
         self.line: int = 1
 
+    @staticmethod
+    def error(line: int, message: str):
+        from lox.lox import Lox
+
+        Lox.scan_error(line, message)
+
     def is_at_end(self):
         return self.current >= len(self.source)
 
     def scan_tokens(self) -> list[Token]:
-        while not self.is_at_end():
-            self.start = self.current
-            self.scan_token()
+        if self.engine == "regex":
+            self.scan_regex()
+        else:
+            while not self.is_at_end():
+                self.start = self.current
+                self.scan_token()
 
         self.tokens.append(Token(TokenType.EOF, "", None, self.line))
         return self.tokens
 
+    def scan_regex(self):
+        """Tokenize the whole source with `token_pattern`, one match per lexeme."""
+        self.tokens.extend(self.match_tokens(self.source, len(self.source)))
+        self.start = self.current
+
+    def scan_buffer(self, start: int = 0, stop: int | None = None) -> TokenBuffer:
+        """Like `scan_regex`, but store the tokens column-wise in a TokenBuffer.
+
+        With `start` and `stop`, only the lexemes beginning in that part of the
+        source are scanned. `current` is left after the last one, which is past
+        `stop` if that lexeme (a string, a comment) runs across it.
+        """
+        buffer = TokenBuffer(self.source, self.symbols)
+        types, starts, ends, lines = (
+            buffer.types,
+            buffer.starts,
+            buffer.ends,
+            buffer.lines,
+        )
+        codes = buffer.codes
+        identifier = codes[TokenType.IDENTIFIER]
+        keywords = {text: codes[kind] for text, kind in self.keywords.items()}
+        operators = {text: codes[kind] for text, kind in self.operators.items()}
+        number = codes[TokenType.NUMBER]
+        string = codes[TokenType.STRING]
+        intern = self.symbols.intern
+        line = self.line
+        stop = len(self.source) if stop is None else stop
+        self.current = start
+
+        for match in self.token_pattern.finditer(self.source, start):
+            kind = match.lastgroup
+            if match.start(kind or 0) >= stop:
+                break
+            self.current = match.end()
+            if kind is None or kind == "comment":
+                continue
+            if kind == "identifier":
+                lexeme = match.group(kind)
+                code = keywords.get(lexeme)
+                if code is None:
+                    intern(lexeme)
+                    code = identifier
+            elif kind == "operator":
+                code = operators[match.group(kind)]
+            elif kind == "newline":
+                line += 1
+                continue
+            elif kind == "number":
+                code = number
+            elif kind == "string":
+                line += match.group(kind).count("\n")
+                code = string
+            elif kind == "unterminated":
+                line += match.group(kind).count("\n")
+                self.error(line, "Unterminated String")
+                continue
+            else:
+                self.error(line, "Unexpected character.")
+                continue
+            start, end = match.span(kind)
+            types.append(code)
+            starts.append(start)
+            ends.append(end)
+            lines.append(line)
+
+        self.line = line
+        self.start = self.current
+        buffer.append(TokenType.EOF, self.current, self.current, line)
+        return buffer
+
+    def scan_chunks(self, chunks: Iterable[str]) -> Iterator[Token]:
+        """Lazily tokenize text that arrives in pieces, e.g. from `read_chunks`.
+
+        Only the unfinished tail of the previous chunk is kept around, so memory
+        does not grow with the size of the input.
+        """
+        pending = ""
+        for chunk in chunks:
+            pending += chunk
+            # A lexeme ending in the last two characters may still grow once
+            # more text arrives (`1` + `.5`, `!` + `=`, an open string).
+            yield from self.match_tokens(pending, len(pending) - 2)
+            pending = pending[self.current :]
+        yield from self.match_tokens(pending, len(pending))
+        yield Token(TokenType.EOF, "", None, self.line)
+
+    def match_tokens(self, text: str, limit: int) -> Iterator[Token]:
+        """Yield the tokens of `text` whose lexemes end at or before `limit`.
+
+        `current` is left at the first character that was not consumed.
+        """
+        keywords = self.keywords
+        operators = self.operators
+        intern = self.symbols.intern
+        line = self.line
+        self.current = len(text)
+
+        for match in self.token_pattern.finditer(text):
+            if match.end() > limit:
+                self.current = match.start()
+                break
+            kind = match.lastgroup
+            if kind is None or kind == "comment":
+                continue
+            lexeme = match.group(kind)
+            if kind == "identifier":
+                token_type = keywords.get(lexeme)
+                if token_type is None:
+                    yield Token(TokenType.IDENTIFIER, intern(lexeme), None, line)
+                else:
+                    yield Token(token_type, lexeme, None, line)
+            elif kind == "operator":
+                yield Token(operators[lexeme], lexeme, None, line)
+            elif kind == "newline":
+                line += 1
+            elif kind == "number":
+                yield Token(TokenType.NUMBER, lexeme, float(lexeme), line)
+            elif kind == "string":
+                line += lexeme.count("\n")
+                yield Token(TokenType.STRING, lexeme, lexeme[1:-1], line)
+            elif kind == "unterminated":
+                line += lexeme.count("\n")
+                self.error(line, "Unterminated String")
+            else:
+                self.error(line, "Unexpected character.")
+
+        self.line = line
+
     def advance(self) -> str:
         c = self.source[self.current]
         self.current += 1
@@ -81,9 +278,7 @@ class Scanner:
             self.advance()
 
         if self.is_at_end():
-            from lox.lox import Lox
-
-            print(self.line, "Unterminated String")
+            self.error(self.line, "Unterminated String")
             return
         # the closing " from the string
 
@@ -106,7 +301,10 @@ class Scanner:
         text: str = self.source[self.start : self.current]
         token_type = self.keywords.get(text)
         if token_type is None:
-            token_type = TokenType.IDENTIFIER
+            self.tokens.append(
+                Token(TokenType.IDENTIFIER, self.symbols.intern(text), None, self.line)
+            )
+            return
         self.add_token(token_type)
 
     def scan_token(self):
@@ -167,4 +365,10 @@ class Scanner:
                 elif c.isalpha():
                     self.identifier()
                 else:
-                    print(self.line, "Unexpected character.")
+                    self.error(self.line, "Unexpected character.")
+
+
+def read_chunks(path: str, size: int = 1 << 16) -> Iterator[str]:
+    with open(path, "r") as file:
+        while chunk := file.read(size):
+            yield chunk
@@ -1,23 +1,25 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Protocol
 
-from lox.token_type import Token
 from lox.expr_types import Expr
+from lox.token_type import Token
 
 
-@dataclass
+# Slotted, and compared and hashed by identity: two nodes spelling the same
+# code at the same place are still different nodes with their own slots.
+@dataclass(slots=True, eq=False)
 class Stmt(ABC):
-    pass
-    
     @abstractmethod
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         pass
 
     class Visitor[R](Protocol):
         def visit_block_stmt(self, stmt: Block) -> R: ...
+        def visit_break_stmt(self, stmt: Break) -> R: ...
+        def visit_continue_stmt(self, stmt: Continue) -> R: ...
         def visit_expression_stmt(self, stmt: Expression) -> R: ...
         def visit_function_stmt(self, stmt: Function) -> R: ...
         def visit_print_stmt(self, stmt: Print) -> R: ...
@@ -26,45 +28,76 @@ class Stmt(ABC):
         def visit_var_stmt(self, stmt: Var) -> R: ...
         def visit_while_stmt(self, stmt: While) -> R: ...
 
-@dataclass
+        def visit_pure_function_stmt(self, stmt: PureFunction) -> R:
+            return self.visit_function_stmt(stmt)
+
+        def visit_counted_loop_stmt(self, stmt: CountedLoop) -> R:
+            return self.visit_while_stmt(stmt)
+
+
+@dataclass(slots=True, eq=False)
 class Block(Stmt):
     statements: list[Stmt]
+    elided: bool | None = field(default=None, init=False, repr=False)
 
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         return visitor.visit_block_stmt(self)
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
+class Break(Stmt):
+    keyword: Token
+
+    def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
+        return visitor.visit_break_stmt(self)
+
+
+@dataclass(slots=True, eq=False)
+class Continue(Stmt):
+    keyword: Token
+
+    def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
+        return visitor.visit_continue_stmt(self)
+
+
+@dataclass(slots=True, eq=False)
 class Expression(Stmt):
     expression: Expr
 
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         return visitor.visit_expression_stmt(self)
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class Function(Stmt):
     name: Token
     params: list[Token]
     body: list[Stmt]
+    slot: int | None = field(default=None, init=False, repr=False)
 
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         return visitor.visit_function_stmt(self)
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class Print(Stmt):
     expression: Expr
 
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         return visitor.visit_print_stmt(self)
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class Return(Stmt):
     keyword: Token
     value: Expr
+    tail: bool | None = field(default=None, init=False, repr=False)
 
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         return visitor.visit_return_stmt(self)
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class If(Stmt):
     condition: Expr
     then_branch: Stmt
@@ -73,19 +106,34 @@ class If(Stmt):
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         return visitor.visit_if_stmt(self)
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class Var(Stmt):
     name: Token
     initializer: Expr
+    slot: int | None = field(default=None, init=False, repr=False)
 
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         return visitor.visit_var_stmt(self)
 
-@dataclass
+
+@dataclass(slots=True, eq=False)
 class While(Stmt):
     condition: Expr
     body: Stmt
+    increment: Expr
 
     def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
         return visitor.visit_while_stmt(self)
 
+
+@dataclass(slots=True, eq=False)
+class PureFunction(Function):
+    def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
+        return visitor.visit_pure_function_stmt(self)
+
+
+@dataclass(slots=True, eq=False)
+class CountedLoop(While):
+    def accept[R](self, visitor: Stmt.Visitor[R]) -> R:
+        return visitor.visit_counted_loop_stmt(self)
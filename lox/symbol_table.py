@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import sys
+
+
+class SymbolTable:
+    """Identifier names of one program, each stored once and numbered.
+
+    Names are interned on first sight, so every token, scope and environment
+    that mentions a name shares one string object and dictionary lookups on it
+    hit the identity fast path. `id` gives the name's small integer symbol.
+    """
+
+    def __init__(self):
+        self.ids: dict[str, int] = {}
+        self.names: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def intern(self, name: str) -> str:
+        symbol = self.ids.get(name)
+        if symbol is None:
+            name = sys.intern(name)
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+            return name
+        return self.names[symbol]
+
+    def id(self, name: str) -> int:
+        return self.ids[self.intern(name)]
+
+    def name(self, symbol: int) -> str:
+        return self.names[symbol]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator
+
+from lox.symbol_table import SymbolTable
+from lox.token_type import Token, TokenType
+
+
+class TokenBuffer:
+    """Tokens of one source kept column-wise instead of as Token objects.
+
+    Lexemes are sliced out of `source` and literals re-derived from them only
+    when a token is materialized, so a stored token costs 13 bytes. Identifier
+    lexemes come back as the names interned in `symbols`.
+    """
+
+    token_types = list(TokenType)
+    codes = {token_type: code for code, token_type in enumerate(token_types)}
+    identifier = codes[TokenType.IDENTIFIER]
+
+    def __init__(self, source: str, symbols: SymbolTable):
+        self.source = source
+        self.symbols = symbols
+        self.types = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.lines = array("I")
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __iter__(self) -> Iterator[Token]:
+        """A cursor that builds each Token as the consumer reaches it."""
+        for index in range(len(self.types)):
+            yield self.token(index)
+
+    def append(self, token_type: TokenType, start: int, end: int, line: int):
+        self.types.append(self.codes[token_type])
+        self.starts.append(start)
+        self.ends.append(end)
+        self.lines.append(line)
+
+    def type(self, index: int) -> TokenType:
+        return self.token_types[self.types[index]]
+
+    def lexeme(self, index: int) -> str:
+        lexeme = self.source[self.starts[index] : self.ends[index]]
+        if self.types[index] == self.identifier:
+            return self.symbols.intern(lexeme)
+        return lexeme
+
+    def literal(self, index: int) -> object:
+        match self.type(index):
+            case TokenType.NUMBER:
+                return float(self.lexeme(index))
+            case TokenType.STRING:
+                return self.source[self.starts[index] + 1 : self.ends[index] - 1]
+        return None
+
+    def token(self, index: int) -> Token:
+        return Token(
+            self.type(index),
+            self.lexeme(index),
+            self.literal(index),
+            self.lines[index],
+        )
@@ -3,6 +3,10 @@ from enum import Enum, auto
 
 
 class TokenType(Enum):
+    # Members are singletons, so hashing by identity is exact and keeps
+    # dict lookups keyed by TokenType (parser tables) out of Python code.
+    __hash__ = object.__hash__
+
     # Single-character tokens
     LEFT_PAREN = auto()
     RIGHT_PAREN = auto()
@@ -33,7 +37,9 @@ class TokenType(Enum):
 
     # Keywords
     AND = auto()
+    BREAK = auto()
     CLASS = auto()
+    CONTINUE = auto()
     ELSE = auto()
     FALSE = auto()
     FUN = auto()
@@ -52,9 +58,14 @@ class TokenType(Enum):
     EOF = auto()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Token:
     type: TokenType
     lexeme: str
     literal: object
     line: int
+
+    def __reduce__(self):
+        # Positional rebuild: the slotted dataclass default goes through a
+        # Python-level __setstate__, which dominated loading cached programs.
+        return Token, (self.type, self.lexeme, self.literal, self.line)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import operator
+
+from lox.bytecode_compiler import BytecodeCompiler
+from lox.chunk import Chunk
+from lox.environment import Environment
+from lox.errors import LoxRuntimeError
+from lox.globals import UNDEFINED
+from lox.interpreter import Interpreter
+from lox.lox_callable import LoxCallable
+from lox.opcodes import OpCode
+from lox.stmt_types import Stmt
+from lox.vm_function import VMFunction
+
+# Opcodes of the instructions that need two numbers, and what they do to
+# them as floats.
+NUMERIC = {
+    OpCode.GREATER: operator.gt,
+    OpCode.GREATER_EQUAL: operator.ge,
+    OpCode.LESS: operator.lt,
+    OpCode.LESS_EQUAL: operator.le,
+    OpCode.MULTIPLY: operator.mul,
+    OpCode.DIVIDE: operator.truediv,
+}
+
+
+class VM:
+    """A stack machine running Chunks from BytecodeCompiler.
+
+    Operands live on one list used as a stack. Lox calls push a frame onto
+    `frames` rather than recursing in Python, so recursion depth is not
+    limited by Python's stack. Environments, Globals and error messages
+    are Interpreter's.
+    """
+
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+
+    def interpret(self, statements: list[Stmt]):
+        chunk = BytecodeCompiler().compile(statements)
+        try:
+            self.run(chunk, None)
+        except LoxRuntimeError as error:
+            from lox.lox import Lox
+
+            Lox.runtime_error(error)
+
+    def run(self, chunk: Chunk, environment: Environment | None) -> object:
+        """Run `chunk` in `environment`; returns what it returns."""
+        interpreter = self.interpreter
+        stringify = interpreter.stringify
+        check_operand = interpreter.check_number_operand
+        check_operands = interpreter.check_number_operands
+        table = self.globals
+        values = table.values
+        numeric = {op.value: apply for op, apply in NUMERIC.items()}
+
+        # Opcodes as locals: comparing with these is the cheapest dispatch
+        # Python offers.
+        CONSTANT = OpCode.CONSTANT.value
+        POP = OpCode.POP.value
+        GET_LOCAL = OpCode.GET_LOCAL.value
+        SET_LOCAL = OpCode.SET_LOCAL.value
+        DEFINE_LOCAL = OpCode.DEFINE_LOCAL.value
+        GET_OUTER = OpCode.GET_OUTER.value
+        SET_OUTER = OpCode.SET_OUTER.value
+        GET_GLOBAL = OpCode.GET_GLOBAL.value
+        SET_GLOBAL = OpCode.SET_GLOBAL.value
+        DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+        EQUAL = OpCode.EQUAL.value
+        NOT_EQUAL = OpCode.NOT_EQUAL.value
+        ADD = OpCode.ADD.value
+        SUBTRACT = OpCode.SUBTRACT.value
+        NOT = OpCode.NOT.value
+        NEGATE = OpCode.NEGATE.value
+        PRINT = OpCode.PRINT.value
+        JUMP = OpCode.JUMP.value
+        JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+        JUMP_IF_FALSE_OR_POP = OpCode.JUMP_IF_FALSE_OR_POP.value
+        JUMP_IF_TRUE_OR_POP = OpCode.JUMP_IF_TRUE_OR_POP.value
+        CALL = OpCode.CALL.value
+        CLOSURE = OpCode.CLOSURE.value
+        RETURN = OpCode.RETURN.value
+        PUSH_SCOPE = OpCode.PUSH_SCOPE.value
+        POP_SCOPE = OpCode.POP_SCOPE.value
+
+        code = chunk.code
+        constants = chunk.constants
+        ip = 0
+        stack: list[object] = []
+        push = stack.append
+        pop = stack.pop
+        # The code, constants, return address and Environment of each caller.
+        frames: list[tuple[list[int], list[object], int, Environment | None]] = []
+
+        while True:
+            op = code[ip]
+            if op == GET_LOCAL:
+                push(environment.values[code[ip + 1]])  # type: ignore
+                ip += 2
+            elif op == CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+            elif op == GET_GLOBAL:
+                slot = code[ip + 1]
+                value = values[slot]
+                if value is UNDEFINED:
+                    table.get(constants[code[ip + 2]], slot)  # type: ignore
+                push(value)
+                ip += 3
+            elif op == JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = code[ip + 1]
+                else:
+                    ip += 2
+            elif op == ADD:
+                b = pop()
+                a = pop()
+                if type(a) is float and type(b) is float:
+                    push(a + b)
+                elif isinstance(a, (float, int)) and isinstance(b, (float, int)):
+                    push(float(a) + float(b))
+                elif isinstance(a, str) and isinstance(b, str):
+                    push(a + b)
+                else:
+                    raise LoxRuntimeError(
+                        constants[code[ip + 1]],  # type: ignore
+                        "Operands must be numbers",
+                    )
+                ip += 2
+            elif op == SUBTRACT:
+                b = pop()
+                a = pop()
+                if type(a) is float and type(b) is float:
+                    push(a - b)
+                else:
+                    check_operand(constants[code[ip + 1]], b)  # type: ignore
+                    push(float(a) - float(b))  # type: ignore
+                ip += 2
+            elif op in numeric:
+                b = pop()
+                a = pop()
+                apply = numeric[op]
+                if type(a) is float and type(b) is float:
+                    push(apply(a, b))
+                else:
+                    check_operands(constants[code[ip + 1]], a, b)  # type: ignore
+                    push(apply(float(a), float(b)))  # type: ignore
+                ip += 2
+            elif op == CALL:
+                count = code[ip + 1]
+                base = len(stack) - count
+                function = stack[base - 1]
+                arguments = stack[base:]
+                del stack[base - 1 :]
+                if type(function) is VMFunction:
+                    callee = function.chunk
+                    if count != callee.arity:
+                        raise LoxRuntimeError(
+                            constants[code[ip + 2]],  # type: ignore
+                            f"Expected {callee.arity} arguments but got {count}",
+                        )
+                    frames.append((code, constants, ip + 3, environment))
+                    code = callee.code
+                    constants = callee.constants
+                    ip = 0
+                    environment = Environment(function.closure, arguments)
+                    continue
+                if not isinstance(function, LoxCallable):
+                    raise LoxRuntimeError(
+                        constants[code[ip + 2]],  # type: ignore
+                        "Can only call functions and classes.",
+                    )
+                if count != function.arity():
+                    raise LoxRuntimeError(
+                        constants[code[ip + 2]],  # type: ignore
+                        f"Expected {function.arity()} arguments but got {count}",
+                    )
+                push(function.call(interpreter, arguments))
+                ip += 3
+            elif op == RETURN:
+                if not frames:
+                    return pop()
+                code, constants, ip, environment = frames.pop()
+            elif op == POP:
+                pop()
+                ip += 1
+            elif op == JUMP:
+                ip = code[ip + 1]
+            elif op == SET_LOCAL:
+                environment.values[code[ip + 1]] = stack[-1]  # type: ignore
+                ip += 2
+            elif op == DEFINE_LOCAL:
+                environment.define(code[ip + 1], pop())  # type: ignore
+                ip += 2
+            elif op == GET_OUTER:
+                frame = environment.ancestor(code[ip + 1])  # type: ignore
+                push(frame.values[code[ip + 2]])
+                ip += 3
+            elif op == SET_OUTER:
+                frame = environment.ancestor(code[ip + 1])  # type: ignore
+                frame.values[code[ip + 2]] = stack[-1]
+                ip += 3
+            elif op == SET_GLOBAL:
+                slot = code[ip + 1]
+                if values[slot] is UNDEFINED:
+                    name = constants[code[ip + 2]]
+                    table.assign(name, slot, stack[-1])  # type: ignore
+                values[slot] = stack[-1]
+                ip += 3
+            elif op == DEFINE_GLOBAL:
+                values[code[ip + 1]] = pop()
+                ip += 2
+            elif op == EQUAL:
+                b = pop()
+                a = pop()
+                push(a is b or a == b)
+                ip += 1
+            elif op == NOT_EQUAL:
+                b = pop()
+                a = pop()
+                push(not (a is b or a == b))
+                ip += 1
+            elif op == NOT:
+                value = pop()
+                push(value is None or value is False)
+                ip += 1
+            elif op == NEGATE:
+                push(-float(pop()))  # type: ignore
+                ip += 1
+            elif op == PRINT:
+                print(stringify(pop()))
+                ip += 1
+            elif op == JUMP_IF_FALSE_OR_POP:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = code[ip + 1]
+                else:
+                    pop()
+                    ip += 2
+            elif op == JUMP_IF_TRUE_OR_POP:
+                value = stack[-1]
+                if value is not None and value is not False:
+                    ip = code[ip + 1]
+                else:
+                    pop()
+                    ip += 2
+            elif op == CLOSURE:
+                push(VMFunction(constants[code[ip + 1]], environment))  # type: ignore
+                ip += 2
+            elif op == PUSH_SCOPE:
+                environment = Environment(environment)
+                ip += 1
+            elif op == POP_SCOPE:
+                environment = environment.enclosing  # type: ignore
+                ip += 1
+            else:
+                raise ValueError(f"unknown opcode {op} at {ip}")
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import override
+
+from lox.chunk import Chunk
+from lox.environment import Environment
+from lox.lox_callable import LoxCallable
+
+
+class VMFunction(LoxCallable):
+    """A function compiled to a Chunk, with the Environment it closes over."""
+
+    __slots__ = ("chunk", "closure")
+
+    def __init__(self, chunk: Chunk, closure: Environment | None):
+        self.chunk = chunk
+        self.closure = closure
+
+    @override
+    def call(self, interpreter, arguments: list[object]) -> object:
+        # The VM calls its functions without this; it is for other callers.
+        from lox.vm import VM
+
+        return VM(interpreter).run(self.chunk, Environment(self.closure, arguments))
+
+    @override
+    def arity(self) -> int:
+        return self.chunk.arity
+
+    def __str__(self):
+        return f"<fn {self.chunk.name} >"
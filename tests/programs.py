@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).parent
+
+
+def run(path: Path | str, *flags: str) -> subprocess.CompletedProcess[str]:
+    """Run the Lox script at `path` through the command line, uncached."""
+    return subprocess.run(
+        [sys.executable, "-m", "lox.lox", "--no-cache", *flags, str(path)],
+        cwd=HERE.parent,
+        capture_output=True,
+        text=True,
+    )
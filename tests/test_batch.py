@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from lox.batch import compile_files
+from lox.cache import ProgramCache, SUFFIX
+
+
+def write_scripts(directory: str) -> list[str]:
+    scripts = Path(directory) / "scripts"
+    scripts.mkdir()
+    paths = []
+    for name in ("a", "b"):
+        path = scripts / f"{name}.lox"
+        path.write_text(f"var {name} = 1;\nprint {name} + 1;\n")
+        paths.append(str(path))
+    return paths
+
+
+class BatchCompileTest(unittest.TestCase):
+    def test_second_compile_is_cached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_scripts(directory)
+            cache = str(Path(directory) / "cache")
+            first = compile_files(paths, workers=1, cache_directory=cache)
+            second = compile_files(paths, workers=1, cache_directory=cache)
+        self.assertEqual([result.cached for result in first], [False, False])
+        self.assertEqual([result.cached for result in second], [True, True])
+        self.assertTrue(all(result.ok for result in first + second))
+
+    def test_corrupt_entry_is_compiled_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_scripts(directory)
+            cache = str(Path(directory) / "cache")
+            compile_files(paths, workers=1, cache_directory=cache)
+            for entry in ProgramCache(cache).directory.glob(f"*{SUFFIX}"):
+                entry.write_bytes(b"not a pickle")
+            second = compile_files(paths, workers=1, cache_directory=cache)
+            third = compile_files(paths, workers=1, cache_directory=cache)
+        self.assertEqual([result.cached for result in second], [False, False])
+        self.assertEqual([result.cached for result in third], [True, True])
+
+    def test_entries_hold_only_their_own_globals(self):
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_scripts(directory)
+            cache = str(Path(directory) / "cache")
+            compile_files(paths, workers=1, cache_directory=cache)
+            programs = ProgramCache(cache)
+            names = []
+            for entry in sorted(programs.directory.glob(f"*{SUFFIX}")):
+                program = programs.load(entry.name.removesuffix(SUFFIX))
+                names.append(program[0])  # type: ignore
+        # "clock" first, then the one global each script declares.
+        self.assertCountEqual([program[1:] for program in names], [["a"], ["b"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from lox.cache import ProgramCache, ProgramUnpickler
+from lox.lox import Lox
+from lox.expr_types import Literal
+from lox.stmt_types import Print
+
+# STACK_GLOBAL for "lox.cache" / "os.getcwd", called with no arguments: what a
+# planted entry would use to reach os.system.
+HOSTILE = b"\x80\x04\x8c\tlox.cache\x94\x8c\tos.getcwd\x94\x93\x94)R\x94."
+
+
+class ProgramUnpicklerTest(unittest.TestCase):
+    def test_rejects_dotted_names(self):
+        with self.assertRaises(pickle.UnpicklingError):
+            ProgramUnpickler(io.BytesIO(HOSTILE)).load()
+
+    def test_rejects_other_lox_objects(self):
+        data = pickle.dumps(ProgramCache, pickle.HIGHEST_PROTOCOL)
+        with self.assertRaises(pickle.UnpicklingError):
+            ProgramUnpickler(io.BytesIO(data)).load()
+
+    def test_loads_programs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ProgramCache(directory)
+            cache.store("program", ([], [Print(Literal(1.0))]))
+            names, statements = cache.load("program")  # type: ignore
+        self.assertEqual(names, [])
+        self.assertEqual(statements[0].expression.value, 1.0)
+
+    def test_hostile_entry_is_a_miss(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ProgramCache(directory)
+            cache.directory.mkdir(parents=True)
+            cache.entry("program").write_bytes(HOSTILE)
+            self.assertIsNone(cache.load("program"))
+
+
+class CompileFileTest(unittest.TestCase):
+    def test_scanner_errors_on_every_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "script.lox"
+            path.write_text("var a = 1 @;\nprint a;\n")
+            self.addCleanup(setattr, Lox, "cache", None)
+            Lox.cache = ProgramCache(Path(directory) / "cache")
+            outputs = []
+            for _ in range(2):
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    statements = Lox.compile_file(str(path))
+                self.assertIsNotNone(statements)
+                outputs.append(output.getvalue())
+        self.assertEqual(outputs, ["1 Unexpected character.\n"] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import unittest
+
+from lox.incremental import IncrementalCompiler
+from lox.interpreter import Interpreter
+from lox.lox import Lox
+from lox.symbol_table import SymbolTable
+
+
+class IncrementalCompilerTest(unittest.TestCase):
+    def setUp(self):
+        self.compiler = IncrementalCompiler(Interpreter(), SymbolTable())
+        Lox.had_error = False
+        self.addCleanup(setattr, Lox, "had_error", False)
+
+    def compile(self, source: str) -> str:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.compiler.compile(source)
+        return output.getvalue()
+
+    def test_spilled_edit_reports_once(self):
+        self.compile("print 1;\nprint 2;\nprint 3;\n")
+        output = self.compile('print 1;\nprint "2;\nprint 3;\n')
+        self.assertEqual(output.count("Unterminated String"), 1, output)
+
+    def test_scanner_errors_in_edit(self):
+        self.compile("print 1;\nprint 2;\nprint 3;\n")
+        output = self.compile("print 1;\nprint @2;\nprint 3;\n")
+        self.assertEqual(output, "2 Unexpected character.\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
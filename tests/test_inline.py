@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import unittest
+
+from tests.programs import HERE, run
+
+INLINE = HERE / "inline.lox"
+
+
+class InlineTest(unittest.TestCase):
+    def test_same_output(self):
+        expected = run(INLINE, "--no-inline")
+        self.assertEqual(expected.stdout, "9\n7\nab\n8\n0\n", expected.stderr)
+        result = run(INLINE)
+        self.assertEqual(result.stdout, expected.stdout, result.stderr)
+
+    def test_calls_inlined(self):
+        before = run(INLINE, "--no-inline", "--call-stats")
+        after = run(INLINE, "--call-stats")
+        self.assertTrue(before.stderr.startswith("10 call sites"), before.stderr)
+        # square(n) and square(1 + 3) read a global or an operator twice.
+        self.assertTrue(after.stderr.startswith("4 call sites"), after.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
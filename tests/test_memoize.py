@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import unittest
+
+from tests.programs import HERE, run
+
+MEMOIZE = HERE / "memoize.lox"
+
+
+class MemoizeTest(unittest.TestCase):
+    def test_same_output(self):
+        expected = run(MEMOIZE)
+        self.assertEqual(expected.stdout, "2\n3\n2\n2\n2\n4\n75025\n")
+        for flags in ([], ["-O0"]):
+            with self.subTest(flags=flags):
+                result = run(MEMOIZE, "--memoize", *flags)
+                self.assertEqual(result.stdout, expected.stdout, result.stderr)
+
+    def test_hits_despite_changed_parameters(self):
+        result = run(MEMOIZE, "--memoize", "--memo-stats")
+        stats = result.stderr.splitlines()
+        self.assertIn("bump: 1 hits, 2 misses, 0 evictions, 2/1024 cached", stats)
+        self.assertIn("double: 1 hits, 2 misses, 0 evictions, 2/1024 cached", stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import unittest
+
+from tests.programs import HERE, run
+
+QUICKEN = HERE / "quicken.lox"
+
+
+class QuickenTest(unittest.TestCase):
+    def test_same_output(self):
+        # The closure engine runs every Add as parsed.
+        expected = run(QUICKEN, "--engine", "closure")
+        self.assertEqual(expected.stdout, "190\nxxxxxxxxxxxxxxxxxxxx\nab\n3\n2\nns\n")
+        for flags in ([], ["--flat-ast"]):
+            with self.subTest(flags=flags):
+                result = run(QUICKEN, *flags)
+                self.assertEqual(result.stdout, expected.stdout)
+                self.assertEqual(result.stderr, expected.stderr)
+                self.assertEqual(result.returncode, 70)
+
+    def test_stats(self):
+        result = run(QUICKEN, "--quicken-stats")
+        stats = result.stderr.splitlines()
+        self.assertIn("FloatAdd: 2 specialized, 1 deoptimized", stats)
+        self.assertIn("StringAdd: 1 specialized, 0 deoptimized", stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
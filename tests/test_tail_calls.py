@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import unittest
+
+from tests.programs import HERE, run
+
+TAIL = HERE / "tail.lox"
+
+
+class TailCallTest(unittest.TestCase):
+    def test_tail_calls(self):
+        result = run(TAIL)
+        self.assertEqual(result.stdout, "5000\nFalse\n", result.stderr)
+
+    def test_every_engine(self):
+        for engine in ("tree", "closure", "vm", "python"):
+            with self.subTest(engine=engine):
+                result = run(TAIL, "--engine", engine)
+                self.assertEqual(result.stdout, "5000\nFalse\n", result.stderr)
+
+    def test_memoized_tail_calls(self):
+        for flags in ([], ["-O0"]):
+            with self.subTest(flags=flags):
+                result = run(TAIL, "--memoize", *flags)
+                self.assertEqual(result.stdout, "5000\nFalse\n", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,43 @@
+import re
 from pathlib import Path
 
 
-def define_ast(output_dir: str, base_name: str, types: list[str]):
+def visitor_method(class_name: str, base_name: str) -> str:
+    words = re.sub(r"(?<!^)(?=[A-Z])", "_", class_name).lower()
+    return f"visit_{words}_{base_name.lower()}"
+
+
+def define_ast(
+    output_dir: str,
+    base_name: str,
+    types: list[str],
+    variants: dict[str, list[str]] | None = None,
+):
     """
     Generate AST classes for a given base type.
 
     Args:
         output_dir: Directory to write the file
         base_name: Base class name (e.g., "Expr", "Stmt")
-        types: List of type definitions in format "ClassName : field_type field_name, ..."
+        types: List of type definitions in format
+            "ClassName : field_type field_name, ... ; slot_type slot_name, ..."
+            where the optional part after ";" lists slots the resolver fills
+            in later; they start out as None and are not constructor arguments.
+        variants: Subclasses of some of the types, by type. A variant has its
+            type's fields and a visitor method of its own, which visits it as
+            its type unless a visitor overrides it.
     """
+    variants = variants or {}
     # Parse type definitions
     ast_defs = {}
+    ast_slots = {}
     for type_def in types:
         class_name, fields_str = type_def.split(" : ")
         class_name = class_name.strip()
+        fields_str, _, slots_str = fields_str.partition(";")
+        ast_slots[class_name] = [
+            tuple(slot.split()) for slot in slots_str.split(",") if slot.strip()
+        ]
 
         if fields_str.strip():
             # Split by comma and parse each field
@@ -32,22 +55,22 @@ def define_ast(output_dir: str, base_name: str, types: list[str]):
     code = f"""from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import {"dataclass, field" if any(ast_slots.values()) else "dataclass"}
 from typing import Protocol
 
-from lox.token_type import Token
 """
 
     # Add Expr import if we're generating Stmt
     if base_name == "Stmt":
         code += "from lox.expr_types import Expr\n"
+    code += "from lox.token_type import Token\n"
 
     code += f"""
 
-@dataclass
+# Slotted, and compared and hashed by identity: two nodes spelling the same
+# code at the same place are still different nodes with their own slots.
+@dataclass(slots=True, eq=False)
 class {base_name}(ABC):
-    pass
-    
     @abstractmethod
     def accept[R](self, visitor: {base_name}.Visitor[R]) -> R:
         pass
@@ -63,30 +86,50 @@ class {base_name}(ABC):
         f.write(code)
 
         # Visitor methods
+        param = base_name.lower()
         for class_name in ast_defs.keys():
-            method_name = f"visit_{class_name.lower()}_{base_name.lower()}"
+            method_name = visitor_method(class_name, base_name)
             f.write(
-                f"        def {method_name}(self, {base_name.lower()}: {class_name}) -> R: ...\n"
+                f"        def {method_name}(self, {param}: {class_name}) -> R: ...\n"
             )
-        f.write("\n")
+        for class_name, names in variants.items():
+            for variant in names:
+                f.write(
+                    f"\n        def {visitor_method(variant, base_name)}"
+                    f"(self, {param}: {variant}) -> R:\n"
+                    f"            return self.{visitor_method(class_name, base_name)}"
+                    f"({param})\n"
+                )
 
         # AST classes
         for class_name, fields in ast_defs.items():
-            f.write("@dataclass\n")
+            f.write("\n\n@dataclass(slots=True, eq=False)\n")
             f.write(f"class {class_name}({base_name}):\n")
 
-            if fields:
-                for field_type, field_name in fields:
-                    f.write(f"    {field_name}: {field_type}\n")
-            else:
-                f.write("    pass\n")
+            for field_type, field_name in fields:
+                f.write(f"    {field_name}: {field_type}\n")
+            for slot_type, slot_name in ast_slots[class_name]:
+                f.write(
+                    f"    {slot_name}: {slot_type} | None = field("
+                    "default=None, init=False, repr=False)\n"
+                )
 
             f.write(
                 f"\n    def accept[R](self, visitor: {base_name}.Visitor[R]) -> R:\n"
             )
-            method_name = f"visit_{class_name.lower()}_{base_name.lower()}"
+            method_name = visitor_method(class_name, base_name)
             f.write(f"        return visitor.{method_name}(self)\n")
-            f.write("\n")
+
+        # Variant classes
+        for class_name, names in variants.items():
+            for variant in names:
+                f.write("\n\n@dataclass(slots=True, eq=False)\n")
+                f.write(f"class {variant}({class_name}):\n")
+                f.write(
+                    f"    def accept[R](self, visitor: {base_name}.Visitor[R]) -> R:\n"
+                )
+                method_name = visitor_method(variant, base_name)
+                f.write(f"        return visitor.{method_name}(self)\n")
 
     print(f"Generated {base_name} types at: {output_path.resolve()}")
 
@@ -95,28 +138,65 @@ class {base_name}(ABC):
 
 # Generate expressions
 expr_types = [
-    "Assign   : Token name, Expr value",
+    "Assign   : Token name, Expr value ; int depth, int slot",
     "Binary   : Expr left, Token operator, Expr right",
-    "Call     : Expr callee, Token paren, list[Expr] arguments",
+    "Call     : Expr callee, Token paren, list[Expr] arguments ; int site",
     "Grouping : Expr expression",
     "Literal  : object value",
     "Logical  : Expr left, Token operator, Expr right",
     "Unary    : Token operator, Expr right",
-    "Variable : Token name",
+    "Variable : Token name ; int depth, int slot",
 ]
 
-define_ast("lox", "Expr", expr_types)
+# One variant of Binary per operator, so evaluating it needs no dispatch on
+# the operator.
+binary_variants = [
+    "Add",
+    "Subtract",
+    "Multiply",
+    "Divide",
+    "Greater",
+    "GreaterEqual",
+    "Less",
+    "LessEqual",
+    "Equal",
+    "NotEqual",
+]
+
+# What Interpreter rewrites an Add into once it has only seen two floats, or
+# two strings, there, and once it has seen anything else.
+add_variants = ["FloatAdd", "StringAdd", "GenericAdd"]
+
+define_ast(
+    "lox",
+    "Expr",
+    expr_types,
+    # A subexpression the loop optimizer found loop-invariant.
+    {"Binary": binary_variants, "Add": add_variants, "Grouping": ["Invariant"]},
+)
 
 # Generate statements
 stmt_types = [
-    "Block      : list[Stmt] statements",
+    "Block      : list[Stmt] statements ; bool elided",
+    "Break      : Token keyword",
+    "Continue   : Token keyword",
     "Expression : Expr expression",
-    "Function   : Token name, list[Token] params," + " list[Stmt] body",
+    "Function   : Token name, list[Token] params," + " list[Stmt] body ; int slot",
     "Print      : Expr expression",
-    "Return     : Token keyword, Expr value",
+    "Return     : Token keyword, Expr value ; bool tail",
     "If         : Expr condition, Stmt then_branch," + " Stmt else_branch",
-    "Var        : Token name, Expr initializer",
-    "While      : Expr condition, Stmt body",
+    "Var        : Token name, Expr initializer ; int slot",
+    "While      : Expr condition, Stmt body, Expr increment",
 ]
 
-define_ast("lox", "Stmt", stmt_types)
+# Functions the purity analysis finds can be memoized.
+function_variants = ["PureFunction"]
+
+define_ast(
+    "lox",
+    "Stmt",
+    stmt_types,
+    # A `for` loop stepping a local by a constant, as the loop optimizer
+    # finds them.
+    {"Function": function_variants, "While": ["CountedLoop"]},
+)